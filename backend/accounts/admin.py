@@ -9,6 +9,7 @@ class UsuarioAdmin(UserAdmin):
     list_display = ("username", "email", "is_active")
     list_filter = ("is_active", "roles")
     filter_horizontal = ("roles", "permisos")
+    show_full_result_count = False
 
 
 @admin.register(Rol)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:13
+
+import accounts.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='usuario',
+            managers=[
+                ('objects', accounts.models.UsuarioManager()),
+            ],
+        ),
+    ]
@@ -1,8 +1,10 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 
+from core.sincronizacion import SincronizableMixin, SincronizableQuerySet
 
-class Rol(models.Model):
+
+class Rol(SincronizableMixin, models.Model):
     """
     Roles del sistema:
     - admin
@@ -12,20 +14,30 @@ class Rol(models.Model):
     nombre = models.CharField(max_length=80)
     slug = models.SlugField(max_length=50, unique=True)
     descripcion = models.TextField(blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = SincronizableQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
 
-class Permiso(models.Model):
+class Permiso(SincronizableMixin, models.Model):
     nombre = models.CharField(max_length=80)
     descripcion = models.TextField(blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = SincronizableQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
 
-class Usuario(AbstractUser):
+class UsuarioManager(UserManager.from_queryset(SincronizableQuerySet)):
+    pass
+
+
+class Usuario(SincronizableMixin, AbstractUser):
     email = models.EmailField(unique=True)
 
     roles = models.ManyToManyField(
@@ -38,6 +50,9 @@ class Usuario(AbstractUser):
         related_name="usuarios",
         blank=True,
     )
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = UsuarioManager()
 
     def __str__(self):
         return self.username or self.email
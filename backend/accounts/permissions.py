@@ -18,7 +18,12 @@ class HasRole(BasePermission):
         if not allowed:
             return False
 
-        user_roles = set(user.roles.values_list("slug", flat=True))
+        # Se memoriza en el usuario de la petición: varias comprobaciones
+        # (por ejemplo, en /api/batch/) no repiten la consulta
+        user_roles = getattr(user, "_slugs_roles", None)
+        if user_roles is None:
+            user_roles = set(user.roles.values_list("slug", flat=True))
+            user._slugs_roles = user_roles
 
         if "admin" in user_roles:
             return True
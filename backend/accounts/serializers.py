@@ -1,21 +1,26 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from core.metricas import MedicionSerializerMixin
+from core.serializers import (
+    BatchPrimaryKeyRelatedField,
+    BatchRelatedMixin,
+)
 from .models import Usuario, Rol, Permiso
 
 
-class RolSerializer(serializers.ModelSerializer):
+class RolSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Rol
         fields = ["id", "nombre", "slug", "descripcion"]
 
 
-class PermisoSerializer(serializers.ModelSerializer):
+class PermisoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Permiso
         fields = ["id", "nombre", "descripcion"]
 
 
-class UsuarioSerializer(serializers.ModelSerializer):
+class UsuarioSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     roles = RolSerializer(many=True, read_only=True)
     permisos = PermisoSerializer(many=True, read_only=True)
 
@@ -33,8 +38,12 @@ class UsuarioSerializer(serializers.ModelSerializer):
         ]
 
 
-class UsuarioWriteSerializer(serializers.ModelSerializer):
-    rol_ids = serializers.PrimaryKeyRelatedField(
+class UsuarioWriteSerializer(
+    MedicionSerializerMixin,
+    BatchRelatedMixin,
+    serializers.ModelSerializer,
+):
+    rol_ids = BatchPrimaryKeyRelatedField(
         queryset=Rol.objects.all(),
         many=True,
         write_only=True,
@@ -1,3 +1,30 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from .models import Usuario
+
+FILAS = 50_000
+
+
+class AdminChangelistConsultasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_superuser(
+            "admin", "admin@example.com", "clave-segura"
+        )
+        Usuario.objects.bulk_create(
+            (
+                Usuario(username=f"usuario{i}", email=f"usuario{i}@example.com")
+                for i in range(FILAS)
+            ),
+            batch_size=5000,
+        )
+
+    def test_changelist_usuarios(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse("admin:accounts_usuario_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(consultas), 8)
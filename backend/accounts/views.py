@@ -9,6 +9,7 @@ from .serializers import (
     PermisoSerializer,
 )
 from .permissions import IsAdminOrRespTI
+from core.sincronizacion import SincronizacionMixin
 from rest_framework.permissions import IsAdminUser
 
 
@@ -16,12 +17,15 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
-class UsuarioViewSet(viewsets.ModelViewSet):
+class UsuarioViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     """
     Gestión de usuarios - sólo Admin y Responsable de TI.
     """
-    queryset = Usuario.objects.all().order_by("username")
+    queryset = Usuario.objects.prefetch_related("roles", "permisos").order_by(
+        "username"
+    )
     permission_classes = [IsAdminOrRespTI]
+    presupuesto_consultas = {"list": 5, "retrieve": 5}
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -29,19 +33,21 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         return UsuarioSerializer
 
 
-class RolViewSet(viewsets.ModelViewSet):
+class RolViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     """
     Gestión de roles - sólo Admin.
     """
     queryset = Rol.objects.all().order_by("nombre")
     serializer_class = RolSerializer
     permission_classes = [IsAdminUser]
+    presupuesto_consultas = {"list": 2, "retrieve": 2}
 
 
-class PermisoViewSet(viewsets.ModelViewSet):
+class PermisoViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     """
     Gestión de permisos - sólo Admin.
     """
     queryset = Permiso.objects.all().order_by("nombre")
     serializer_class = PermisoSerializer
     permission_classes = [IsAdminUser]
+    presupuesto_consultas = {"list": 2, "retrieve": 2}
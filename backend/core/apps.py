@@ -0,0 +1,11 @@
+from django.apps import AppConfig, apps
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from . import sincronizacion
+
+        sincronizacion.conectar(apps.get_models())
@@ -3,6 +3,10 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The server-sent events feed at /api/stream/ (core.views.stream_cambios)
+keeps connections open and is only served through this entry point, e.g.
+``uvicorn core.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,94 @@
+"""
+Hub en proceso para publicar cambios a clientes conectados por SSE.
+
+Los publicadores (vistas y modelos, en hilos sync) llaman a
+`hub.publicar(canal, datos)`; cada suscriptor (una conexión SSE en el
+event loop de ASGI) tiene su propia cola acotada. Si un cliente lento
+llena la cola, se descartan sus eventos y se le envía `resync` para que
+vuelva a pedir la lista completa.
+
+El hub es por proceso: con varios workers, cada uno notifica a sus
+propias conexiones los cambios que él mismo procesa.
+"""
+
+import asyncio
+import threading
+
+from django.db import transaction
+
+# Canal -> roles que pueden suscribirse (el rol "admin" siempre puede)
+CANALES = {
+    "stock": {"resp_adm_contable"},
+    "roi": {"resp_adm_contable"},
+}
+
+TAMANO_COLA = 256
+
+
+def canales_permitidos(roles):
+    roles = set(roles)
+    if "admin" in roles:
+        return set(CANALES)
+    return {canal for canal, permitidos in CANALES.items() if roles & permitidos}
+
+
+class Suscripcion:
+    def __init__(self, canales, loop):
+        self.canales = set(canales)
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=TAMANO_COLA)
+        self.desbordada = False
+
+    def _entregar(self, evento):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+
+class HubCambios:
+    def __init__(self):
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+
+    def suscribir(self, canales):
+        suscripcion = Suscripcion(canales, asyncio.get_running_loop())
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def hay_suscriptores(self, canal):
+        with self._lock:
+            return any(canal in s.canales for s in self._suscripciones)
+
+    def publicar(self, canal, datos):
+        with self._lock:
+            destinos = [s for s in self._suscripciones if canal in s.canales]
+        evento = (canal, datos)
+        for suscripcion in destinos:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion._entregar, evento)
+            except RuntimeError:
+                # El loop del suscriptor ya se cerró
+                self.cancelar(suscripcion)
+
+    def publicar_al_confirmar(self, canal, datos_fn):
+        """
+        Publica cuando la transacción actual se confirma. `datos_fn` se
+        evalúa en ese momento y solo si hay suscriptores del canal; debe
+        devolver una lista de eventos.
+        """
+
+        def _publicar():
+            if self.hay_suscriptores(canal):
+                for datos in datos_fn():
+                    self.publicar(canal, datos)
+
+        transaction.on_commit(_publicar)
+
+
+hub = HubCambios()
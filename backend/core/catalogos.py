@@ -0,0 +1,167 @@
+"""
+Registro en memoria de catálogos pequeños (marcas, categorías, unidades de
+medida, tipos de estado, cargos).
+
+Cada catálogo se carga completo una vez por proceso y se sirve ya
+serializado, de modo que los serializers pueden renderizar el objeto
+anidado solo con el id de la FK, sin joins ni consultas por fila.
+
+Coherencia:
+- En el mismo proceso, las señales post_save/post_delete y las operaciones
+  en bloque de CatalogoQuerySet (update, bulk_update, bulk_create)
+  descartan la copia.
+- Entre procesos, cada cambio incrementa `VersionCatalogo` al confirmar la
+  transacción; el middleware marca cada petición para que, la primera vez
+  que se use un catálogo, se comparen las versiones con una consulta.
+  Fuera de una petición (comandos, hilos propios) nadie marca: la
+  verificación vence a los VIGENCIA segundos.
+"""
+
+import threading
+import time
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from rest_framework import serializers
+
+from .models import VersionCatalogo
+from .sincronizacion import SincronizableQuerySet
+
+# Segundos que vale una verificación de versiones en un mismo hilo
+VIGENCIA = 2.0
+
+
+class RegistroCatalogos:
+    def __init__(self):
+        self._serializers = {}
+        self._datos = {}
+        self._versiones = {}
+        self._versiones_bd = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _nombre(modelo):
+        return modelo._meta.label_lower
+
+    def registrar(self, modelo, serializer_class):
+        self._serializers[self._nombre(modelo)] = (modelo, serializer_class)
+        post_save.connect(self._senal, sender=modelo, weak=False)
+        post_delete.connect(self._senal, sender=modelo, weak=False)
+
+    # --------- invalidación ---------
+
+    def _senal(self, sender, using=None, **kwargs):
+        self.cambio(sender, using)
+
+    def cambio(self, modelo, using=None):
+        """
+        Descarta la copia local del catálogo e incrementa su versión al
+        confirmar la transacción, para que los demás procesos la descarten.
+        """
+        nombre = self._nombre(modelo)
+        self.descartar(nombre)
+        transaction.on_commit(lambda: self._incrementar_version(nombre), using=using)
+
+    def _incrementar_version(self, nombre):
+        actualizados = VersionCatalogo.objects.filter(nombre=nombre).update(
+            version=F("version") + 1
+        )
+        if not actualizados:
+            VersionCatalogo.objects.get_or_create(nombre=nombre, defaults={"version": 1})
+        self.descartar(nombre)
+
+    def descartar(self, nombre=None):
+        with self._lock:
+            if nombre is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(nombre, None)
+
+    def marcar_pendiente(self):
+        """
+        Llamado al inicio de cada petición: la próxima lectura verificará
+        las versiones en la BD.
+        """
+        self._local.verificado = None
+
+    def _verificar(self):
+        verificado = getattr(self._local, "verificado", None)
+        if verificado is not None and time.monotonic() - verificado < VIGENCIA:
+            return
+        versiones = dict(VersionCatalogo.objects.values_list("nombre", "version"))
+        with self._lock:
+            self._versiones_bd = versiones
+            for nombre, version in list(self._versiones.items()):
+                if versiones.get(nombre, 0) != version:
+                    self._datos.pop(nombre, None)
+        self._local.verificado = time.monotonic()
+
+    # --------- lectura ---------
+
+    def _cargar(self, nombre):
+        modelo, serializer_class = self._serializers[nombre]
+        version = self._versiones_bd.get(nombre, 0)
+        datos = {
+            objeto.pk: serializer_class(objeto).data
+            for objeto in modelo._default_manager.all()
+        }
+        with self._lock:
+            self._datos[nombre] = datos
+            self._versiones[nombre] = version
+        return datos
+
+    def obtener(self, modelo, pk):
+        """
+        Representación serializada del objeto `pk` del catálogo, o None.
+        """
+        nombre = self._nombre(modelo)
+        self._verificar()
+        datos = self._datos.get(nombre)
+        if datos is None:
+            datos = self._cargar(nombre)
+        elif pk not in datos:
+            # Puede ser un registro creado por otro proceso hace instantes
+            datos = self._cargar(nombre)
+        return datos.get(pk)
+
+
+registro = RegistroCatalogos()
+
+
+class CatalogoQuerySet(SincronizableQuerySet):
+    """
+    QuerySet de los modelos de catálogo: las operaciones en bloque, que no
+    envían señales, también invalidan el registro (bulk_update pasa por
+    update()).
+    """
+
+    def update(self, **kwargs):
+        filas = super().update(**kwargs)
+        if filas:
+            registro.cambio(self.model, self.db)
+        return filas
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objetos = super().bulk_create(objs, *args, **kwargs)
+        if objetos:
+            registro.cambio(self.model, self.db)
+        return objetos
+
+
+class CatalogoField(serializers.Field):
+    """
+    Renderiza una FK a catálogo como objeto anidado desde el registro en
+    memoria. Usar con `source="<fk>_id"`.
+    """
+
+    def __init__(self, modelo, **kwargs):
+        kwargs["read_only"] = True
+        self.modelo = modelo
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return registro.obtener(self.modelo, value)
@@ -0,0 +1,156 @@
+"""
+Compresión de respuestas negociada por Accept-Encoding (Brotli o gzip).
+
+CompresionMiddleware comprime:
+- solo tipos comprimibles (JSON, texto, CSV...), nunca text/event-stream:
+  el stream de cambios debe entregar cada evento al instante;
+- las respuestas normales desde COMPRESION_MIN_BYTES, y solo si el
+  resultado es más chico;
+- las de streaming (kardex) siempre, por bloques de BLOQUE bytes;
+- nunca archivos (FileResponse, X-Accel-Redirect, X-Sendfile) ni
+  respuestas parciales: los adjuntos ROI ya vienen comprimidos (PDF,
+  imágenes) y un Range se refiere a los bytes originales.
+
+Brotli se ofrece si el paquete `brotli` está instalado; si no, solo gzip.
+"""
+
+import zlib
+
+from django.http import FileResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+NIVEL_GZIP = 6
+# Las calidades altas de Brotli son para contenido estático: en respuestas
+# dinámicas cuestan más CPU de lo que ahorran en bytes
+CALIDAD_BROTLI = 4
+
+# Bytes de streaming que se acumulan antes de comprimir y enviar un bloque
+BLOQUE = 16 * 1024
+
+TIPOS_COMPRIMIBLES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+TIPOS_EXCLUIDOS = ("text/event-stream",)
+
+
+class _Gzip:
+    def __init__(self):
+        self._compresor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos):
+        return self._compresor.compress(datos)
+
+    def vaciar(self):
+        return self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self):
+        return self._compresor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._compresor = brotli.Compressor(quality=CALIDAD_BROTLI)
+
+    def comprimir(self, datos):
+        return self._compresor.process(datos)
+
+    def vaciar(self):
+        return self._compresor.flush()
+
+    def terminar(self):
+        return self._compresor.finish()
+
+
+# En orden de preferencia ante calidades iguales
+COMPRESORES = {"br": _Brotli, "gzip": _Gzip} if brotli else {"gzip": _Gzip}
+
+
+def negociar(aceptadas):
+    """
+    Codificación a usar según el header Accept-Encoding ("br", "gzip") o
+    None. Respeta los pesos q (q=0 la rechaza) y el comodín *.
+    """
+    calidades = {}
+    for parte in aceptadas.split(","):
+        nombre, *parametros = parte.strip().split(";")
+        calidad = 1.0
+        for parametro in parametros:
+            clave, _, valor = parametro.strip().partition("=")
+            if clave.strip().lower() == "q":
+                try:
+                    calidad = float(valor)
+                except ValueError:
+                    calidad = 0.0
+        if nombre.strip():
+            calidades[nombre.strip().lower()] = calidad
+
+    comodin = calidades.get("*", 0.0)
+    candidatas = [
+        (calidades.get(nombre, comodin), -orden, nombre)
+        for orden, nombre in enumerate(COMPRESORES)
+    ]
+    calidad, _orden, nombre = max(candidatas)
+    return nombre if calidad > 0 else None
+
+
+def comprimible(response):
+    """
+    Si la respuesta admite compresión (tipo de contenido, no archivo, no
+    parcial, sin codificación previa).
+    """
+    if response.has_header("Content-Encoding") or response.has_header("Content-Range"):
+        return False
+    if isinstance(response, FileResponse) or response.status_code == 206:
+        return False
+    if response.has_header("X-Accel-Redirect") or response.has_header("X-Sendfile"):
+        return False
+    tipo = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return tipo.startswith(TIPOS_COMPRIMIBLES) and tipo not in TIPOS_EXCLUIDOS
+
+
+def comprimir(contenido, codificacion):
+    compresor = COMPRESORES[codificacion]()
+    return compresor.comprimir(contenido) + compresor.terminar()
+
+
+def comprimir_flujo(partes, codificacion):
+    """
+    Comprime un iterable de bytes. Cada BLOQUE acumulado se comprime y se
+    vacía, para que el cliente reciba datos sin esperar el final.
+    """
+    compresor = COMPRESORES[codificacion]()
+    pendiente = 0
+    for parte in partes:
+        salida = compresor.comprimir(parte)
+        pendiente += len(parte)
+        if pendiente >= BLOQUE:
+            salida += compresor.vaciar()
+            pendiente = 0
+        if salida:
+            yield salida
+    yield compresor.terminar()
+
+
+async def acomprimir_flujo(partes, codificacion):
+    """
+    Versión de comprimir_flujo para respuestas de streaming asíncronas.
+    """
+    compresor = COMPRESORES[codificacion]()
+    pendiente = 0
+    async for parte in partes:
+        salida = compresor.comprimir(parte)
+        pendiente += len(parte)
+        if pendiente >= BLOQUE:
+            salida += compresor.vaciar()
+            pendiente = 0
+        if salida:
+            yield salida
+    yield compresor.terminar()
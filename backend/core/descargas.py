@@ -0,0 +1,161 @@
+"""
+Entrega de archivos protegidos (por ejemplo, los adjuntos de los ROI).
+
+La vista valida los permisos y luego delega aquí. Según
+`settings.ARCHIVOS_ENTREGA`:
+- "accel":    respuesta vacía con X-Accel-Redirect; nginx sirve el archivo
+              desde una location `internal` en ARCHIVOS_ACCEL_PREFIJO.
+- "sendfile": igual, con X-Sendfile (Apache mod_xsendfile / lighttpd).
+- "" (por defecto): Django transmite el archivo por bloques, con
+              soporte de Range (206/416) y ETag/Last-Modified (304).
+
+En ningún caso el archivo se carga completo en memoria.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+BLOQUE = 64 * 1024
+
+_RANGO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(tamano, modificado):
+    return f'"{tamano:x}-{int(modificado.timestamp() * 1_000_000):x}"'
+
+
+def _coincide(etag, cabecera):
+    etiquetas = [e.strip().removeprefix("W/") for e in cabecera.split(",")]
+    return "*" in etiquetas or etag in etiquetas
+
+
+def _rango(cabecera, tamano):
+    """
+    Interpreta un único rango `bytes=a-b`, `bytes=a-` o `bytes=-n`.
+    Devuelve (inicio, fin) inclusivo, None si hay que ignorarlo (sintaxis
+    no soportada, p. ej. varios rangos) o False si no es satisfacible.
+    """
+    m = _RANGO.match(cabecera.strip())
+    if not m or not (m[1] or m[2]):
+        return None
+    if m[1]:
+        inicio = int(m[1])
+        if m[2] and int(m[2]) < inicio:
+            return None
+        fin = min(int(m[2]), tamano - 1) if m[2] else tamano - 1
+    else:
+        sufijo = int(m[2])
+        if sufijo == 0:
+            return False
+        inicio, fin = max(tamano - sufijo, 0), tamano - 1
+    if inicio >= tamano:
+        return False
+    return inicio, fin
+
+
+class _LecturaRango:
+    """
+    Iterador de bloques sobre [inicio, inicio + largo). Cierra el archivo
+    aunque la respuesta no llegue a iterarse (HEAD, cliente desconectado).
+    """
+
+    def __init__(self, archivo, inicio, largo):
+        self.archivo = archivo
+        self.inicio = inicio
+        self.largo = largo
+
+    def __iter__(self):
+        self.archivo.seek(self.inicio)
+        restante = self.largo
+        while restante > 0:
+            bloque = self.archivo.read(min(BLOQUE, restante))
+            if not bloque:
+                break
+            restante -= len(bloque)
+            yield bloque
+
+    def close(self):
+        self.archivo.close()
+
+
+def _redireccion_interna(modo, storage, nombre, tipo):
+    respuesta = HttpResponse(content_type=tipo)
+    if modo == "accel":
+        prefijo = getattr(settings, "ARCHIVOS_ACCEL_PREFIJO", "/protegido/")
+        respuesta["X-Accel-Redirect"] = quote(f"{prefijo.rstrip('/')}/{nombre}")
+    else:
+        respuesta["X-Sendfile"] = storage.path(nombre)
+    return respuesta
+
+
+def respuesta_archivo(request, campo, descargar=False):
+    """
+    Respuesta HTTP para un FieldFile ya autorizado.
+    `descargar=True` fuerza `Content-Disposition: attachment`.
+    """
+    storage, nombre = campo.storage, campo.name
+    tamano = storage.size(nombre)
+    modificado = storage.get_modified_time(nombre)
+    etag = _etag(tamano, modificado)
+
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since"))
+    if (if_none_match and _coincide(etag, if_none_match)) or (
+        not if_none_match
+        and if_modified_since
+        and int(modificado.timestamp()) <= if_modified_since
+    ):
+        respuesta = HttpResponseNotModified()
+        respuesta["ETag"] = etag
+        return respuesta
+
+    tipo = mimetypes.guess_type(nombre)[0] or "application/octet-stream"
+    modo = getattr(settings, "ARCHIVOS_ENTREGA", "")
+
+    if modo in ("accel", "sendfile"):
+        # El servidor web atiende Range y el envío (sendfile del kernel)
+        respuesta = _redireccion_interna(modo, storage, nombre, tipo)
+    else:
+        rango = None
+        if_range = request.headers.get("If-Range")
+        if "Range" in request.headers and (not if_range or if_range.strip() == etag):
+            rango = _rango(request.headers["Range"], tamano)
+
+        if rango is False:
+            respuesta = HttpResponse(status=416)
+            respuesta["Content-Range"] = f"bytes */{tamano}"
+            return respuesta
+
+        archivo = storage.open(nombre, "rb")
+        if rango is None:
+            respuesta = FileResponse(archivo, content_type=tipo)
+        else:
+            inicio, fin = rango
+            respuesta = StreamingHttpResponse(
+                _LecturaRango(archivo, inicio, fin - inicio + 1),
+                status=206,
+                content_type=tipo,
+            )
+            respuesta["Content-Range"] = f"bytes {inicio}-{fin}/{tamano}"
+            respuesta["Content-Length"] = str(fin - inicio + 1)
+        respuesta["Accept-Ranges"] = "bytes"
+
+    respuesta["Content-Disposition"] = content_disposition_header(
+        descargar, os.path.basename(nombre)
+    )
+    respuesta["ETag"] = etag
+    respuesta["Last-Modified"] = http_date(modificado.timestamp())
+    # Contenido protegido: solo caché del navegador y siempre revalidando
+    respuesta["Cache-Control"] = "private, no-cache"
+    return respuesta
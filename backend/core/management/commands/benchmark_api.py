@@ -0,0 +1,279 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Usuario
+from events.models import DocumentoROI, Evento, SubTarea, Tarea
+from inventory.models import MovimientoInventario, Producto, TipoEstado, UnidadMedida
+from people.models import Empleado
+
+from core.urls import router
+
+# Conteos que se reportan junto a los tiempos
+MODELOS = {
+    "productos": Producto,
+    "movimientos": MovimientoInventario,
+    "eventos": Evento,
+    "tareas": Tarea,
+    "subtareas": SubTarea,
+    "documentos_roi": DocumentoROI,
+    "empleados": Empleado,
+}
+
+
+class _Revertir(Exception):
+    pass
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide en proceso (sin servidor HTTP) los endpoints de lectura, escritura, "
+        "el login JWT y el registro de movimientos, y emite JSON comparable entre "
+        "commits. Las escrituras se revierten. Ver generar_datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuario", default="benchmark")
+        parser.add_argument("--clave", default=None, help="Por defecto, igual al usuario.")
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--salida", help="Archivo JSON (por defecto, stdout).")
+        parser.add_argument(
+            "--codificacion",
+            default="",
+            help="Accept-Encoding a enviar (gzip, br); vacío = sin compresión.",
+        )
+        parser.add_argument(
+            "--solo",
+            action="append",
+            help="Limitar a los casos cuyo nombre contenga este texto (repetible).",
+        )
+
+    def handle(self, *args, **options):
+        self.repeticiones = max(1, options["repeticiones"])
+        self.solo = options["solo"]
+        usuario, clave = options["usuario"], options["clave"] or options["usuario"]
+        if not Usuario.objects.filter(username=usuario).exists():
+            raise CommandError(
+                f"No existe el usuario '{usuario}'. Ejecute primero generar_datos."
+            )
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        self.client = Client(HTTP_HOST=host.lstrip("."))
+        if options["codificacion"]:
+            # Los bytes reportados son entonces los transferidos (comprimidos)
+            self.client.defaults["HTTP_ACCEPT_ENCODING"] = options["codificacion"]
+
+        resultados = [
+            self._medir(
+                "auth.token",
+                lambda: self.client.post(
+                    reverse("token_obtain_pair"),
+                    {"username": usuario, "password": clave},
+                    content_type="application/json",
+                ),
+            )
+        ]
+        self._reportar(resultados[-1])
+        respuesta = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": usuario, "password": clave},
+            content_type="application/json",
+        )
+        if respuesta.status_code != 200:
+            raise CommandError(f"Login fallido ({respuesta.status_code}).")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {respuesta.json()['access']}"
+
+        for caso, peticion, escritura in self._casos():
+            if self.solo and not any(s in caso for s in self.solo):
+                continue
+            resultados.append(self._medir(caso, peticion, escritura))
+            self._reportar(resultados[-1])
+
+        informe = {
+            "commit": _commit(),
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "base_datos": connection.vendor,
+            "repeticiones": self.repeticiones,
+            "codificacion": options["codificacion"] or None,
+            "filas": {nombre: modelo.objects.count() for nombre, modelo in MODELOS.items()},
+            "resultados": resultados,
+        }
+        texto = json.dumps(informe, indent=2, ensure_ascii=False)
+        if options["salida"]:
+            with open(options["salida"], "w", encoding="utf-8") as archivo:
+                archivo.write(texto + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Resultados en {options['salida']}"))
+        else:
+            self.stdout.write(texto)
+
+    # --------- medición ---------
+
+    def _reportar(self, resultado):
+        self.stderr.write(
+            f"{resultado['caso']:<40} {resultado['estado']}  "
+            f"p50 {resultado['p50_ms']:9.1f} ms  {resultado['consultas']:5d} consultas"
+        )
+
+    def _ejecutar(self, peticion, escritura):
+        if not escritura:
+            return peticion()
+        # Las escrituras se revierten para que la base no cambie entre corridas
+        try:
+            with transaction.atomic():
+                respuesta = peticion()
+                raise _Revertir
+        except _Revertir:
+            return respuesta
+
+    def _medir(self, caso, peticion, escritura=False):
+        # Calentamiento: cachés de proceso (catálogos, roles) y de la base
+        self._ejecutar(peticion, escritura)
+
+        tiempos = []
+        for _ in range(self.repeticiones):
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                respuesta = self._ejecutar(peticion, escritura)
+                if respuesta.streaming:
+                    tamano = sum(len(b) for b in respuesta.streaming_content)
+                else:
+                    tamano = len(respuesta.content)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        return {
+            "caso": caso,
+            "estado": respuesta.status_code,
+            "p50_ms": round(statistics.median(tiempos), 2),
+            "p95_ms": round(_percentil(tiempos, 95), 2),
+            "min_ms": round(min(tiempos), 2),
+            "max_ms": round(max(tiempos), 2),
+            "consultas": len(consultas),
+            "bytes": tamano,
+        }
+
+    # --------- casos ---------
+
+    def _casos(self):
+        """
+        (nombre, petición, es_escritura) para cada endpoint del router y las
+        escrituras representativas.
+        """
+        client = self.client
+
+        for _prefijo, viewset, basename in router.registry:
+            modelo = viewset.queryset.model
+            primero = modelo.objects.order_by("pk").values_list("pk", flat=True).first()
+            url_lista = reverse(f"{basename}-list")
+            yield f"{basename}.list", (lambda u=url_lista: client.get(u)), False
+            if primero is not None:
+                url = reverse(f"{basename}-detail", args=[primero])
+                yield f"{basename}.retrieve", (lambda u=url: client.get(u)), False
+
+        yield from self._escrituras()
+
+    def _escrituras(self):
+        client = self.client
+        producto = Producto.objects.order_by("pk").first()
+        unidad = UnidadMedida.objects.order_by("pk").first()
+        estado = TipoEstado.objects.order_by("pk").first()
+        tarea = Tarea.objects.order_by("pk").first()
+        documento = DocumentoROI.objects.order_by("pk").first()
+
+        def json_post(url, datos):
+            return client.post(url, datos, content_type="application/json")
+
+        def json_patch(url, datos):
+            return client.patch(url, datos, content_type="application/json")
+
+        if unidad and estado:
+            yield (
+                "producto.create",
+                lambda: json_post(
+                    reverse("producto-list"),
+                    {
+                        "codigo_producto": "BENCH-NUEVO",
+                        "nombre": "Producto de benchmark",
+                        "stock_minimo_inicial": 1,
+                        "stock": 0,
+                        "unidad_medida_id": unidad.pk,
+                        "tipo_estado_id": estado.pk,
+                    },
+                ),
+                True,
+            )
+        if producto:
+            yield (
+                "producto.partial_update",
+                lambda: json_patch(
+                    reverse("producto-detail", args=[producto.pk]),
+                    {"nombre": "Producto editado"},
+                ),
+                True,
+            )
+            # Ruta crítica: registrar un movimiento y actualizar el stock
+            yield (
+                "movimiento.create",
+                lambda: json_post(
+                    reverse("movimiento-list"),
+                    {"producto": producto.pk, "tipo": "entrada", "cantidad": 3},
+                ),
+                True,
+            )
+        yield (
+            "evento.create",
+            lambda: json_post(
+                reverse("evento-list"),
+                {
+                    "nombre": "Evento de benchmark",
+                    "fecha_inicio": "2030-01-01T09:00:00Z",
+                    "fecha_fin": "2030-01-01T18:00:00Z",
+                },
+            ),
+            True,
+        )
+        if tarea:
+            yield (
+                "tarea.partial_update",
+                lambda: json_patch(
+                    reverse("tarea-detail", args=[tarea.pk]), {"completada": True}
+                ),
+                True,
+            )
+        if documento:
+            yield (
+                "documento-roi.clasificar",
+                lambda: json_post(
+                    reverse("documento-roi-clasificar", args=[documento.pk]),
+                    {"estado_urgencia": DocumentoROI.URGENTE, "motivo_urgencia": "bench"},
+                ),
+                True,
+            )
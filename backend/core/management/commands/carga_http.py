@@ -0,0 +1,365 @@
+import asyncio
+import json
+import random
+import ssl
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.models import DocumentoROI, Evento, Tarea
+from inventory.models import Producto
+
+# Escenarios del perfil mixto y su peso por defecto
+PESOS = {
+    "inventario": 40,
+    "movimientos": 25,
+    "roi": 20,
+    "eventos": 15,
+}
+
+# Ids de muestra por modelo para armar las URLs
+MUESTRA = 1000
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class ErrorHTTP(Exception):
+    pass
+
+
+class ConexionHTTP:
+    """
+    Cliente HTTP/1.1 mínimo sobre asyncio.open_connection, con keep-alive.
+    Soporta Content-Length y Transfer-Encoding: chunked (respuestas en streaming).
+    """
+
+    def __init__(self, url):
+        partes = urlsplit(url)
+        self.host = partes.hostname
+        self.tls = partes.scheme == "https"
+        self.puerto = partes.port or (443 if self.tls else 80)
+        self.cabecera_host = partes.netloc
+        self.lector = self.escritor = None
+
+    async def _conectar(self):
+        self.lector, self.escritor = await asyncio.open_connection(
+            self.host,
+            self.puerto,
+            ssl=ssl.create_default_context() if self.tls else None,
+        )
+
+    async def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            try:
+                await self.escritor.wait_closed()
+            except OSError:
+                pass
+            self.lector = self.escritor = None
+
+    async def pedir(self, metodo, ruta, cuerpo=None, token=None):
+        if self.escritor is None:
+            await self._conectar()
+
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+        cabeceras = [
+            f"{metodo} {ruta} HTTP/1.1",
+            f"Host: {self.cabecera_host}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+            f"Content-Length: {len(datos)}",
+        ]
+        if datos:
+            cabeceras.append("Content-Type: application/json")
+        if token:
+            cabeceras.append(f"Authorization: Bearer {token}")
+        self.escritor.write(("\r\n".join(cabeceras) + "\r\n\r\n").encode() + datos)
+        await self.escritor.drain()
+
+        linea = await self.lector.readline()
+        if not linea:
+            await self.cerrar()
+            raise ErrorHTTP("El servidor cerró la conexión.")
+        estado = int(linea.split(b" ", 2)[1])
+
+        respuesta = {}
+        while (linea := await self.lector.readline()) not in (b"\r\n", b"\n", b""):
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            respuesta[nombre.strip().lower()] = valor.strip()
+
+        if respuesta.get("transfer-encoding", "").lower() == "chunked":
+            partes = []
+            while True:
+                tamano = int((await self.lector.readline()).split(b";")[0], 16)
+                if tamano == 0:
+                    await self.lector.readline()
+                    break
+                partes.append(await self.lector.readexactly(tamano))
+                await self.lector.readline()
+            contenido = b"".join(partes)
+        elif "content-length" in respuesta:
+            contenido = await self.lector.readexactly(int(respuesta["content-length"]))
+        elif estado in (204, 304) or metodo == "HEAD":
+            contenido = b""
+        else:
+            contenido = await self.lector.read()
+            respuesta["connection"] = "close"
+
+        if respuesta.get("connection", "").lower() == "close":
+            await self.cerrar()
+        return estado, contenido
+
+
+class Estadisticas:
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+
+    def registrar(self, etiqueta, segundos, ok):
+        self.latencias[etiqueta].append(segundos)
+        if not ok:
+            self.errores[etiqueta] += 1
+
+    def resumen(self, duracion):
+        filas = []
+        for etiqueta, valores in sorted(self.latencias.items()):
+            filas.append(
+                {
+                    "endpoint": etiqueta,
+                    "peticiones": len(valores),
+                    "errores": self.errores[etiqueta],
+                    "rps": round(len(valores) / duracion, 2),
+                    "p50_ms": round(_percentil(valores, 50) * 1000, 2),
+                    "p95_ms": round(_percentil(valores, 95) * 1000, 2),
+                    "p99_ms": round(_percentil(valores, 99) * 1000, 2),
+                    "max_ms": round(max(valores) * 1000, 2),
+                }
+            )
+        return filas
+
+
+class UsuarioVirtual:
+    def __init__(self, url, credenciales, ids, estadisticas, rng):
+        self.conexion = ConexionHTTP(url)
+        self.credenciales = credenciales
+        self.ids = ids
+        self.estadisticas = estadisticas
+        self.rng = rng
+        self.token = None
+
+    async def _pedir(self, etiqueta, metodo, ruta, cuerpo=None, esperado=(200, 201)):
+        inicio = time.perf_counter()
+        try:
+            estado, contenido = await self.conexion.pedir(
+                metodo, ruta, cuerpo, self.token
+            )
+            ok = estado in esperado
+        except (OSError, ErrorHTTP, asyncio.IncompleteReadError, ValueError):
+            await self.conexion.cerrar()
+            estado, contenido, ok = None, b"", False
+        self.estadisticas.registrar(etiqueta, time.perf_counter() - inicio, ok)
+        return estado, contenido
+
+    async def iniciar_sesion(self):
+        estado, contenido = await self._pedir(
+            "POST /api/auth/token/", "POST", "/api/auth/token/", self.credenciales
+        )
+        if estado != 200:
+            raise CommandError(f"Login fallido ({estado}): {contenido[:200]!r}")
+        self.token = json.loads(contenido)["access"]
+
+    def _id(self, modelo):
+        return self.rng.choice(self.ids[modelo])
+
+    # --------- escenarios ---------
+
+    async def inventario(self):
+        producto = self._id("productos")
+        await self._pedir("GET /api/marcas/", "GET", "/api/marcas/")
+        await self._pedir(
+            "GET /api/productos/{id}/", "GET", f"/api/productos/{producto}/"
+        )
+        await self._pedir(
+            "GET /api/productos/{id}/kardex/", "GET", f"/api/productos/{producto}/kardex/"
+        )
+
+    async def movimientos(self):
+        producto = self._id("productos")
+        await self._pedir(
+            "POST /api/movimientos/",
+            "POST",
+            "/api/movimientos/",
+            {
+                "producto": producto,
+                "tipo": self.rng.choice(("entrada", "salida")),
+                "cantidad": self.rng.randrange(1, 10),
+                "referencia": "carga_http",
+            },
+        )
+        await self._pedir(
+            "GET /api/productos/{id}/", "GET", f"/api/productos/{producto}/"
+        )
+
+    async def roi(self):
+        await self._pedir(
+            "GET /api/documentos-roi/prioridad/",
+            "GET",
+            "/api/documentos-roi/prioridad/?limite=20",
+        )
+        await self._pedir(
+            "POST /api/documentos-roi/{id}/clasificar/",
+            "POST",
+            f"/api/documentos-roi/{self._id('documentos')}/clasificar/",
+            {
+                "estado_urgencia": self.rng.choice(
+                    [codigo for codigo, _ in DocumentoROI.URGENCIA_CHOICES]
+                ),
+                "motivo_urgencia": "carga_http",
+            },
+        )
+
+    async def eventos(self):
+        await self._pedir(
+            "GET /api/eventos/{id}/", "GET", f"/api/eventos/{self._id('eventos')}/"
+        )
+        await self._pedir(
+            "PATCH /api/tareas/{id}/",
+            "PATCH",
+            f"/api/tareas/{self._id('tareas')}/",
+            {"completada": self.rng.random() < 0.5},
+        )
+
+    async def ejecutar(self, pesos, fin):
+        await self.iniciar_sesion()
+        nombres, valores = zip(*pesos.items())
+        try:
+            while time.perf_counter() < fin:
+                escenario = self.rng.choices(nombres, weights=valores)[0]
+                await getattr(self, escenario)()
+        finally:
+            await self.conexion.cerrar()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generador de carga HTTP (asyncio, sin dependencias) contra un servidor "
+        "en marcha (gunicorn core.wsgi / uvicorn core.asgi). Inicia sesión por "
+        "/api/auth/token/, reproduce escenarios ponderados y reporta req/s y "
+        "p50/p95/p99 por endpoint. Incluye escrituras: usar sobre datos de "
+        "prueba (ver generar_datos). Los ids se toman de la base configurada, "
+        "que debe ser la misma que usa el servidor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--usuario", default="benchmark")
+        parser.add_argument("--clave", default=None, help="Por defecto, igual al usuario.")
+        parser.add_argument("--concurrencia", type=int, default=20)
+        parser.add_argument("--duracion", type=float, default=30, help="Segundos.")
+        parser.add_argument("--semilla", type=int, default=42)
+        parser.add_argument(
+            "--escenario",
+            action="append",
+            default=[],
+            metavar="NOMBRE=PESO",
+            help=f"Ajusta el peso de un escenario ({', '.join(PESOS)}); 0 lo desactiva.",
+        )
+        parser.add_argument("--json", dest="salida_json", help="Guardar resultados en JSON.")
+
+    def _pesos(self, ajustes):
+        pesos = dict(PESOS)
+        for ajuste in ajustes:
+            nombre, _, peso = ajuste.partition("=")
+            if nombre not in PESOS or not peso.isdigit():
+                raise CommandError(f"Escenario inválido: '{ajuste}'.")
+            pesos[nombre] = int(peso)
+        pesos = {nombre: peso for nombre, peso in pesos.items() if peso}
+        if not pesos:
+            raise CommandError("Todos los escenarios tienen peso 0.")
+        return pesos
+
+    def _ids(self):
+        ids = {
+            "productos": Producto.objects.values_list("pk", flat=True)[:MUESTRA],
+            "documentos": DocumentoROI.objects.values_list("pk", flat=True)[:MUESTRA],
+            "eventos": Evento.objects.values_list("pk", flat=True)[:MUESTRA],
+            "tareas": Tarea.objects.values_list("pk", flat=True)[:MUESTRA],
+        }
+        ids = {modelo: list(valores) for modelo, valores in ids.items()}
+        vacios = [modelo for modelo, valores in ids.items() if not valores]
+        if vacios:
+            raise CommandError(
+                f"Sin datos para: {', '.join(vacios)}. Ejecute generar_datos."
+            )
+        return ids
+
+    def handle(self, *args, **options):
+        pesos = self._pesos(options["escenario"])
+        ids = self._ids()
+        credenciales = {
+            "username": options["usuario"],
+            "password": options["clave"] or options["usuario"],
+        }
+        estadisticas = Estadisticas()
+        rng = random.Random(options["semilla"])
+
+        async def principal():
+            fin = time.perf_counter() + options["duracion"]
+            usuarios = [
+                UsuarioVirtual(
+                    options["url"],
+                    credenciales,
+                    ids,
+                    estadisticas,
+                    random.Random(rng.random()),
+                )
+                for _ in range(options["concurrencia"])
+            ]
+            await asyncio.gather(*(u.ejecutar(pesos, fin) for u in usuarios))
+
+        inicio = time.perf_counter()
+        asyncio.run(principal())
+        duracion = time.perf_counter() - inicio
+
+        filas = estadisticas.resumen(duracion)
+        total = sum(f["peticiones"] for f in filas)
+        errores = sum(f["errores"] for f in filas)
+
+        self.stdout.write(
+            f"{'endpoint':<46}{'n':>8}{'err':>6}{'req/s':>9}"
+            f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"
+        )
+        for f in filas:
+            self.stdout.write(
+                f"{f['endpoint']:<46}{f['peticiones']:>8}{f['errores']:>6}{f['rps']:>9.1f}"
+                f"{f['p50_ms']:>9.1f}{f['p95_ms']:>9.1f}{f['p99_ms']:>9.1f}{f['max_ms']:>9.1f}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} peticiones en {duracion:.1f} s: {total / duracion:.1f} req/s, "
+                f"{errores} errores, concurrencia {options['concurrencia']}."
+            )
+        )
+
+        if options["salida_json"]:
+            with open(options["salida_json"], "w", encoding="utf-8") as archivo:
+                json.dump(
+                    {
+                        "url": options["url"],
+                        "concurrencia": options["concurrencia"],
+                        "duracion_s": round(duracion, 2),
+                        "pesos": pesos,
+                        "peticiones": total,
+                        "errores": errores,
+                        "rps": round(total / duracion, 2),
+                        "endpoints": filas,
+                    },
+                    archivo,
+                    indent=2,
+                    ensure_ascii=False,
+                )
@@ -0,0 +1,329 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.models import Rol, Usuario
+from events.models import DocumentoROI, Evento, SubTarea, Tarea
+from inventory import triggers
+from inventory.models import (
+    Categoria,
+    Marca,
+    MovimientoInventario,
+    Producto,
+    ResumenDiarioMovimiento,
+    TipoEstado,
+    UnidadMedida,
+    aplicar_deltas_stock,
+)
+from people.models import Cargo, Empleado
+
+# Volumen a escala 1.0 (el de producción esperado)
+VOLUMEN = {
+    "productos": 100_000,
+    "movimientos": 2_000_000,
+    "empleados": 500,
+    "eventos": 10_000,
+    "tareas": 200_000,
+    "subtareas": 200_000,
+    "documentos": 50_000,
+}
+
+PREFIJO = "GEN"
+
+ROLES = (
+    ("admin", "Administrador"),
+    ("resp_adm_contable", "Responsable administrativo-contable"),
+    ("resp_ti", "Responsable de TI"),
+)
+
+# Historia que cubren los movimientos, eventos y documentos
+DIAS_HISTORIA = 730
+
+
+def _lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+@contextmanager
+def _sin_auto_now(modelo, *campos):
+    """
+    Permite fijar campos auto_now_add en bulk_create (fechas históricas).
+    """
+    fields = [modelo._meta.get_field(c) for c in campos]
+    try:
+        for field in fields:
+            field.auto_now_add = False
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un conjunto de datos sintético y reproducible (misma semilla, "
+        "mismos datos) para pruebas de volumen. Usar sobre una base aparte, "
+        "por ejemplo: DJANGO_DB_NAME=bench.sqlite3 python manage.py migrate"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--escala",
+            type=float,
+            default=1.0,
+            help="Multiplicador del volumen (1.0 = 100k productos, 2M movimientos...).",
+        )
+        parser.add_argument("--semilla", type=int, default=42)
+        parser.add_argument("--lote", type=int, default=5000)
+        parser.add_argument(
+            "--usuario",
+            default="benchmark",
+            help="Usuario admin para benchmark_api / carga_http (clave = usuario).",
+        )
+
+    def handle(self, *args, **options):
+        if Producto.objects.filter(codigo_producto__startswith=f"{PREFIJO}-").exists():
+            raise CommandError(
+                "La base ya tiene datos generados; use una base nueva "
+                "(DJANGO_DB_NAME=... python manage.py migrate)."
+            )
+
+        self.rng = random.Random(options["semilla"])
+        self.lote = options["lote"]
+        self.ahora = timezone.now().replace(microsecond=0)
+        self.n = {
+            clave: max(1, int(valor * options["escala"]))
+            for clave, valor in VOLUMEN.items()
+        }
+        inicio = time.perf_counter()
+
+        self._etapa("usuarios y catálogos", self._usuarios_y_catalogos, options["usuario"])
+        self._etapa("productos", self._productos)
+        self._etapa("movimientos", self._movimientos)
+        self._etapa("empleados", self._empleados)
+        self._etapa("eventos, tareas y subtareas", self._eventos)
+        self._etapa("documentos ROI", self._documentos)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Datos generados en {time.perf_counter() - inicio:.1f} s "
+                f"(semilla {options['semilla']})."
+            )
+        )
+
+    def _etapa(self, nombre, funcion, *args):
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            detalle = funcion(*args)
+        self.stdout.write(
+            f"  {nombre:<30} {detalle:<28} {time.perf_counter() - inicio:8.1f} s"
+        )
+
+    def _fecha(self):
+        return self.ahora - timedelta(seconds=self.rng.randrange(DIAS_HISTORIA * 86400))
+
+    def _crear(self, modelo, objetos):
+        total = 0
+        for lote in _lotes(objetos, self.lote):
+            modelo.objects.bulk_create(lote)
+            total += len(lote)
+        return total
+
+    # --------- etapas ---------
+
+    def _usuarios_y_catalogos(self, nombre_usuario):
+        roles = {
+            slug: Rol.objects.get_or_create(slug=slug, defaults={"nombre": nombre})[0]
+            for slug, nombre in ROLES
+        }
+        usuario, _ = Usuario.objects.get_or_create(
+            username=nombre_usuario,
+            defaults={"email": f"{nombre_usuario}@example.com", "is_staff": True},
+        )
+        usuario.set_password(nombre_usuario)
+        usuario.save()
+        usuario.roles.add(roles["admin"])
+
+        self.marcas = Marca.objects.bulk_create(
+            Marca(nombre=f"{PREFIJO} Marca {i}") for i in range(50)
+        )
+        self.categorias = Categoria.objects.bulk_create(
+            Categoria(nombre=f"{PREFIJO} Categoría {i}") for i in range(30)
+        )
+        self.unidades = UnidadMedida.objects.bulk_create(
+            UnidadMedida(nombre=f"{PREFIJO} Unidad {i}", nomenclatura=f"u{i}")
+            for i in range(10)
+        )
+        self.estados = TipoEstado.objects.bulk_create(
+            TipoEstado(nombre=f"{PREFIJO} Estado {i}") for i in range(5)
+        )
+        self.cargos = Cargo.objects.bulk_create(
+            Cargo(nombre=f"{PREFIJO} Cargo {i}") for i in range(20)
+        )
+        return f"usuario '{nombre_usuario}'"
+
+    def _productos(self):
+        rng = self.rng
+        creados = self._crear(
+            Producto,
+            (
+                Producto(
+                    codigo_producto=f"{PREFIJO}-{i:07d}",
+                    nombre=f"Producto {i}",
+                    stock_minimo_inicial=rng.randrange(0, 50),
+                    stock=0,
+                    unidad_medida=rng.choice(self.unidades),
+                    tipo_estado=rng.choice(self.estados),
+                    marca=rng.choice(self.marcas) if rng.random() < 0.9 else None,
+                    categoria=rng.choice(self.categorias),
+                )
+                for i in range(self.n["productos"])
+            ),
+        )
+        self.productos = list(
+            Producto.objects.filter(codigo_producto__startswith=f"{PREFIJO}-")
+            .order_by("codigo_producto")
+            .values_list("pk", flat=True)
+        )
+        return f"{creados:,} filas"
+
+    def _movimientos(self):
+        rng = self.rng
+        deltas = dict.fromkeys(self.productos, 0)
+
+        def movimientos():
+            for i in range(self.n["movimientos"]):
+                producto = rng.choice(self.productos)
+                # 60 % entradas para que el stock tienda a ser positivo
+                tipo = "entrada" if rng.random() < 0.6 else "salida"
+                cantidad = rng.randrange(1, 20)
+                deltas[producto] += cantidad if tipo == "entrada" else -cantidad
+                yield MovimientoInventario(
+                    producto_id=producto,
+                    tipo=tipo,
+                    cantidad=cantidad,
+                    fecha=self._fecha(),
+                    referencia=f"{PREFIJO}-{i}",
+                )
+
+        with _sin_auto_now(MovimientoInventario, "fecha"):
+            creados = self._crear(MovimientoInventario, movimientos())
+
+        # bulk_create no pasa por save(): el stock lo aplican los triggers
+        # si están instalados y, si no, un UPDATE agrupado por producto
+        if not triggers.instalados(connection):
+            aplicar_deltas_stock(deltas)
+        ResumenDiarioMovimiento.reconstruir()
+        return f"{creados:,} filas"
+
+    def _empleados(self):
+        rng = self.rng
+        creados = self._crear(
+            Empleado,
+            (
+                Empleado(
+                    nombres=f"Empleado {i}",
+                    apellidos=PREFIJO,
+                    cedula=f"{PREFIJO}-{i:05d}",
+                    cargo=rng.choice(self.cargos),
+                )
+                for i in range(self.n["empleados"])
+            ),
+        )
+        self.empleados = list(
+            Empleado.objects.filter(apellidos=PREFIJO).values_list("pk", flat=True)
+        )
+        return f"{creados:,} filas"
+
+    def _eventos(self):
+        rng = self.rng
+
+        def eventos():
+            for i in range(self.n["eventos"]):
+                # Eventos pasados y futuros
+                inicio = self._fecha() + timedelta(days=DIAS_HISTORIA // 2)
+                yield Evento(
+                    nombre=f"{PREFIJO} Evento {i}",
+                    fecha_inicio=inicio,
+                    fecha_fin=inicio + timedelta(hours=rng.randrange(2, 72)),
+                    activo=rng.random() < 0.8,
+                )
+
+        creados = self._crear(Evento, eventos())
+        self.eventos = list(
+            Evento.objects.filter(nombre__startswith=f"{PREFIJO} ")
+            .order_by("pk")
+            .values_list("pk", "fecha_inicio")
+        )
+
+        def tareas():
+            for i in range(self.n["tareas"]):
+                evento, inicio = rng.choice(self.eventos)
+                inicio -= timedelta(days=rng.randrange(0, 30))
+                yield Tarea(
+                    evento_id=evento,
+                    nombre=f"Tarea {i}",
+                    fecha_inicio=inicio,
+                    fecha_fin=inicio + timedelta(hours=rng.randrange(1, 48)),
+                    responsable_id=(
+                        rng.choice(self.empleados) if rng.random() < 0.85 else None
+                    ),
+                    completada=rng.random() < 0.5,
+                )
+
+        ultima_previa = Tarea.objects.aggregate(ultima=Max("pk"))["ultima"] or 0
+        tareas_creadas = self._crear(Tarea, tareas())
+        tareas_ids = list(
+            Tarea.objects.filter(pk__gt=ultima_previa).values_list("pk", flat=True)
+        )
+
+        subtareas_creadas = self._crear(
+            SubTarea,
+            (
+                SubTarea(
+                    tarea_id=rng.choice(tareas_ids),
+                    nombre=f"Subtarea {i}",
+                    completada=rng.random() < 0.5,
+                )
+                for i in range(self.n["subtareas"])
+            ),
+        )
+        return f"{creados:,} / {tareas_creadas:,} / {subtareas_creadas:,}"
+
+    def _documentos(self):
+        rng = self.rng
+        estados = [codigo for codigo, _ in DocumentoROI.ESTADO_CHOICES]
+        hoy = self.ahora.date()
+
+        def documentos():
+            for i in range(self.n["documentos"]):
+                fecha_evento = hoy + timedelta(days=rng.randrange(-60, 365))
+                yield DocumentoROI(
+                    codigo=f"{PREFIJO}-ROI-{i:06d}",
+                    titulo=f"ROI {i}",
+                    cliente=f"Cliente {rng.randrange(2000)}",
+                    fecha_recepcion=self._fecha(),
+                    fecha_evento=fecha_evento,
+                    fecha_limite_oferta=fecha_evento - timedelta(days=rng.randrange(1, 45)),
+                    estado_proceso=rng.choice(estados),
+                    origen_clasificacion=DocumentoROI.ORIGEN_AUTOMATICO,
+                    evento_relacionado_id=(
+                        rng.choice(self.eventos)[0] if rng.random() < 0.3 else None
+                    ),
+                    enlace_documento=f"https://example.com/roi/{i}.pdf",
+                )
+
+        with _sin_auto_now(DocumentoROI, "fecha_recepcion"):
+            creados = self._crear(DocumentoROI, documentos())
+        # bulk_create no clasifica (save() no se ejecuta): un solo UPDATE
+        DocumentoROI.objects.reclasificar()
+        return f"{creados:,} filas"
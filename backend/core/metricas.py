@@ -0,0 +1,204 @@
+"""
+Métricas por vista y acción en formato de texto de Prometheus.
+
+`MetricasMiddleware` (core/middleware.py) mide cada petición:
+- latencia total, cantidad y tiempo de SQL (con `execute_wrapper`),
+- tiempo de serialización (`to_representation` de los serializers con
+  MedicionSerializerMixin; incluye el SQL que dispare, de modo que un N+1
+  aparece en ambas series).
+
+Los histogramas viven en memoria de cada proceso: con varios workers,
+Prometheus debe raspar cada uno (o usar un solo worker por puerto).
+Las respuestas en streaming se miden hasta que la vista las devuelve.
+
+GET /api/_metrics  con `Authorization: Bearer <METRICAS_TOKEN>`. Sin
+METRICAS_TOKEN definido el endpoint responde 403: los nombres de vistas y
+las latencias no se publican.
+"""
+
+import bisect
+import contextvars
+import hmac
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.http import HttpResponse
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# (nombre, ayuda, buckets)
+HISTOGRAMAS = {
+    "duracion": (
+        "http_request_duration_seconds",
+        "Latencia total de la petición.",
+        BUCKETS_SEGUNDOS,
+    ),
+    "consultas": (
+        "http_request_sql_queries",
+        "Consultas SQL ejecutadas por petición.",
+        BUCKETS_CONSULTAS,
+    ),
+    "sql": (
+        "http_request_sql_seconds",
+        "Tiempo en SQL por petición.",
+        BUCKETS_SEGUNDOS,
+    ),
+    "serializacion": (
+        "http_request_serializer_seconds",
+        "Tiempo en serializer.data por petición.",
+        BUCKETS_SEGUNDOS,
+    ),
+}
+
+
+class Histograma:
+    __slots__ = ("buckets", "conteos", "suma", "total")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * (len(buckets) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect.bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}
+        self._peticiones = Counter()
+
+    def registrar(self, etiquetas, estado, valores):
+        """
+        etiquetas = (vista, accion, metodo); valores = {clave de HISTOGRAMAS: valor}
+        """
+        with self._lock:
+            self._peticiones[etiquetas + (str(estado),)] += 1
+            for clave, valor in valores.items():
+                histograma = self._histogramas.get((clave, etiquetas))
+                if histograma is None:
+                    histograma = self._histogramas[(clave, etiquetas)] = Histograma(
+                        HISTOGRAMAS[clave][2]
+                    )
+                histograma.observar(valor)
+
+    def reiniciar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._peticiones.clear()
+
+    def exportar(self):
+        with self._lock:
+            peticiones = sorted(self._peticiones.items())
+            histogramas = sorted(
+                (clave, etiquetas, list(h.conteos), h.suma, h.total)
+                for (clave, etiquetas), h in self._histogramas.items()
+            )
+
+        lineas = [
+            "# HELP http_requests_total Peticiones atendidas.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (vista, accion, metodo, estado), total in peticiones:
+            lineas.append(
+                f"http_requests_total{{{_etiquetas(vista, accion, metodo)},"
+                f'estado="{estado}"}} {total}'
+            )
+
+        for clave, (nombre, ayuda, buckets) in HISTOGRAMAS.items():
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} histogram")
+            for clave_h, etiquetas, conteos, suma, total in histogramas:
+                if clave_h != clave:
+                    continue
+                base = _etiquetas(*etiquetas)
+                acumulado = 0
+                for limite, conteo in zip(buckets, conteos):
+                    acumulado += conteo
+                    lineas.append(f'{nombre}_bucket{{{base},le="{limite}"}} {acumulado}')
+                lineas.append(f'{nombre}_bucket{{{base},le="+Inf"}} {total}')
+                lineas.append(f"{nombre}_sum{{{base}}} {suma:.6f}")
+                lineas.append(f"{nombre}_count{{{base}}} {total}")
+        return "\n".join(lineas) + "\n"
+
+
+def _etiquetas(vista, accion, metodo):
+    return f'vista="{vista}",accion="{accion}",metodo="{metodo}"'
+
+
+registro = RegistroMetricas()
+
+
+# --------- medición por petición ---------
+
+
+class Medicion:
+    __slots__ = ("consultas", "sql", "serializacion", "sentencias", "_profundidad")
+
+    def __init__(self):
+        self.consultas = 0
+        self.sql = 0.0
+        self.serializacion = 0.0
+        # sentencia -> [veces, segundos], para el log de peticiones lentas
+        self.sentencias = {}
+        self._profundidad = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.sql += duracion
+            acumulado = self.sentencias.get(sql)
+            if acumulado is None:
+                self.sentencias[sql] = [1, duracion]
+            else:
+                acumulado[0] += 1
+                acumulado[1] += duracion
+
+    def mas_repetidas(self, cantidad=3):
+        return sorted(self.sentencias.items(), key=lambda item: -item[1][0])[:cantidad]
+
+
+medicion_actual = contextvars.ContextVar("medicion_actual", default=None)
+
+
+class MedicionSerializerMixin:
+    """
+    Mixin de serializer: acumula el tiempo de `to_representation` en la
+    medición de la petición en curso. Con many=True se mide cada elemento;
+    los serializers anidados se cuentan dentro del de nivel superior.
+    """
+
+    def to_representation(self, instance):
+        medicion = medicion_actual.get()
+        if medicion is None or medicion._profundidad:
+            return super().to_representation(instance)
+        medicion._profundidad += 1
+        inicio = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            medicion._profundidad -= 1
+            medicion.serializacion += time.perf_counter() - inicio
+
+
+def vista_metricas(request):
+    token = getattr(settings, "METRICAS_TOKEN", "")
+    if not token:
+        return HttpResponse(status=403)
+    autorizacion = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(autorizacion.encode(), f"Bearer {token}".encode()):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        registro.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,205 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import compresion, metricas
+from .catalogos import registro
+from .presupuestos import PresupuestoExcedido, presupuesto
+
+logger = logging.getLogger("core.metricas")
+logger_presupuestos = logging.getLogger("core.presupuestos")
+
+RUTA_METRICAS = "/api/_metrics"
+
+
+class CatalogosMiddleware:
+    """
+    Marca cada petición para que el registro de catálogos verifique una vez
+    (y solo si se usa) que su copia en memoria sigue vigente.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        registro.marcar_pendiente()
+        return self.get_response(request)
+
+
+class MetricasMiddleware:
+    """
+    Mide cada petición (latencia, SQL y serialización) por vista y acción
+    y, si METRICAS_LENTO_MS > 0, registra las peticiones lentas con las
+    consultas más repetidas. Ver core/metricas.py.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.umbral_lento = getattr(settings, "METRICAS_LENTO_MS", 0) / 1000
+
+    def __call__(self, request):
+        if request.path == RUTA_METRICAS:
+            return self.get_response(request)
+
+        medicion = metricas.Medicion()
+        token = metricas.medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(medicion))
+                response = self.get_response(request)
+        finally:
+            metricas.medicion_actual.reset(token)
+        duracion = time.perf_counter() - inicio
+
+        etiquetas = (
+            getattr(request, "_metricas_vista", "desconocida"),
+            getattr(request, "_metricas_accion", ""),
+            request.method,
+        )
+        metricas.registro.registrar(
+            etiquetas,
+            response.status_code,
+            {
+                "duracion": duracion,
+                "consultas": medicion.consultas,
+                "sql": medicion.sql,
+                "serializacion": medicion.serializacion,
+            },
+        )
+        if self.umbral_lento and duracion >= self.umbral_lento:
+            self._log_lenta(request, duracion, medicion)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Los ViewSets de DRF exponen la clase y el mapa método -> acción
+        clase = getattr(view_func, "cls", None)
+        request._metricas_vista = clase.__name__ if clase else view_func.__name__
+        acciones = getattr(view_func, "actions", None) or {}
+        request._metricas_accion = acciones.get(request.method.lower(), "")
+
+    def _log_lenta(self, request, duracion, medicion):
+        repetidas = "\n".join(
+            f"  {veces}x {segundos * 1000:.1f} ms  {sql[:300]}"
+            for sql, (veces, segundos) in medicion.mas_repetidas()
+        )
+        logger.warning(
+            "Petición lenta %s %s: %.0f ms, %d consultas (%.0f ms SQL, %.0f ms serialización)\n%s",
+            request.method,
+            request.get_full_path(),
+            duracion * 1000,
+            medicion.consultas,
+            medicion.sql * 1000,
+            medicion.serializacion * 1000,
+            repetidas,
+        )
+
+
+class _ContadorConsultas:
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+class PresupuestoConsultasMiddleware:
+    """
+    Compara las consultas de cada petición con el presupuesto declarado en
+    el viewset (ver core/presupuestos.py). PRESUPUESTO_CONSULTAS:
+    "advertir" registra un warning, "error" lanza PresupuestoExcedido.
+    Por defecto solo está activo con DEBUG.
+    """
+
+    def __init__(self, get_response):
+        self.modo = getattr(settings, "PRESUPUESTO_CONSULTAS", "")
+        if self.modo not in ("advertir", "error"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = _ContadorConsultas()
+        with ExitStack() as pila:
+            for conexion in connections.all():
+                pila.enter_context(conexion.execute_wrapper(contador))
+            # En respuestas en streaming solo se cuenta lo que ejecuta la
+            # vista; el resto ocurre al consumirlas (lo cubren las pruebas)
+            response = self.get_response(request)
+
+        limite = getattr(request, "_presupuesto_consultas", None)
+        if limite is not None and contador.total > limite:
+            mensaje = (
+                f"{request.method} {request.path} ({request._presupuesto_origen}) "
+                f"ejecutó {contador.total} consultas; presupuesto: {limite}."
+            )
+            if self.modo == "error":
+                raise PresupuestoExcedido(mensaje)
+            logger_presupuestos.warning(mensaje)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        clase = getattr(view_func, "cls", None)
+        acciones = getattr(view_func, "actions", None)
+        if clase is None or not acciones:
+            return
+        accion = acciones.get(request.method.lower())
+        request._presupuesto_consultas = presupuesto(clase, accion)
+        request._presupuesto_origen = f"{clase.__name__}.{accion}"
+
+
+class CompresionMiddleware:
+    """
+    Comprime las respuestas con Brotli o gzip según Accept-Encoding (ver
+    core/compresion.py). COMPRESION_MIN_BYTES es el tamaño mínimo de las
+    respuestas normales; con COMPRESION=False no se comprime nada.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "COMPRESION", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.minimo = getattr(settings, "COMPRESION_MIN_BYTES", 1024)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not compresion.comprimible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        codificacion = compresion.negociar(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if codificacion is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compresion.acomprimir_flujo(
+                    response.streaming_content, codificacion
+                )
+            else:
+                response.streaming_content = compresion.comprimir_flujo(
+                    response.streaming_content, codificacion
+                )
+            # El tamaño comprimido no se conoce hasta terminar
+            del response.headers["Content-Length"]
+        else:
+            if len(response.content) < self.minimo:
+                return response
+            comprimido = compresion.comprimir(response.content, codificacion)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response.headers["Content-Length"] = str(len(comprimido))
+
+        # Un ETag fuerte identifica los bytes sin comprimir
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = codificacion
+        return response
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class VersionCatalogo(models.Model):
+    """
+    Sello de versión por catálogo. Cada cambio en un catálogo lo incrementa
+    para que todos los procesos (workers de gunicorn) invaliden su copia
+    en memoria (ver core/catalogos.py).
+    """
+
+    nombre = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.nombre} v{self.version}"
+
+
+class Eliminacion(models.Model):
+    """
+    Registro (tombstone) de un objeto eliminado, para que los clientes que
+    sincronizan con `?updated_since=` sepan qué quitar de su copia local.
+    """
+
+    modelo = models.CharField(max_length=100)
+    objeto_id = models.PositiveBigIntegerField()
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["modelo", "fecha"], name="eliminacion_modelo_fecha_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo}#{self.objeto_id}"
@@ -0,0 +1,26 @@
+"""
+Presupuestos de consultas SQL por acción.
+
+Cada viewset declara cuántas consultas puede costar cada acción,
+contando la petición completa (autenticación JWT y permisos incluidos):
+
+    class ProductoViewSet(viewsets.ModelViewSet):
+        presupuesto_consultas = {"list": 4, "retrieve": 4}
+
+Se verifican de dos formas:
+- core/tests.py recorre todas las acciones GET del router, con datos a
+  dos escalas, y falla si alguna no declara presupuesto o lo excede.
+- PresupuestoConsultasMiddleware (modo PRESUPUESTO_CONSULTAS) advierte o
+  lanza PresupuestoExcedido al excederse durante el desarrollo.
+"""
+
+
+class PresupuestoExcedido(Exception):
+    pass
+
+
+def presupuesto(vista, accion):
+    """
+    Presupuesto declarado para `accion` en la clase de vista, o None.
+    """
+    return getattr(vista, "presupuesto_consultas", {}).get(accion)
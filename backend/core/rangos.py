@@ -0,0 +1,47 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def _parse_fecha(valor, nombre, fin_de_dia=False):
+    """
+    Acepta `YYYY-MM-DD` o un datetime ISO 8601 y devuelve un datetime aware.
+    Una fecha sin hora se interpreta como inicio (o fin) del día.
+    """
+    try:
+        fecha = parse_date(valor)
+        if fecha is not None:
+            fecha_hora = datetime.combine(fecha, time.max if fin_de_dia else time.min)
+        else:
+            fecha_hora = parse_datetime(valor)
+        if fecha_hora is None:
+            raise ValueError
+    except ValueError:
+        raise ValidationError({nombre: "Fecha inválida, use YYYY-MM-DD o ISO 8601."})
+
+    if timezone.is_naive(fecha_hora):
+        fecha_hora = timezone.make_aware(fecha_hora)
+    return fecha_hora
+
+
+def rango_desde_params(params, requerido=False):
+    """
+    Lee `?desde=&hasta=` de los query params.
+
+    Devuelve (desde, hasta); cualquiera puede ser None si no se envió,
+    salvo que `requerido` sea True.
+    """
+    desde = params.get("desde")
+    hasta = params.get("hasta")
+
+    if requerido and not (desde and hasta):
+        raise ValidationError("Debe indicar los parámetros 'desde' y 'hasta'.")
+
+    desde = _parse_fecha(desde, "desde") if desde else None
+    hasta = _parse_fecha(hasta, "hasta", fin_de_dia=True) if hasta else None
+
+    if desde and hasta and desde > hasta:
+        raise ValidationError("'desde' no puede ser posterior a 'hasta'.")
+    return desde, hasta
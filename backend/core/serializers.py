@@ -0,0 +1,135 @@
+"""
+Resolución por lotes de campos PrimaryKeyRelatedField.
+
+`PrimaryKeyRelatedField` hace un `queryset.get(pk=...)` por cada valor:
+con `many=True` (por ejemplo `rol_ids`) o con listas de objetos
+(`Serializer(data=[...], many=True)`) eso se multiplica. Aquí se recogen
+todos los ids de la petición antes de validar y se resuelve cada campo
+con un único `in_bulk`.
+
+Uso:
+
+    class MiSerializer(BatchRelatedMixin, serializers.ModelSerializer):
+        serializer_related_field = BatchPrimaryKeyRelatedField
+
+        class Meta:
+            list_serializer_class = BatchRelatedListSerializer
+
+Los viewsets con AltaEnLoteMixin aceptan un POST con una lista de objetos,
+que se valida con many=True: la lista completa cuesta un `in_bulk` por
+campo relacionado.
+"""
+
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+# Objetos por alta en lote
+MAX_LOTE = 500
+
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Igual que PrimaryKeyRelatedField, pero si el serializer raíz ya precargó
+    los objetos del campo los toma de ahí en lugar de consultar la BD.
+    """
+
+    def pk_python(self, data):
+        if isinstance(data, bool):
+            raise TypeError(data)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def to_internal_value(self, data):
+        precargados = getattr(self.root, "_pks_resueltos", {}).get(self)
+        if precargados is None:
+            return super().to_internal_value(data)
+
+        try:
+            pk = self.pk_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        objeto = precargados.get(pk)
+        if objeto is None:
+            self.fail("does_not_exist", pk_value=data)
+        return objeto
+
+
+def _valores(item, campo, many):
+    if not isinstance(item, Mapping) or campo not in item:
+        return []
+    if many:
+        if hasattr(item, "getlist"):
+            return item.getlist(campo)
+        valores = item[campo]
+        return valores if isinstance(valores, (list, tuple)) else []
+    return [item[campo]]
+
+
+class BatchRelatedMixin:
+    """
+    Precarga con un `in_bulk` por campo todos los ids relacionados de los
+    datos de entrada (un objeto, o la lista completa si se usa many=True).
+    """
+
+    def _campos_batch(self):
+        for field in self.fields.values():
+            if field.read_only:
+                continue
+            if isinstance(field, serializers.ManyRelatedField):
+                relacion, many = field.child_relation, True
+            else:
+                relacion, many = field, False
+            if isinstance(relacion, BatchPrimaryKeyRelatedField):
+                yield field.field_name, relacion, many
+
+    def precargar_relaciones(self, items):
+        resueltos = self.root.__dict__.setdefault("_pks_resueltos", {})
+        for campo, relacion, many in self._campos_batch():
+            if relacion in resueltos:
+                continue
+            ids = set()
+            for item in items:
+                for valor in _valores(item, campo, many):
+                    try:
+                        ids.add(relacion.pk_python(valor))
+                    except (TypeError, ValueError, DjangoValidationError):
+                        # El error de tipo se informa al validar el campo
+                        pass
+            resueltos[relacion] = relacion.get_queryset().in_bulk(ids) if ids else {}
+
+    def to_internal_value(self, data):
+        self.precargar_relaciones([data])
+        return super().to_internal_value(data)
+
+
+class BatchRelatedListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list) and isinstance(self.child, BatchRelatedMixin):
+            self.child.precargar_relaciones(data)
+        return super().to_internal_value(data)
+
+
+class AltaEnLoteMixin:
+    """
+    Para ModelViewSet: un POST con una lista crea todos los objetos en una
+    transacción (todos o ninguno).
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "create" and isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        if not 0 < len(request.data) <= MAX_LOTE:
+            raise ValidationError(f"La lista debe tener entre 1 y {MAX_LOTE} objetos.")
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
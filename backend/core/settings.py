@@ -67,8 +67,21 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Entrega de archivos protegidos (ver core/descargas.py):
+# "" = los transmite Django, "accel" = X-Accel-Redirect (nginx),
+# "sendfile" = X-Sendfile (Apache/lighttpd)
+ARCHIVOS_ENTREGA = os.getenv("ARCHIVOS_ENTREGA", "")
+ARCHIVOS_ACCEL_PREFIJO = os.getenv("ARCHIVOS_ACCEL_PREFIJO", "/protegido/")
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Stock mantenido por triggers de BD (ver inventory/triggers.py)
+INVENTARIO_STOCK_TRIGGERS = os.getenv("INVENTARIO_STOCK_TRIGGERS", "False") == "True"
+
+# Antigüedad (días) a partir de la cual se archivan los movimientos
+# (manage.py archivar_movimientos, ver inventory/archivado.py)
+INVENTARIO_ARCHIVO_DIAS = int(os.getenv("INVENTARIO_ARCHIVO_DIAS", "365"))
+
 INSTALLED_APPS = [
     # Django
     "django.contrib.admin",
@@ -83,6 +96,7 @@ INSTALLED_APPS = [
     "corsheaders",
 
     # apps
+    "core",
     "accounts",
     "inventory",
     "people",
@@ -90,6 +104,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricasMiddleware",
+    "core.middleware.PresupuestoConsultasMiddleware",
+    "core.middleware.CompresionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -98,8 +115,26 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.CatalogosMiddleware",
 ]
 
+# Métricas Prometheus en /api/_metrics (ver core/metricas.py); sin token
+# el endpoint queda cerrado
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+# Registrar peticiones más lentas que este umbral (0 = desactivado)
+METRICAS_LENTO_MS = int(os.getenv("METRICAS_LENTO_MS", "0"))
+
+# Compresión Brotli/gzip de respuestas (ver core/compresion.py); Brotli
+# requiere el paquete opcional `brotli`
+COMPRESION = os.getenv("COMPRESION", "True") == "True"
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", "1024"))
+
+# Presupuestos de consultas por acción (ver core/presupuestos.py):
+# "advertir", "error" o "" (desactivado)
+PRESUPUESTO_CONSULTAS = os.getenv(
+    "PRESUPUESTO_CONSULTAS", "advertir" if DEBUG else ""
+)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -0,0 +1,336 @@
+"""
+Sincronización incremental para los listados de la API.
+
+Todos los modelos de dominio tienen `fecha_actualizacion` (auto_now,
+indexado) y cada eliminación deja un registro en `Eliminacion`. Con eso,
+cualquier listado acepta:
+
+    GET /api/productos/?updated_since=<cursor>
+
+y responde solo lo que cambió desde ese cursor:
+
+    {"cursor": "...", "cambios": [...], "eliminados": [ids]}
+
+El listado completo (sin parámetro) devuelve el cursor inicial en la
+cabecera `X-Sync-Cursor`. El cliente guarda el último cursor recibido y
+aplica `cambios` (upsert por id) y `eliminados` sobre su copia.
+
+Para que el feed no pierda cambios:
+- Los modelos usan SincronizableMixin y SincronizableQuerySet. Las
+  eliminaciones (también en cascada) se registran en bloque antes del
+  DELETE, sin señales por fila, así que Django conserva el borrado rápido.
+  update() en bloque fecha las filas (auto_now no aplica en UPDATE).
+- ANIDADOS declara qué payloads incluyen a otros modelos (tareas dentro
+  del evento, catálogos dentro del producto...). Guardar, actualizar o
+  eliminar un hijo actualiza la fecha de todos sus padres.
+"""
+
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+from functools import partial
+
+from django.db import connections, models, router, transaction
+from django.db.models.deletion import Collector
+from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import Eliminacion
+
+CAMPO = "fecha_actualizacion"
+
+# Las filas se fechan al guardarse pero se ven al confirmar la transacción:
+# se relee este margen hacia atrás para no perder escrituras que estaban en
+# curso al generar el cursor anterior. El cliente recibe duplicados (upsert).
+MARGEN = timedelta(seconds=5)
+
+# Payloads anidados de la API: (padre, ruta desde el padre, hijo)
+ANIDADOS = (
+    ("events.tarea", "subtareas", "events.subtarea"),
+    ("events.tarea", "responsable", "people.empleado"),
+    ("events.evento", "tareas", "events.tarea"),
+    ("events.documentoroi", "evento_relacionado", "events.evento"),
+    ("people.empleado", "cargo", "people.cargo"),
+    ("inventory.producto", "marca", "inventory.marca"),
+    ("inventory.producto", "categoria", "inventory.categoria"),
+    ("inventory.producto", "unidad_medida", "inventory.unidadmedida"),
+    ("inventory.producto", "tipo_estado", "inventory.tipoestado"),
+    ("accounts.usuario", "roles", "accounts.rol"),
+    ("accounts.usuario", "permisos", "accounts.permiso"),
+)
+
+# Hijo -> [(modelo padre, ruta)], incluidos los padres indirectos
+_padres = {}
+
+LOTE = 1000
+
+
+def sincronizable(modelo):
+    return any(f.name == CAMPO for f in modelo._meta.concrete_fields)
+
+
+def tocar_padres(modelo, filas, ahora=None):
+    """
+    Actualiza `fecha_actualizacion` de los padres cuyo payload incluye las
+    `filas` (pks o queryset de `modelo`). Un UPDATE por relación.
+    """
+    padres = _padres.get(modelo._meta.label_lower)
+    if not padres:
+        return
+    if isinstance(filas, models.QuerySet):
+        filas = filas.values("pk")
+    elif not filas:
+        return
+    ahora = ahora or timezone.now()
+    for padre, ruta in padres:
+        # _base_manager: UPDATE simple, sin volver a propagar
+        padre._base_manager.filter(**{f"{ruta}__in": filas}).update(**{CAMPO: ahora})
+
+
+def registrar_eliminaciones(queryset, fecha=None):
+    """
+    Registra las eliminaciones de las filas de `queryset` con un solo
+    INSERT ... SELECT. Llamar antes de borrarlas, en la misma transacción.
+    """
+    fecha = fecha or timezone.now()
+    seleccion, params = (
+        queryset.order_by()
+        .annotate(
+            _modelo=models.Value(
+                queryset.model._meta.label_lower, output_field=models.CharField()
+            ),
+            _fecha=models.Value(fecha, output_field=models.DateTimeField()),
+        )
+        .values_list("pk", "_modelo", "_fecha")
+        .query.sql_with_params()
+    )
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Eliminacion._meta.db_table} (objeto_id, modelo, fecha) "
+            f"{seleccion}",
+            params,
+        )
+
+
+class ColectorSincronizado(Collector):
+    """
+    Collector que, antes de borrar, registra en bloque las eliminaciones de
+    los modelos sincronizables y fecha las filas que quedan en NULL
+    (SET_NULL) y los padres de lo eliminado.
+    """
+
+    def delete(self):
+        with transaction.atomic(using=self.using):
+            self._registrar(timezone.now())
+            return super().delete()
+
+    def _registrar(self, ahora):
+        eliminaciones = []
+        for modelo, instancias in self.data.items():
+            if not sincronizable(modelo):
+                continue
+            pks = [instancia.pk for instancia in instancias]
+            etiqueta = modelo._meta.label_lower
+            eliminaciones.extend(
+                Eliminacion(modelo=etiqueta, objeto_id=pk, fecha=ahora) for pk in pks
+            )
+            tocar_padres(modelo, pks, ahora)
+        Eliminacion.objects.using(self.using).bulk_create(eliminaciones, batch_size=LOTE)
+
+        for queryset in self.fast_deletes:
+            if sincronizable(queryset.model):
+                registrar_eliminaciones(queryset, ahora)
+                tocar_padres(queryset.model, queryset, ahora)
+
+        for (campo, _valor), grupos in self.field_updates.items():
+            modelo = campo.model
+            if not sincronizable(modelo):
+                continue
+            for objetos in grupos:
+                if isinstance(objetos, models.QuerySet) and objetos._result_cache is None:
+                    filas = objetos.values("pk")
+                else:
+                    filas = [objeto.pk for objeto in objetos]
+                modelo._base_manager.filter(pk__in=filas).update(**{CAMPO: ahora})
+                tocar_padres(modelo, filas, ahora)
+
+
+class SincronizableQuerySet(models.QuerySet):
+    """
+    delete() registra las eliminaciones (con cascadas) en bloque; update()
+    fecha las filas y sus padres.
+    """
+
+    def delete(self):
+        # Igual que QuerySet.delete(), con ColectorSincronizado
+        if self.query.is_sliced:
+            raise TypeError("Cannot use 'limit' or 'offset' with delete().")
+        if self._fields is not None:
+            raise TypeError("Cannot call delete() after .values() or .values_list()")
+        consulta = self._chain()
+        consulta._for_write = True
+        consulta.query.select_for_update = False
+        consulta.query.select_related = False
+        consulta.query.clear_ordering(force=True)
+        colector = ColectorSincronizado(using=consulta.db, origin=self)
+        colector.collect(consulta)
+        resultado = colector.delete()
+        self._result_cache = None
+        return resultado
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def update(self, **kwargs):
+        ahora = kwargs.setdefault(CAMPO, timezone.now())
+        if not _padres.get(self.model._meta.label_lower):
+            return super().update(**kwargs)
+
+        relaciones = set()
+        for campo in self.model._meta.concrete_fields:
+            if campo.is_relation:
+                relaciones.update((campo.name, campo.attname))
+        with transaction.atomic(using=self.db):
+            pks = None
+            if relaciones.intersection(kwargs):
+                # Cambia el padre: se fechan el anterior y el nuevo
+                pks = list(self.values_list("pk", flat=True))
+            tocar_padres(self.model, self if pks is None else pks, ahora)
+            filas = super().update(**kwargs)
+            if pks is not None:
+                tocar_padres(self.model, pks, ahora)
+        return filas
+
+    update.alters_data = True
+
+
+class SincronizableMixin:
+    """
+    Mixin de modelo: delete() de una instancia registra su eliminación y
+    la de sus cascadas como SincronizableQuerySet.delete().
+    """
+
+    def delete(self, using=None, keep_parents=False):
+        if self.pk is None:
+            raise ValueError(
+                f"{self._meta.object_name} object can't be deleted because its "
+                f"{self._meta.pk.attname} attribute is set to None."
+            )
+        using = using or router.db_for_write(self.__class__, instance=self)
+        colector = ColectorSincronizado(using=using, origin=self)
+        colector.collect([self], keep_parents=keep_parents)
+        return colector.delete()
+
+    delete.alters_data = True
+
+
+def _formatear(cursor):
+    return cursor.isoformat().replace("+00:00", "Z")
+
+
+def _leer_cursor(valor):
+    try:
+        cursor = parse_datetime(valor)
+    except ValueError:
+        cursor = None
+    if cursor is None:
+        raise ValidationError(
+            {"updated_since": "Cursor inválido. Use el valor devuelto por la API."}
+        )
+    if timezone.is_naive(cursor):
+        cursor = cursor.replace(tzinfo=dt_timezone.utc)
+    return cursor
+
+
+def _padres_de(directos, hijo, visitados=()):
+    for padre, ruta in directos.get(hijo, ()):
+        if padre in visitados:
+            continue
+        yield padre, ruta
+        for abuelo, ruta_abuelo in _padres_de(directos, padre, (*visitados, hijo)):
+            yield abuelo, f"{ruta_abuelo}__{ruta}"
+
+
+def _antes_de_guardar(sender, instance, raw=False, **kwargs):
+    # Padres actuales en la BD: el guardado puede moverlo a otro padre
+    if not raw and not instance._state.adding and instance.pk is not None:
+        tocar_padres(sender, [instance.pk])
+
+
+def _despues_de_guardar(sender, instance, raw=False, **kwargs):
+    if not raw:
+        tocar_padres(sender, [instance.pk])
+
+
+def _relacion_cambiada(campo, sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    ahora = timezone.now()
+    if not reverse:
+        instance.__class__._base_manager.filter(pk=instance.pk).update(**{CAMPO: ahora})
+    elif action == "pre_clear":
+        model._base_manager.filter(**{campo.name: instance}).update(**{CAMPO: ahora})
+    elif pk_set:
+        model._base_manager.filter(pk__in=pk_set).update(**{CAMPO: ahora})
+
+
+def conectar(modelos):
+    """
+    Conecta la propagación de cambios a los padres (ANIDADOS) y a las
+    relaciones muchos a muchos de los modelos sincronizables.
+    """
+    modelos = {modelo._meta.label_lower: modelo for modelo in modelos}
+    directos = defaultdict(list)
+    for padre, ruta, hijo in ANIDADOS:
+        directos[hijo].append((padre, ruta))
+
+    _padres.clear()
+    for hijo in directos:
+        _padres[hijo] = [
+            (modelos[padre], ruta) for padre, ruta in _padres_de(directos, hijo)
+        ]
+        pre_save.connect(_antes_de_guardar, sender=modelos[hijo], weak=False)
+        post_save.connect(_despues_de_guardar, sender=modelos[hijo], weak=False)
+
+    for modelo in modelos.values():
+        if not sincronizable(modelo):
+            continue
+        for campo in modelo._meta.local_many_to_many:
+            m2m_changed.connect(
+                partial(_relacion_cambiada, campo),
+                sender=campo.remote_field.through,
+                weak=False,
+            )
+
+
+class SincronizacionMixin:
+    """
+    Agrega `?updated_since=` al `list` de un ModelViewSet. Respeta
+    `get_queryset()` y los filtros del viewset.
+    """
+
+    def list(self, request, *args, **kwargs):
+        cursor = timezone.now()
+        desde = request.query_params.get("updated_since")
+        if desde is None:
+            response = super().list(request, *args, **kwargs)
+            response["X-Sync-Cursor"] = _formatear(cursor)
+            return response
+
+        desde = _leer_cursor(desde) - MARGEN
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{f"{CAMPO}__gte": desde}
+        )
+        eliminados = Eliminacion.objects.filter(
+            modelo=queryset.model._meta.label_lower, fecha__gte=desde
+        ).values_list("objeto_id", flat=True)
+
+        return Response(
+            {
+                "cursor": _formatear(cursor),
+                "cambios": self.get_serializer(queryset, many=True).data,
+                "eliminados": sorted(set(eliminados)),
+            }
+        )
@@ -0,0 +1,857 @@
+import asyncio
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+
+from django.db import connection
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Permiso, Rol, Usuario
+from accounts.serializers import UsuarioWriteSerializer
+from events.models import DocumentoROI, Evento, SubTarea, Tarea
+from events.serializers import EventoSerializer, TareaWriteSerializer
+from inventory.models import (
+    Categoria,
+    Marca,
+    MovimientoInventario,
+    Producto,
+    TipoEstado,
+    UnidadMedida,
+)
+from people.models import Cargo, Empleado
+
+from . import cambios, catalogos, compresion, metricas
+from .catalogos import registro
+from .models import Eliminacion, VersionCatalogo
+from .middleware import CompresionMiddleware
+from .presupuestos import presupuesto
+from .sincronizacion import _formatear
+from .urls import router
+
+# Filas por modelo que agrega cada llamada a _poblar
+ESCALA = 3
+
+
+# Parámetros de consulta por (basename, acción), para acciones que los necesitan
+PARAMETROS = {
+    ("empleado", "carga_general"): {"solo_conflictos": "true"},
+}
+
+
+def setUpModule():
+    # Los adjuntos ROI de _poblar van a un directorio temporal del módulo
+    media = tempfile.mkdtemp()
+    ajuste = override_settings(MEDIA_ROOT=media)
+    ajuste.enable()
+    unittest.addModuleCleanup(shutil.rmtree, media, ignore_errors=True)
+    unittest.addModuleCleanup(ajuste.disable)
+
+
+def _poblar(n, prefijo):
+    ahora = timezone.now()
+    rol = Rol.objects.create(nombre=f"Rol {prefijo}", slug=f"rol-{prefijo}")
+    permiso = Permiso.objects.create(nombre=f"Permiso {prefijo}")
+    cargo = Cargo.objects.create(nombre=f"Cargo {prefijo}")
+    marca = Marca.objects.create(nombre=f"Marca {prefijo}")
+    categoria = Categoria.objects.create(nombre=f"Categoría {prefijo}")
+    unidad = UnidadMedida.objects.create(nombre=f"Unidad {prefijo}", nomenclatura="u")
+    tipo = TipoEstado.objects.create(nombre=f"Estado {prefijo}")
+
+    for i in range(n):
+        usuario = Usuario.objects.create(
+            username=f"{prefijo}-{i}", email=f"{prefijo}-{i}@example.com"
+        )
+        usuario.roles.add(rol)
+        usuario.permisos.add(permiso)
+        empleado = Empleado.objects.create(
+            usuario=usuario, nombres=f"Nombre {i}", apellidos=prefijo, cargo=cargo
+        )
+        producto = Producto.objects.create(
+            codigo_producto=f"{prefijo}-{i}",
+            nombre=f"Producto {i}",
+            stock_minimo_inicial=1,
+            stock=0,
+            unidad_medida=unidad,
+            tipo_estado=tipo,
+            marca=marca,
+            categoria=categoria,
+        )
+        MovimientoInventario.objects.create(producto=producto, tipo="entrada", cantidad=5)
+        MovimientoInventario.objects.create(producto=producto, tipo="salida", cantidad=2)
+        evento = Evento.objects.create(
+            nombre=f"Evento {prefijo}-{i}",
+            fecha_inicio=ahora,
+            fecha_fin=ahora + timedelta(days=2),
+        )
+        for j in range(2):
+            tarea = Tarea.objects.create(
+                evento=evento,
+                nombre=f"Tarea {j}",
+                fecha_inicio=ahora + timedelta(hours=j),
+                fecha_fin=ahora + timedelta(hours=j + 3),
+                responsable=empleado,
+            )
+            SubTarea.objects.create(tarea=tarea, nombre=f"Subtarea {j}")
+        documento = DocumentoROI(
+            codigo=f"ROI-{prefijo}-{i}",
+            titulo=f"ROI {i}",
+            fecha_evento=ahora.date() + timedelta(days=10),
+            fecha_limite_oferta=ahora.date() + timedelta(days=2),
+            evento_relacionado=evento,
+            creado_por=usuario,
+        )
+        documento.archivo.save(f"roi-{prefijo}-{i}.pdf", ContentFile(b"%PDF-1.4"))
+
+
+def _rutas(viewset):
+    """
+    (acción, detalle, nombre de ruta) de las acciones GET del viewset.
+    """
+    rutas = [("list", False, "list"), ("retrieve", True, "detail")]
+    for extra in viewset.get_extra_actions():
+        if "get" in extra.mapping:
+            rutas.append((extra.__name__, extra.detail, extra.url_name))
+    return rutas
+
+
+class PresupuestoConsultasTests(TestCase):
+    """
+    Cada endpoint GET del router debe respetar el presupuesto de consultas
+    declarado en su viewset (`presupuesto_consultas`), y no crecer con los
+    datos: se mide antes y después de multiplicar las filas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        _poblar(ESCALA, "base")
+
+    def setUp(self):
+        # Autenticación real con JWT: el presupuesto incluye cargar el usuario
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.admin).access_token}"
+        )
+
+    def _get(self, url, params):
+        response = self.client.get(url, params)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+
+    def _consultas(self, url, params):
+        # Llamada en frío: sin catálogos en memoria ni reportes cacheados
+        registro.descartar()
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            self._get(url, params)
+        return len(consultas)
+
+    def _verificar(self, basename, viewset, accion, detalle, nombre_ruta):
+        limite = presupuesto(viewset, accion)
+        self.assertIsNotNone(
+            limite,
+            f"{viewset.__name__} no declara presupuesto_consultas para '{accion}'.",
+        )
+        modelo = viewset.queryset.model
+        args = [modelo.objects.order_by("pk").first().pk] if detalle else []
+        url = reverse(f"{basename}-{nombre_ruta}", args=args)
+        params = PARAMETROS.get((basename, accion), {})
+
+        antes = self._consultas(url, params)
+        _poblar(ESCALA * 3, "extra")
+        despues = self._consultas(url, params)
+
+        self.assertLessEqual(antes, limite, url)
+        # El costo no debe crecer con los datos (sin N+1)
+        self.assertEqual(despues, antes, url)
+
+
+def _generar_pruebas():
+    for _prefijo, viewset, basename in router.registry:
+        for accion, detalle, nombre_ruta in _rutas(viewset):
+
+            def prueba(self, _datos=(basename, viewset, accion, detalle, nombre_ruta)):
+                self._verificar(*_datos)
+
+            nombre = f"test_{basename.replace('-', '_')}_{accion}"
+            setattr(PresupuestoConsultasTests, nombre, prueba)
+
+
+_generar_pruebas()
+
+
+class SincronizacionTests(TestCase):
+    """
+    Feed `?updated_since=`: registro de eliminaciones en bloque (también en
+    cascada) y fecha de los padres cuando cambia un hijo anidado.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        _poblar(ESCALA, "base")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        # Todo queda fechado hace una hora; el cursor es de hace media hora
+        self.antes = timezone.now() - timedelta(hours=1)
+        for modelo in (Producto, Marca, Empleado, Cargo, Evento, Tarea, SubTarea, DocumentoROI):
+            modelo.objects.update(fecha_actualizacion=self.antes)
+        self.cursor = _formatear(self.antes + timedelta(minutes=30))
+
+    def _feed(self, basename):
+        response = self.client.get(
+            reverse(f"{basename}-list"), {"updated_since": self.cursor}
+        )
+        self.assertEqual(response.status_code, 200)
+        return {fila["id"] for fila in response.data["cambios"]}, response.data["eliminados"]
+
+    def _eliminados(self, modelo):
+        return set(
+            Eliminacion.objects.filter(modelo=modelo._meta.label_lower).values_list(
+                "objeto_id", flat=True
+            )
+        )
+
+    def test_eliminacion_en_bloque_con_cascada(self):
+        productos = set(Producto.objects.values_list("pk", flat=True))
+        movimientos = set(MovimientoInventario.objects.values_list("pk", flat=True))
+        with CaptureQueriesContext(connection) as pocas:
+            Producto.objects.filter(pk__in=list(productos)[:1]).delete()
+        _poblar(ESCALA * 3, "extra")
+        productos |= set(Producto.objects.values_list("pk", flat=True))
+        movimientos |= set(MovimientoInventario.objects.values_list("pk", flat=True))
+
+        with CaptureQueriesContext(connection) as muchas:
+            Producto.objects.all().delete()
+
+        # Sin consultas por fila: el costo no crece con las filas borradas
+        self.assertEqual(len(muchas), len(pocas))
+        self.assertEqual(self._eliminados(Producto), productos)
+        self.assertEqual(self._eliminados(MovimientoInventario), movimientos)
+        cambios, eliminados = self._feed("movimiento")
+        self.assertEqual(set(eliminados), movimientos)
+
+    def test_eliminar_instancia_registra_cascada(self):
+        evento = Evento.objects.first()
+        tareas = set(evento.tareas.values_list("pk", flat=True))
+        subtareas = set(
+            SubTarea.objects.filter(tarea__evento=evento).values_list("pk", flat=True)
+        )
+        documento = evento.documentos_roi.get()
+
+        evento.delete()
+
+        self.assertEqual(self._eliminados(Tarea), tareas)
+        self.assertEqual(self._eliminados(SubTarea), subtareas)
+        # SET_NULL: el documento cambió aunque no se eliminó
+        cambios, eliminados = self._feed("documento-roi")
+        self.assertEqual(cambios, {documento.pk})
+        self.assertEqual(eliminados, [])
+
+    def test_cambio_de_hijo_actualiza_padres(self):
+        subtarea = SubTarea.objects.select_related("tarea__evento").first()
+        subtarea.completada = True
+        subtarea.save()
+        evento = subtarea.tarea.evento
+
+        self.assertEqual(self._feed("evento")[0], {evento.pk})
+        self.assertEqual(self._feed("tarea")[0], {subtarea.tarea_id})
+        self.assertEqual(
+            self._feed("documento-roi")[0],
+            set(evento.documentos_roi.values_list("pk", flat=True)),
+        )
+
+    def test_update_en_bloque_y_catalogos_actualizan_padres(self):
+        Marca.objects.update(nombre="Renombrada")
+        self.assertEqual(
+            self._feed("producto")[0], set(Producto.objects.values_list("pk", flat=True))
+        )
+
+        empleado = Empleado.objects.first()
+        Cargo.objects.filter(empleados=empleado).delete()
+        self.assertIn(empleado.pk, self._feed("empleado")[0])
+        self.assertIn(empleado.tareas.first().evento_id, self._feed("evento")[0])
+
+    def test_mover_hijo_actualiza_padre_anterior_y_nuevo(self):
+        origen, destino = Evento.objects.order_by("pk")[:2]
+        Tarea.objects.filter(evento=origen).update(evento=destino)
+        self.assertEqual(self._feed("evento")[0], {origen.pk, destino.pk})
+
+    def test_cursor(self):
+        response = self.client.get(reverse("marca-list"))
+        self.assertIn("X-Sync-Cursor", response)
+        for invalido in ("ayer", "2025-02-30T10:00:00Z"):
+            response = self.client.get(reverse("marca-list"), {"updated_since": invalido})
+            self.assertEqual(response.status_code, 400, invalido)
+
+
+class RelacionesEnLoteTests(TestCase):
+    """
+    BatchPrimaryKeyRelatedField: un in_bulk por campo para un objeto o para
+    una lista completa, con los mismos errores que PrimaryKeyRelatedField.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        ahora = timezone.now()
+        cls.eventos = Evento.objects.bulk_create(
+            Evento(nombre=f"Evento {i}", fecha_inicio=ahora, fecha_fin=ahora)
+            for i in range(3)
+        )
+        cls.empleado = Empleado.objects.create(nombres="Ana", apellidos="Pérez")
+        cls.roles = Rol.objects.bulk_create(
+            Rol(nombre=f"Rol {i}", slug=f"rol-{i}") for i in range(10)
+        )
+
+    def _tareas(self, n):
+        return [
+            {
+                "nombre": f"Tarea {i}",
+                "evento": self.eventos[i % 3].pk,
+                "responsable": self.empleado.pk,
+            }
+            for i in range(n)
+        ]
+
+    def test_lista_un_in_bulk_por_campo(self):
+        for n in (1, 30):
+            serializer = TareaWriteSerializer(data=self._tareas(n), many=True)
+            with CaptureQueriesContext(connection) as consultas:
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+            # evento y responsable
+            self.assertEqual(len(consultas), 2, n)
+        self.assertEqual(serializer.validated_data[4]["evento"], self.eventos[1])
+
+    def test_many_true_un_in_bulk(self):
+        serializer = UsuarioWriteSerializer(
+            data={
+                "username": "nuevo",
+                "email": "nuevo@example.com",
+                "password": "clave-segura",
+                "rol_ids": [rol.pk for rol in self.roles],
+            }
+        )
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len([c for c in consultas if "accounts_rol" in c["sql"]]), 1)
+        self.assertEqual(serializer.validated_data["roles"], self.roles)
+
+    def test_errores(self):
+        datos = self._tareas(3)
+        datos[1]["evento"] = 999_999
+        datos[2]["responsable"] = "x"
+        serializer = TareaWriteSerializer(data=datos, many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(set(serializer.errors), {1, 2})
+        self.assertEqual(serializer.errors[1]["evento"][0].code, "does_not_exist")
+        self.assertEqual(serializer.errors[2]["responsable"][0].code, "incorrect_type")
+
+    def test_alta_en_lote(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(reverse("tarea-list"), self._tareas(5), format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(Tarea.objects.count(), 5)
+
+        # Todos o ninguno
+        datos = self._tareas(3)
+        datos[2]["evento"] = 999_999
+        response = client.post(reverse("tarea-list"), datos, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Tarea.objects.count(), 5)
+
+        response = client.post(reverse("tarea-list"), [], format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class BatchTests(TestCase):
+    """
+    POST /api/batch/: sub-solicitudes GET de los viewsets del router.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        _poblar(1, "base")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _batch(self, *solicitudes):
+        response = self.client.post(
+            reverse("batch"), {"solicitudes": list(solicitudes)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return [(r["id"], r["status"], r["body"]) for r in response.data["resultados"]]
+
+    def test_resultados_en_orden(self):
+        producto = Producto.objects.get()
+        resultados = self._batch(
+            "/api/marcas/",
+            {"id": "producto", "url": f"/api/productos/{producto.pk}/"},
+            "/api/productos/0/",
+        )
+        self.assertEqual(
+            [r[:2] for r in resultados], [(0, 200), ("producto", 200), (2, 404)]
+        )
+        self.assertEqual(resultados[0][2][0]["nombre"], "Marca base")
+        self.assertEqual(resultados[1][2]["codigo_producto"], producto.codigo_producto)
+
+    def test_solo_viewsets_sin_streaming(self):
+        producto = Producto.objects.get()
+        for url in (
+            "/api/batch/",
+            "/api/stream/",
+            "/api/_metrics",
+            "/api/calendario/",
+            "/admin/",
+            f"/api/productos/{producto.pk}/kardex/",
+            "/api/productos/kardex/",
+        ):
+            [(_id, codigo, cuerpo)] = self._batch(url)
+            self.assertEqual(codigo, 400, url)
+            self.assertIn("detail", cuerpo)
+
+
+class CambiosTests(TestCase):
+    """
+    Hub de cambios: canales por rol, entrega entre hilos, desborde de la
+    cola, publicación al confirmar y el endpoint SSE.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user("sse", "sse@example.com", "clave")
+        cls.usuario.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        cls.ti = Usuario.objects.create_user("ti", "ti@example.com", "clave")
+        cls.ti.roles.add(Rol.objects.create(nombre="Responsable TI", slug="resp_ti"))
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        cls.producto = Producto.objects.create(
+            codigo_producto="SSE-1",
+            nombre="SSE",
+            stock_minimo_inicial=0,
+            stock=0,
+            unidad_medida=unidad,
+            tipo_estado=TipoEstado.objects.create(nombre="Activo"),
+        )
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.hub = cambios.HubCambios()
+
+    def _suscribir(self, canales):
+        async def suscribir():
+            return self.hub.suscribir(canales)
+
+        return self.loop.run_until_complete(suscribir())
+
+    def _recibidos(self, suscripcion):
+        # Corre las entregas pendientes (call_soon_threadsafe) y vacía la cola
+        self.loop.run_until_complete(asyncio.sleep(0))
+        eventos = []
+        while not suscripcion.cola.empty():
+            eventos.append(suscripcion.cola.get_nowait())
+        return eventos
+
+    def _token(self, usuario):
+        return str(RefreshToken.for_user(usuario).access_token)
+
+    def test_canales_permitidos(self):
+        self.assertEqual(cambios.canales_permitidos(["admin"]), {"stock", "roi"})
+        self.assertEqual(
+            cambios.canales_permitidos(["resp_adm_contable"]), {"stock", "roi"}
+        )
+        self.assertEqual(cambios.canales_permitidos(["resp_ti"]), set())
+
+    def test_publicar_desde_otro_hilo(self):
+        stock = self._suscribir({"stock"})
+        roi = self._suscribir({"roi"})
+        hilo = threading.Thread(target=self.hub.publicar, args=("stock", {"n": 1}))
+        hilo.start()
+        hilo.join()
+        self.assertEqual(self._recibidos(stock), [("stock", {"n": 1})])
+        self.assertEqual(self._recibidos(roi), [])
+
+        self.hub.cancelar(stock)
+        self.assertFalse(self.hub.hay_suscriptores("stock"))
+        self.assertTrue(self.hub.hay_suscriptores("roi"))
+
+    def test_cola_llena_marca_desborde(self):
+        with mock.patch.object(cambios, "TAMANO_COLA", 2):
+            suscripcion = self._suscribir({"stock"})
+        for n in range(3):
+            self.hub.publicar("stock", {"n": n})
+        self.assertEqual(len(self._recibidos(suscripcion)), 2)
+        self.assertTrue(suscripcion.desbordada)
+
+    def test_loop_cerrado_cancela_la_suscripcion(self):
+        self._suscribir({"stock"})
+        self.loop.close()
+        self.hub.publicar("stock", {"n": 1})
+        self.assertFalse(self.hub.hay_suscriptores("stock"))
+
+    def test_publicar_al_confirmar(self):
+        datos = mock.Mock(return_value=[{"n": 1}])
+        # Sin suscriptores ni siquiera se calculan los datos
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hub.publicar_al_confirmar("stock", datos)
+        datos.assert_not_called()
+
+        suscripcion = self._suscribir({"stock"})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hub.publicar_al_confirmar("stock", datos)
+            self.assertEqual(self._recibidos(suscripcion), [])
+        self.assertEqual(self._recibidos(suscripcion), [("stock", {"n": 1})])
+
+    def test_movimiento_publica_stock(self):
+        with mock.patch("inventory.models.hub", self.hub):
+            suscripcion = self._suscribir({"stock"})
+            with self.captureOnCommitCallbacks(execute=True):
+                MovimientoInventario.objects.create(
+                    producto=self.producto, tipo="entrada", cantidad=4
+                )
+        self.assertEqual(
+            self._recibidos(suscripcion),
+            [("stock", {"producto": self.producto.pk, "stock": 4})],
+        )
+
+    def test_endpoint(self):
+        url = reverse("stream-cambios")
+        self.assertEqual(self.client.get(url).status_code, 501)
+
+        @async_to_sync
+        async def pedir(token=None):
+            datos = {} if token is None else {"token": token}
+            response = await AsyncClient().get(url, datos)
+            if not response.streaming:
+                return response.status_code, None
+            contenido = aiter(response.streaming_content)
+            primero = await anext(contenido)
+            await contenido.aclose()
+            return response.status_code, primero
+
+        self.assertEqual(pedir()[0], 401)
+        self.assertEqual(pedir("x")[0], 401)
+
+        # Los roles salen de la base, no de los claims del token
+        token = RefreshToken.for_user(self.ti).access_token
+        token["roles"] = ["admin"]
+        self.assertEqual(pedir(str(token))[0], 403)
+
+        codigo, primero = pedir(self._token(self.usuario))
+        self.assertEqual(codigo, 200)
+        self.assertEqual(primero, b"retry: 3000\n\n")
+
+        token = self._token(self.usuario)
+        Usuario.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        self.assertEqual(pedir(token)[0], 401)
+
+
+class DescargasTests(TestCase):
+    """
+    Descarga de adjuntos ROI: permisos, Range, ETag/Last-Modified y
+    entrega por el servidor web.
+    """
+
+    CONTENIDO = bytes(range(256)) * 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user("admin", "admin@example.com", "clave")
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        cls.ti = Usuario.objects.create_user("ti", "ti@example.com", "clave")
+        cls.ti.roles.add(Rol.objects.create(nombre="Responsable TI", slug="resp_ti"))
+        cls.documento = DocumentoROI(codigo="D-1", titulo="Adjunto")
+        cls.documento.archivo.save("adjunto.pdf", ContentFile(cls.CONTENIDO))
+        cls.url = reverse("documento-roi-archivo", args=[cls.documento.pk])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _get(self, cabeceras=None):
+        response = self.client.get(self.url, headers=cabeceras)
+        self.addCleanup(response.close)
+        return response
+
+    def _cuerpo(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_permisos(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self._get().status_code, 401)
+        self.client.force_authenticate(self.ti)
+        self.assertEqual(self._get().status_code, 403)
+
+        sin_archivo = DocumentoROI.objects.create(
+            codigo="D-2", titulo="Sin archivo", enlace_documento="https://example.com"
+        )
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(
+            reverse("documento-roi-archivo", args=[sin_archivo.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_archivo_completo(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._cuerpo(response), self.CONTENIDO)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        self.assertTrue(response["Content-Disposition"].startswith("inline"))
+
+        response = self.client.get(self.url, {"descargar": "1"})
+        self.addCleanup(response.close)
+        self.assertTrue(response["Content-Disposition"].startswith("attachment"))
+
+    def test_range(self):
+        total = len(self.CONTENIDO)
+        for rango, inicio, fin in (
+            ("bytes=10-19", 10, 19),
+            ("bytes=1000-", 1000, total - 1),
+            ("bytes=-5", total - 5, total - 1),
+            ("bytes=1020-5000", 1020, total - 1),
+        ):
+            response = self._get({"Range": rango})
+            self.assertEqual(response.status_code, 206, rango)
+            self.assertEqual(response["Content-Range"], f"bytes {inicio}-{fin}/{total}")
+            self.assertEqual(self._cuerpo(response), self.CONTENIDO[inicio : fin + 1])
+
+        for rango in (f"bytes={total}-", "bytes=-0"):
+            response = self._get({"Range": rango})
+            self.assertEqual(response.status_code, 416, rango)
+            self.assertEqual(response["Content-Range"], f"bytes */{total}")
+
+        # Varios rangos o sintaxis inválida: se ignora y va el archivo completo
+        for rango in ("bytes=0-1,5-6", "bytes=9-3", "items=0-1"):
+            response = self._get({"Range": rango})
+            self.assertEqual(response.status_code, 200, rango)
+
+    def test_etag_e_if_range(self):
+        etag = self._get()["ETag"]
+        ultima = self._get()["Last-Modified"]
+        self.assertEqual(self._get({"If-None-Match": etag}).status_code, 304)
+        debil = self._get({"If-None-Match": f'W/{etag}, "x"'})
+        self.assertEqual(debil.status_code, 304)
+        self.assertEqual(self._get({"If-None-Match": '"otro"'}).status_code, 200)
+        self.assertEqual(self._get({"If-Modified-Since": ultima}).status_code, 304)
+
+        response = self._get({"Range": "bytes=0-9", "If-Range": etag})
+        self.assertEqual(response.status_code, 206)
+        # El archivo cambió desde que el cliente guardó el ETag: va completo
+        response = self._get({"Range": "bytes=0-9", "If-Range": '"viejo"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_entrega_por_el_servidor_web(self):
+        with override_settings(
+            ARCHIVOS_ENTREGA="accel", ARCHIVOS_ACCEL_PREFIJO="/protegido/"
+        ):
+            response = self._get({"Range": "bytes=0-9"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protegido/{self.documento.archivo.name}"
+        )
+        with override_settings(ARCHIVOS_ENTREGA="sendfile"):
+            response = self._get()
+        self.assertEqual(response["X-Sendfile"], self.documento.archivo.path)
+
+
+class MetricasTests(TestCase):
+    """
+    /api/_metrics: acceso solo con token y series por vista, incluida la
+    de serialización.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        Marca.objects.create(nombre="Acme")
+
+    def setUp(self):
+        metricas.registro.reiniciar()
+
+    def test_sin_token_configurado_no_se_publica(self):
+        with override_settings(METRICAS_TOKEN=""):
+            response = self.client.get(reverse("metricas"))
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICAS_TOKEN="secreto")
+    def test_token(self):
+        url = reverse("metricas")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer otro")
+        self.assertEqual(response.status_code, 401)
+
+        api = APIClient()
+        api.force_authenticate(self.admin)
+        api.get(reverse("marca-list"))
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertEqual(response.status_code, 200)
+        texto = response.content.decode()
+        etiquetas = 'vista="MarcaViewSet",accion="list",metodo="GET"'
+        self.assertIn(f'http_requests_total{{{etiquetas},estado="200"}} 1', texto)
+        self.assertIn(f"http_request_serializer_seconds_count{{{etiquetas}}} 1", texto)
+
+    def test_serializacion_se_mide_una_vez_por_nivel(self):
+        ahora = timezone.now()
+        evento = Evento.objects.create(
+            nombre="Feria", fecha_inicio=ahora, fecha_fin=ahora
+        )
+        Tarea.objects.create(evento=evento, nombre="Montaje")
+        medicion = metricas.Medicion()
+        token = metricas.medicion_actual.set(medicion)
+        try:
+            EventoSerializer([evento, evento], many=True).data
+        finally:
+            metricas.medicion_actual.reset(token)
+        self.assertGreater(medicion.serializacion, 0)
+        self.assertEqual(medicion._profundidad, 0)
+        # Sin medición en curso no se acumula nada ni falla
+        self.assertEqual(len(EventoSerializer(evento).data["tareas"]), 1)
+
+
+class CatalogosTests(TestCase):
+    """
+    El registro en memoria se invalida con las operaciones en bloque y con
+    los cambios de otros procesos, también fuera de una petición.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.marca = Marca.objects.create(nombre="Original")
+
+    def setUp(self):
+        registro.descartar()
+        registro.marcar_pendiente()
+
+    def _version(self):
+        return (
+            VersionCatalogo.objects.filter(nombre="inventory.marca")
+            .values_list("version", flat=True)
+            .first()
+            or 0
+        )
+
+    def test_update_en_bloque_invalida_y_versiona(self):
+        self.assertEqual(registro.obtener(Marca, self.marca.pk)["nombre"], "Original")
+        version = self._version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Marca.objects.filter(pk=self.marca.pk).update(nombre="Renombrada")
+        self.assertEqual(self._version(), version + 1)
+        self.assertEqual(
+            registro.obtener(Marca, self.marca.pk)["nombre"], "Renombrada"
+        )
+
+    def test_bulk_create_del_importador_versiona(self):
+        version = self._version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Marca.objects.bulk_create([Marca(nombre="Nueva")])
+        self.assertEqual(self._version(), version + 1)
+
+    def test_cambio_de_otro_proceso_sin_middleware(self):
+        self.assertEqual(registro.obtener(Marca, self.marca.pk)["nombre"], "Original")
+        # Otro proceso: escribe sin pasar por este registro y sube la versión
+        Marca._base_manager.filter(pk=self.marca.pk).update(nombre="Remota")
+        VersionCatalogo.objects.update_or_create(
+            nombre="inventory.marca", defaults={"version": self._version() + 1}
+        )
+
+        # Sin middleware (comando, hilo propio): vale la copia hasta que vence
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(
+                registro.obtener(Marca, self.marca.pk)["nombre"], "Original"
+            )
+        self.assertEqual(len(consultas), 0)
+        ahora = catalogos.time.monotonic() + catalogos.VIGENCIA
+        with mock.patch.object(catalogos.time, "monotonic", return_value=ahora):
+            self.assertEqual(registro.obtener(Marca, self.marca.pk)["nombre"], "Remota")
+
+
+@override_settings(COMPRESION_MIN_BYTES=1024)
+class CompresionTests(SimpleTestCase):
+    CUERPO = json.dumps([{"id": i, "nombre": f"Producto {i}"} for i in range(200)]).encode()
+
+    def _procesar(self, response, aceptadas="gzip"):
+        peticion = RequestFactory().get("/api/productos/", HTTP_ACCEPT_ENCODING=aceptadas)
+        return CompresionMiddleware(lambda request: response)(peticion)
+
+    def test_json_grande_se_comprime(self):
+        response = self._procesar(HttpResponse(self.CUERPO, content_type="application/json"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), self.CUERPO)
+
+    def test_bajo_el_umbral_o_sin_gzip_no_se_comprime(self):
+        chica = self._procesar(HttpResponse(b'{"id": 1}', content_type="application/json"))
+        rechazada = self._procesar(
+            HttpResponse(self.CUERPO, content_type="application/json"), "gzip;q=0"
+        )
+        for response in (chica, rechazada):
+            self.assertFalse(response.has_header("Content-Encoding"))
+            self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_streaming_se_comprime_por_bloques(self):
+        partes = [self.CUERPO[i : i + 100] for i in range(0, len(self.CUERPO), 100)]
+        response = self._procesar(
+            StreamingHttpResponse(iter(partes), content_type="application/json")
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), self.CUERPO
+        )
+
+    def test_archivos_y_eventos_no_se_comprimen(self):
+        archivo = FileResponse(iter([self.CUERPO]), content_type="text/plain")
+        eventos = StreamingHttpResponse(
+            iter([b"data: 1\n\n"]), content_type="text/event-stream"
+        )
+        parcial = HttpResponse(self.CUERPO, content_type="text/plain", status=206)
+        for response in (archivo, eventos, parcial):
+            self.assertFalse(self._procesar(response).has_header("Content-Encoding"))
+
+    def test_negociacion(self):
+        self.assertIsNone(compresion.negociar(""))
+        self.assertIsNone(compresion.negociar("identity"))
+        self.assertEqual(compresion.negociar("gzip, deflate"), "gzip")
+        self.assertIsNone(compresion.negociar("*;q=0"))
+        self.assertIn(compresion.negociar("*"), compresion.COMPRESORES)
@@ -5,6 +5,9 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.metricas import vista_metricas
+from core.views import BatchView, stream_cambios
+
 from accounts.views import (
     CustomTokenObtainPairView,
     UsuarioViewSet,
@@ -25,6 +28,7 @@ from events.views import (
     TareaViewSet,
     SubTareaViewSet,
     DocumentoROIViewSet,
+    CalendarioView,
 )
 
 router = DefaultRouter()
@@ -54,6 +58,10 @@ router.register(r"documentos-roi", DocumentoROIViewSet, basename="documento-roi"
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/calendario/", CalendarioView.as_view(), name="calendario"),
+    path("api/batch/", BatchView.as_view(), name="batch"),
+    path("api/stream/", stream_cambios, name="stream-cambios"),
+    path("api/_metrics", vista_metricas, name="metricas"),
     path("api/", include(router.urls)),
     path(
         "api/auth/token/",
@@ -0,0 +1,265 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import (
+    Http404,
+    HttpRequest,
+    JsonResponse,
+    QueryDict,
+    StreamingHttpResponse,
+)
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.viewsets import ViewSetMixin
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cambios import canales_permitidos, hub
+
+MAX_SOLICITUDES = 20
+MAX_HILOS = 4
+
+# Segundos sin eventos antes de enviar un comentario de keep-alive
+SSE_HEARTBEAT = 15
+
+# Cabeceras del request original que no aplican a una sub-solicitud GET
+_META_EXCLUIDO = {"CONTENT_LENGTH", "CONTENT_TYPE", "QUERY_STRING", "PATH_INFO"}
+
+
+def _sub_request(request, path, query):
+    """
+    Construye un GET interno que reutiliza el usuario ya autenticado:
+    DRF toma `_force_auth_user` en lugar de volver a validar el JWT.
+    """
+    sub = HttpRequest()
+    sub.method = "GET"
+    sub.path = sub.path_info = path
+    sub.META = {
+        k: v for k, v in request.META.items() if k not in _META_EXCLUIDO
+    }
+    sub.META.update(
+        {"REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query}
+    )
+    sub.GET = QueryDict(query)
+    sub.COOKIES = request.COOKIES
+    sub.user = request.user
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def _cuerpo(response):
+    if isinstance(response, Response):
+        return response.data
+    contenido = response.content
+    try:
+        return json.loads(contenido)
+    except ValueError:
+        return contenido.decode(response.charset or "utf-8", errors="replace")
+
+
+def _permitida(match):
+    """
+    Solo rutas de viewsets del router: síncronas y de respuesta acotada.
+    Quedan fuera el propio batch, el flujo SSE (asíncrono, infinito) y las
+    métricas.
+    """
+    vista = match.func
+    if asyncio.iscoroutinefunction(vista) or getattr(vista, "view_is_async", False):
+        return False
+    return issubclass(getattr(vista, "cls", object), ViewSetMixin)
+
+
+def _ejecutar(request, url):
+    partes = urlsplit(url)
+    no_permitida = status.HTTP_400_BAD_REQUEST, {"detail": "URL no permitida en batch."}
+    if not partes.path.startswith("/api/"):
+        return no_permitida
+
+    try:
+        match = resolve(partes.path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {"detail": "No encontrado."}
+    if not _permitida(match):
+        return no_permitida
+
+    try:
+        response = match.func(
+            _sub_request(request, partes.path, partes.query),
+            *match.args,
+            **match.kwargs,
+        )
+    except Http404:
+        return status.HTTP_404_NOT_FOUND, {"detail": "No encontrado."}
+    if response.streaming:
+        # Kardex y exportaciones: sin límite de tamaño, se piden directo
+        response.close()
+        return status.HTTP_400_BAD_REQUEST, {
+            "detail": "Las respuestas en streaming no se admiten en batch."
+        }
+    return response.status_code, _cuerpo(response)
+
+
+def _ejecutar_en_hilo(request, url):
+    try:
+        return _ejecutar(request, url)
+    finally:
+        # Cada hilo abre su propia conexión: se cierra al terminar
+        connections.close_all()
+
+
+class BatchView(APIView):
+    """
+    Ejecuta varios GET internos en una sola petición, con la autenticación
+    y los roles del usuario resueltos una vez.
+
+    POST /api/batch/
+    {
+        "solicitudes": ["/api/marcas/", {"id": "cats", "url": "/api/categorias/"}],
+        "concurrente": false
+    }
+
+    Respuesta: {"resultados": [{"id", "url", "status", "body"}, ...]}
+    en el mismo orden. Cada sub-solicitud aplica sus propios permisos.
+    Solo se admiten rutas de los viewsets del router que no respondan en
+    streaming; el resto recibe status 400 en su resultado.
+    """
+
+    def post(self, request):
+        solicitudes = request.data.get("solicitudes")
+        if not isinstance(solicitudes, list) or not solicitudes:
+            return Response(
+                {"solicitudes": "Debe ser una lista de URLs."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(solicitudes) > MAX_SOLICITUDES:
+            return Response(
+                {"solicitudes": f"Máximo {MAX_SOLICITUDES} por petición."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        items = []
+        for indice, solicitud in enumerate(solicitudes):
+            if isinstance(solicitud, str):
+                solicitud = {"url": solicitud}
+            if not isinstance(solicitud, dict) or not isinstance(
+                solicitud.get("url"), str
+            ):
+                return Response(
+                    {"solicitudes": f"Elemento {indice} inválido."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            items.append((solicitud.get("id", indice), solicitud["url"]))
+
+        django_request = request._request
+        if request.data.get("concurrente") and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_HILOS, len(items))) as pool:
+                respuestas = list(
+                    pool.map(
+                        lambda item: _ejecutar_en_hilo(django_request, item[1]),
+                        items,
+                    )
+                )
+        else:
+            respuestas = [_ejecutar(django_request, url) for _, url in items]
+
+        resultados = [
+            {"id": id_, "url": url, "status": codigo, "body": cuerpo}
+            for (id_, url), (codigo, cuerpo) in zip(items, respuestas)
+        ]
+        return Response({"resultados": resultados}, status=status.HTTP_200_OK)
+
+
+async def _eventos_sse(canales):
+    suscripcion = hub.suscribir(canales)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                canal, datos = await asyncio.wait_for(
+                    suscripcion.cola.get(), timeout=SSE_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if suscripcion.desbordada:
+                # Se perdieron eventos: el cliente debe recargar la lista
+                suscripcion.desbordada = False
+                yield "event: resync\ndata: {}\n\n"
+            yield f"event: {canal}\ndata: {json.dumps(datos, cls=DjangoJSONEncoder)}\n\n"
+    finally:
+        hub.cancelar(suscripcion)
+
+
+def _roles_usuario(acceso):
+    """
+    Slugs de rol del usuario del token, leídos de la base como en el resto
+    de la API (JWTAuthentication), o None si el usuario no existe o está
+    inactivo. Los roles del token pueden haber cambiado desde que se emitió.
+    """
+    try:
+        usuario = JWTAuthentication().get_user(acceso)
+    except AuthenticationFailed:
+        return None
+    return set(usuario.roles.values_list("slug", flat=True))
+
+
+async def stream_cambios(request):
+    """
+    Flujo SSE de cambios (requiere servir con ASGI: core.asgi:application).
+
+    GET /api/stream/?token=<access>&canales=stock,roi
+
+    EventSource no permite cabeceras, por eso el JWT de acceso puede ir en
+    `?token=`. Los canales se filtran por los roles actuales del usuario:
+    - stock: {"producto": id, "stock": n} al registrar movimientos.
+    - roi:   {"documento": id, "estado_urgencia", ...} al clasificar.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "El flujo de cambios requiere un servidor ASGI."},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    token = request.GET.get("token")
+    if not token:
+        cabecera = request.headers.get("Authorization", "")
+        token = cabecera[7:] if cabecera.startswith("Bearer ") else None
+    # AccessToken(None) no valida: crea un token nuevo
+    roles = None
+    if token:
+        try:
+            roles = await sync_to_async(_roles_usuario)(AccessToken(token))
+        except TokenError:
+            pass
+    if roles is None:
+        return JsonResponse(
+            {"detail": "Token inválido o vencido."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    permitidos = canales_permitidos(roles)
+    pedidos = {c.strip() for c in request.GET.get("canales", "").split(",") if c.strip()}
+    canales = (pedidos or permitidos) & permitidos
+    if not canales:
+        return JsonResponse(
+            {"detail": "Usted no tiene permiso para realizar esta acción."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    response = StreamingHttpResponse(
+        _eventos_sse(canales), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -5,22 +5,31 @@ from .models import Evento, Tarea, SubTarea, DocumentoROI
 @admin.register(Evento)
 class EventoAdmin(admin.ModelAdmin):
     list_display = ("nombre", "fecha_inicio", "fecha_fin", "lugar", "activo")
-    list_filter = ("activo", "fecha_inicio")
+    list_filter = ("activo",)
     search_fields = ("nombre", "descripcion", "lugar")
+    date_hierarchy = "fecha_inicio"
+    show_full_result_count = False
 
 
 @admin.register(Tarea)
 class TareaAdmin(admin.ModelAdmin):
     list_display = ("nombre", "evento", "responsable", "completada")
-    list_filter = ("completada", "evento")
-    search_fields = ("nombre", "descripcion")
+    list_filter = ("completada",)
+    list_select_related = ("evento", "responsable")
+    search_fields = ("nombre", "descripcion", "evento__nombre")
+    autocomplete_fields = ("evento", "responsable")
+    show_full_result_count = False
 
 
 @admin.register(SubTarea)
 class SubTareaAdmin(admin.ModelAdmin):
     list_display = ("nombre", "tarea", "completada")
-    list_filter = ("completada", "tarea")
+    list_filter = ("completada",)
+    # Tarea.__str__ incluye el evento
+    list_select_related = ("tarea__evento",)
     search_fields = ("nombre", "descripcion")
+    autocomplete_fields = ("tarea",)
+    show_full_result_count = False
 
 
 @admin.register(DocumentoROI)
@@ -34,5 +43,8 @@ class DocumentoROIAdmin(admin.ModelAdmin):
         "fecha_evento",
         "fecha_recepcion",
     )
-    list_filter = ("estado_urgencia", "estado_proceso", "fecha_evento")
+    list_filter = ("estado_urgencia", "estado_proceso")
     search_fields = ("codigo", "titulo", "cliente", "descripcion")
+    date_hierarchy = "fecha_evento"
+    autocomplete_fields = ("evento_relacionado", "creado_por")
+    show_full_result_count = False
@@ -0,0 +1,102 @@
+"""
+Clasificación automática de urgencia de documentos ROI.
+
+Las reglas se evalúan en orden y gana la primera que aplica. Cada regla
+tiene su versión en Python (para un documento al guardarlo) y su versión
+como `Q` (para reclasificar en bloque con un único UPDATE ... CASE).
+
+La urgencia depende de la fecha: un documento guardado hoy cambia de
+tramo con los días sin que nadie lo edite. El comando clasificar_roi
+debe correr a diario para mantener al día los de origen AUTOMATICO.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Case, CharField, Q, Value, When
+from django.utils import timezone
+
+DIAS_LIMITE_URGENTE = 3
+DIAS_EVENTO_CERCANO = 30
+
+
+def _reglas(hoy):
+    from .models import DocumentoROI
+
+    limite_urgente = hoy + timedelta(days=DIAS_LIMITE_URGENTE)
+    evento_cercano = hoy + timedelta(days=DIAS_EVENTO_CERCANO)
+    estados_cerrados = (
+        DocumentoROI.ESTADO_OFERTA_GENERADA,
+        DocumentoROI.ESTADO_CERRADO,
+    )
+
+    return [
+        (
+            DocumentoROI.NO_URGENTE,
+            "Proceso sin acciones pendientes (oferta generada o cerrado).",
+            lambda d: d.estado_proceso in estados_cerrados,
+            Q(estado_proceso__in=estados_cerrados),
+        ),
+        (
+            DocumentoROI.NO_URGENTE,
+            "Límite de oferta vencido sin oferta generada.",
+            lambda d: d.fecha_limite_oferta is not None and d.fecha_limite_oferta < hoy,
+            Q(fecha_limite_oferta__lt=hoy),
+        ),
+        (
+            DocumentoROI.URGENTE,
+            f"Límite de oferta en {DIAS_LIMITE_URGENTE} días o menos.",
+            lambda d: d.fecha_limite_oferta is not None
+            and d.fecha_limite_oferta <= limite_urgente,
+            Q(fecha_limite_oferta__lte=limite_urgente),
+        ),
+        (
+            DocumentoROI.EVENTO_CERCANO,
+            f"Evento en {DIAS_EVENTO_CERCANO} días o menos.",
+            lambda d: d.fecha_evento is not None and d.fecha_evento <= evento_cercano,
+            Q(fecha_evento__lte=evento_cercano),
+        ),
+        (
+            DocumentoROI.EVENTO_LEJANO,
+            f"Evento a más de {DIAS_EVENTO_CERCANO} días.",
+            lambda d: d.fecha_evento is not None,
+            Q(fecha_evento__isnull=False),
+        ),
+    ]
+
+
+SIN_FECHAS = "Sin fechas de evento ni de límite de oferta."
+
+
+def clasificar(documento, hoy=None):
+    """
+    Devuelve (estado_urgencia, motivo) para un documento en memoria.
+    """
+    from .models import DocumentoROI
+
+    hoy = hoy or timezone.localdate()
+    for urgencia, motivo, aplica, _ in _reglas(hoy):
+        if aplica(documento):
+            return urgencia, motivo
+    return DocumentoROI.NO_URGENTE, SIN_FECHAS
+
+
+def expresiones_clasificacion(hoy=None):
+    """
+    Expresiones CASE equivalentes a `clasificar` para usar en `update()`.
+    """
+    from .models import DocumentoROI
+
+    hoy = hoy or timezone.localdate()
+    reglas = _reglas(hoy)
+    return {
+        "estado_urgencia": Case(
+            *[When(q, then=Value(urgencia)) for urgencia, _, _, q in reglas],
+            default=Value(DocumentoROI.NO_URGENTE),
+            output_field=CharField(),
+        ),
+        "motivo_urgencia": Case(
+            *[When(q, then=Value(motivo)) for _, motivo, _, q in reglas],
+            default=Value(SIN_FECHAS),
+            output_field=CharField(),
+        ),
+    }
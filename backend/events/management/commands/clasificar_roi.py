@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from events.models import DocumentoROI
+
+
+class Command(BaseCommand):
+    help = (
+        "Reclasifica la urgencia de los documentos ROI con origen AUTOMATICO. "
+        "Las clasificaciones manuales no se modifican. Debe correr a diario: "
+        "la urgencia cambia con la fecha aunque nadie edite el documento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fecha",
+            help="Fecha de referencia YYYY-MM-DD (por defecto, hoy).",
+        )
+
+    def handle(self, *args, **options):
+        hoy = None
+        if options["fecha"]:
+            hoy = parse_date(options["fecha"])
+            if hoy is None:
+                self.stderr.write("Fecha inválida, use YYYY-MM-DD.")
+                return
+
+        inicio = time.perf_counter()
+        total = DocumentoROI.objects.reclasificar(hoy)
+        duracion = time.perf_counter() - inicio
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} documentos reclasificados en {duracion:.2f} s."
+            )
+        )
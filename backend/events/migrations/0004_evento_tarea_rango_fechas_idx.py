@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_alter_documentoroi_motivo_urgencia_and_more'),
+        ('people', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['fecha_inicio', 'fecha_fin'], name='evento_rango_fechas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['fecha_inicio', 'fecha_fin'], name='tarea_rango_fechas_idx'),
+        ),
+    ]
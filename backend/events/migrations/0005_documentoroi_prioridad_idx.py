@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_evento_tarea_rango_fechas_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentoroi',
+            index=models.Index(fields=['estado_proceso', 'fecha_limite_oferta', 'fecha_evento'], name='roi_prioridad_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_fecha_actualizacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='documentoroi',
+            name='roi_prioridad_idx',
+        ),
+        migrations.AddIndex(
+            model_name='documentoroi',
+            index=models.Index(fields=['fecha_limite_oferta'], name='roi_limite_oferta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentoroi',
+            index=models.Index(fields=['fecha_evento'], name='roi_fecha_evento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentoroi',
+            index=models.Index(fields=['estado_urgencia'], name='roi_urgencia_idx'),
+        ),
+    ]
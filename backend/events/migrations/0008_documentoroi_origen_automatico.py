@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_documentoroi_indices_prioridad'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentoroi',
+            name='origen_clasificacion',
+            field=models.CharField(choices=[('MANUAL', 'Manual'), ('AUTOMATICO', 'Automático'), ('N8N', 'Integración externa')], default='AUTOMATICO', max_length=20),
+        ),
+    ]
@@ -1,21 +1,124 @@
 from django.db import models
+from django.db.models import (
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
+from core.sincronizacion import SincronizableMixin, SincronizableQuerySet
 from people.models import Empleado
+from .clasificacion import clasificar, expresiones_clasificacion
+from .prioridad import candidatos, cota_fuera, expresion_puntaje
 
 
-class Evento(models.Model):
+def _conteo(queryset, campo_padre, **filtros):
+    """
+    Subconsulta correlacionada que cuenta filas de `queryset` por padre.
+    Evita multiplicar filas al anotar tareas y subtareas a la vez.
+    """
+    qs = (
+        queryset.filter(**{campo_padre: OuterRef("pk")}, **filtros)
+        .order_by()
+        .values(campo_padre)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(qs, output_field=IntegerField()), Value(0))
+
+
+class RangoFechasQuerySet(SincronizableQuerySet):
+    def en_rango(self, desde=None, hasta=None):
+        """
+        Filtra registros cuyo intervalo [fecha_inicio, fecha_fin] se solapa
+        con [desde, hasta]. Usa el índice compuesto (fecha_inicio, fecha_fin).
+        Los extremos son inclusivos y un registro sin la fecha que se
+        compara (tareas sin fechas) queda fuera.
+        """
+        qs = self
+        if desde is not None:
+            qs = qs.filter(fecha_fin__gte=desde)
+        if hasta is not None:
+            qs = qs.filter(fecha_inicio__lte=hasta)
+        return qs
+
+
+class EventoQuerySet(RangoFechasQuerySet):
+    def con_progreso(self, ahora=None):
+        """
+        Anota el avance de cada evento calculado en SQL:
+        tareas y subtareas (totales / completadas) y tareas vencidas.
+        """
+        ahora = ahora or timezone.now()
+        tareas = Tarea.objects.all()
+        subtareas = SubTarea.objects.all()
+        return self.annotate(
+            tareas_total=_conteo(tareas, "evento"),
+            tareas_completadas=_conteo(tareas, "evento", completada=True),
+            tareas_vencidas=_conteo(
+                tareas, "evento", completada=False, fecha_fin__lt=ahora
+            ),
+            subtareas_total=_conteo(subtareas, "tarea__evento"),
+            subtareas_completadas=_conteo(
+                subtareas, "tarea__evento", completada=True
+            ),
+        )
+
+    def resumen(self, ahora=None):
+        """
+        KPIs globales en una sola consulta agregada.
+        """
+        ahora = ahora or timezone.now()
+        tareas = Tarea.objects.all()
+        subtareas = SubTarea.objects.all()
+        return self.aggregate(
+            eventos_total=Count("pk"),
+            eventos_activos=Count("pk", filter=Q(activo=True)),
+            tareas_total=Coalesce(Sum(_conteo(tareas, "evento")), 0),
+            tareas_completadas=Coalesce(
+                Sum(_conteo(tareas, "evento", completada=True)), 0
+            ),
+            tareas_vencidas=Coalesce(
+                Sum(_conteo(tareas, "evento", completada=False, fecha_fin__lt=ahora)),
+                0,
+            ),
+            subtareas_total=Coalesce(Sum(_conteo(subtareas, "tarea__evento")), 0),
+            subtareas_completadas=Coalesce(
+                Sum(_conteo(subtareas, "tarea__evento", completada=True)), 0
+            ),
+        )
+
+
+class Evento(SincronizableMixin, models.Model):
     nombre = models.CharField(max_length=150)
     descripcion = models.TextField(blank=True)
     fecha_inicio = models.DateTimeField()
     fecha_fin = models.DateTimeField()
     lugar = models.CharField(max_length=200, blank=True)
     activo = models.BooleanField(default=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = EventoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["fecha_inicio", "fecha_fin"],
+                name="evento_rango_fechas_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.nombre
 
 
-class Tarea(models.Model):
+class Tarea(SincronizableMixin, models.Model):
     evento = models.ForeignKey(
         Evento,
         on_delete=models.CASCADE,
@@ -33,12 +136,23 @@ class Tarea(models.Model):
         related_name="tareas",
     )
     completada = models.BooleanField(default=False)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = RangoFechasQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["fecha_inicio", "fecha_fin"],
+                name="tarea_rango_fechas_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.nombre} ({self.evento})"
 
 
-class SubTarea(models.Model):
+class SubTarea(SincronizableMixin, models.Model):
     tarea = models.ForeignKey(
         Tarea,
         on_delete=models.CASCADE,
@@ -47,15 +161,74 @@ class SubTarea(models.Model):
     nombre = models.CharField(max_length=150)
     descripcion = models.TextField(blank=True)
     completada = models.BooleanField(default=False)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = SincronizableQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
 
-class DocumentoROI(models.Model):
+class DocumentoROIQuerySet(SincronizableQuerySet):
+    def reclasificar(self, hoy=None):
+        """
+        Reclasifica en bloque los documentos con origen AUTOMATICO usando un
+        único UPDATE ... CASE. Nunca toca clasificaciones manuales, y solo
+        escribe las filas cuya urgencia o motivo cambia (las demás conservan
+        fecha_actualizacion y no vuelven a bajar en la sincronización).
+        Devuelve la cantidad de filas actualizadas.
+        """
+        expresiones = expresiones_clasificacion(hoy)
+        return (
+            self.filter(origen_clasificacion=DocumentoROI.ORIGEN_AUTOMATICO)
+            .exclude(
+                estado_urgencia=expresiones["estado_urgencia"],
+                motivo_urgencia=expresiones["motivo_urgencia"],
+            )
+            .update(**expresiones, fecha_actualizacion=timezone.now())
+        )
+
+    def prioritarios(self, limite, hoy=None):
+        """
+        Top `limite` documentos por puntaje de prioridad (calculado en SQL).
+        Se ordenan primero solo los candidatos (ver events/prioridad.py); el
+        resto de la tabla se recorre solo si no alcanzan para el top.
+        """
+        hoy = hoy or timezone.localdate()
+        filtro = candidatos(hoy)
+        # Fechas nulas al final en todos los motores, igual que en el sorted()
+        orden = (
+            "-puntaje",
+            F("fecha_limite_oferta").asc(nulls_last=True),
+            F("fecha_evento").asc(nulls_last=True),
+            "id",
+        )
+        qs = self.annotate(puntaje=expresion_puntaje(hoy)).order_by(*orden)
+
+        top = list(qs.filter(filtro)[:limite])
+        if len(top) == limite and top[-1].puntaje > cota_fuera():
+            return top
+        resto = list(qs.exclude(filtro)[:limite])
+        return sorted(
+            top + resto,
+            key=lambda d: (
+                -d.puntaje,
+                d.fecha_limite_oferta is None,
+                d.fecha_limite_oferta,
+                d.fecha_evento is None,
+                d.fecha_evento,
+                d.id,
+            ),
+        )[:limite]
+
+
+class DocumentoROI(SincronizableMixin, models.Model):
     """
-    Documento ROI que se clasifica manualmente por urgencia para priorizar ofertas.
+    Documento ROI que se clasifica por urgencia para priorizar ofertas.
     Admin y Responsable adm-contable pueden editar la clasificación.
+    Si el origen es AUTOMATICO (el valor por defecto), la urgencia se
+    calcula al guardar a partir de las fechas y el estado del proceso (ver
+    events/clasificacion.py); una urgencia fijada a mano pasa a MANUAL.
     """
 
     URGENTE = "URGENTE"
@@ -119,7 +292,7 @@ class DocumentoROI(models.Model):
     origen_clasificacion = models.CharField(
         max_length=20,
         choices=ORIGEN_CHOICES,
-        default=ORIGEN_MANUAL,
+        default=ORIGEN_AUTOMATICO,
     )
     motivo_urgencia = models.TextField(
         blank=True,
@@ -153,9 +326,29 @@ class DocumentoROI(models.Model):
         blank=True,
         related_name="documentos_roi_creados",
     )
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = DocumentoROIQuerySet.as_manager()
 
     class Meta:
         ordering = ["fecha_evento", "-fecha_recepcion"]
+        indexes = [
+            # Rangos del filtro de candidatos de prioritarios()
+            models.Index(fields=["fecha_limite_oferta"], name="roi_limite_oferta_idx"),
+            models.Index(fields=["fecha_evento"], name="roi_fecha_evento_idx"),
+            models.Index(fields=["estado_urgencia"], name="roi_urgencia_idx"),
+        ]
 
     def __str__(self):
         return f"{self.codigo} - {self.titulo}"
+
+    def save(self, *args, **kwargs):
+        if self.origen_clasificacion == self.ORIGEN_AUTOMATICO:
+            self.estado_urgencia, self.motivo_urgencia = clasificar(self)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {
+                    "estado_urgencia",
+                    "motivo_urgencia",
+                }
+        super().save(*args, **kwargs)
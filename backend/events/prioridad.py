@@ -0,0 +1,111 @@
+"""
+Puntaje de prioridad de documentos ROI calculado en SQL.
+
+El puntaje suma pesos por tramos de días al límite de oferta, días al
+evento, nivel de urgencia y estado del proceso. Se evalúa con CASE en la
+base de datos para ordenar y cortar el top K sin traer filas a Python.
+
+Las fechas solo pesan dentro de su ventana: un límite de oferta vencido
+hace más de GRACIA_LIMITE_OFERTA días o un evento ya pasado no suman.
+
+Ordenar por el CASE obliga a evaluarlo en toda la tabla, así que el top K
+se busca primero entre los `candidatos`: documentos con alguna fecha en
+su ventana o con urgencia URGENTE, filtro que se resuelve con rangos
+sobre índices. Fuera de ellos ningún documento supera `cota_fuera()`; si
+el K-ésimo candidato no la supera, se completa con el resto.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+# (días máximos, peso): el primer tramo que aplica gana
+PESOS_LIMITE_OFERTA = ((0, 40), (3, 30), (7, 20), (14, 10))
+PESOS_EVENTO = ((7, 30), (14, 20), (30, 10))
+
+# Días después de la fecha en que su peso se mantiene; luego vale 0
+GRACIA_LIMITE_OFERTA = 3
+GRACIA_EVENTO = 0
+
+# Urgencias que siempre son candidatas, aunque no tengan fechas cercanas
+URGENCIAS_CANDIDATAS = ("URGENTE",)
+
+PESOS_URGENCIA = {
+    "URGENTE": 40,
+    "EVENTO_CERCANO": 20,
+    "EVENTO_LEJANO": 5,
+    "NO_URGENTE": 0,
+}
+PESOS_ESTADO = {
+    "EN_ANALISIS": 15,
+    "PENDIENTE": 10,
+    "OFERTA_GENERADA": 0,
+    "CERRADO": 0,
+}
+
+
+def _por_tramos(campo, tramos, gracia, hoy):
+    return Case(
+        When(Q(**{f"{campo}__lt": hoy - timedelta(days=gracia)}), then=Value(0)),
+        *[
+            When(Q(**{f"{campo}__lte": hoy + timedelta(days=dias)}), then=Value(peso))
+            for dias, peso in tramos
+        ],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _ventana(campo, tramos, gracia, hoy):
+    return Q(
+        **{
+            f"{campo}__gte": hoy - timedelta(days=gracia),
+            f"{campo}__lte": hoy + timedelta(days=tramos[-1][0]),
+        }
+    )
+
+
+def _por_valor(campo, pesos):
+    return Case(
+        *[When(Q(**{campo: valor}), then=Value(peso)) for valor, peso in pesos.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def expresion_puntaje(hoy=None):
+    hoy = hoy or timezone.localdate()
+    return (
+        _por_tramos(
+            "fecha_limite_oferta", PESOS_LIMITE_OFERTA, GRACIA_LIMITE_OFERTA, hoy
+        )
+        + _por_tramos("fecha_evento", PESOS_EVENTO, GRACIA_EVENTO, hoy)
+        + _por_valor("estado_urgencia", PESOS_URGENCIA)
+        + _por_valor("estado_proceso", PESOS_ESTADO)
+    )
+
+
+def candidatos(hoy=None):
+    """
+    Filtro indexable de los documentos que pueden sumar por fechas o que
+    tienen una urgencia candidata.
+    """
+    hoy = hoy or timezone.localdate()
+    return (
+        _ventana("fecha_limite_oferta", PESOS_LIMITE_OFERTA, GRACIA_LIMITE_OFERTA, hoy)
+        | _ventana("fecha_evento", PESOS_EVENTO, GRACIA_EVENTO, hoy)
+        | Q(estado_urgencia__in=URGENCIAS_CANDIDATAS)
+    )
+
+
+def cota_fuera():
+    """
+    Puntaje máximo posible de un documento que no es candidato.
+    """
+    urgencia = max(
+        peso
+        for nombre, peso in PESOS_URGENCIA.items()
+        if nombre not in URGENCIAS_CANDIDATAS
+    )
+    return urgencia + max(PESOS_ESTADO.values())
@@ -1,21 +1,28 @@
+from django.urls import reverse
 from rest_framework import serializers
+from core.metricas import MedicionSerializerMixin
+from core.serializers import (
+    BatchPrimaryKeyRelatedField,
+    BatchRelatedListSerializer,
+    BatchRelatedMixin,
+)
 from .models import Evento, Tarea, SubTarea, DocumentoROI
 from people.models import Empleado
 
 
-class EmpleadoLiteSerializer(serializers.ModelSerializer):
+class EmpleadoLiteSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Empleado
         fields = ["id", "nombres", "apellidos"]
 
 
-class SubTareaSerializer(serializers.ModelSerializer):
+class SubTareaSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = SubTarea
         fields = "__all__"
 
 
-class TareaSerializer(serializers.ModelSerializer):
+class TareaSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     responsable = EmpleadoLiteSerializer(read_only=True)
     subtareas = SubTareaSerializer(many=True, read_only=True)
 
@@ -24,29 +31,85 @@ class TareaSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class TareaWriteSerializer(serializers.ModelSerializer):
+class TareaWriteSerializer(
+    MedicionSerializerMixin,
+    BatchRelatedMixin,
+    serializers.ModelSerializer,
+):
+    serializer_related_field = BatchPrimaryKeyRelatedField
+
     class Meta:
         model = Tarea
         fields = "__all__"
+        list_serializer_class = BatchRelatedListSerializer
 
 
-class EventoSerializer(serializers.ModelSerializer):
+class EventoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     tareas = TareaSerializer(many=True, read_only=True)
 
+    # Avance anotado por EventoQuerySet.con_progreso() (None si no se anotó)
+    tareas_total = serializers.IntegerField(read_only=True, allow_null=True)
+    tareas_completadas = serializers.IntegerField(read_only=True, allow_null=True)
+    tareas_vencidas = serializers.IntegerField(read_only=True, allow_null=True)
+    subtareas_total = serializers.IntegerField(read_only=True, allow_null=True)
+    subtareas_completadas = serializers.IntegerField(
+        read_only=True, allow_null=True
+    )
+
     class Meta:
         model = Evento
         fields = "__all__"
 
 
-class DocumentoROISerializer(serializers.ModelSerializer):
+class DocumentoROISerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     evento_relacionado = EventoSerializer(read_only=True)
+    url_descarga = serializers.SerializerMethodField()
 
     class Meta:
         model = DocumentoROI
         fields = "__all__"
 
+    def get_url_descarga(self, obj):
+        # MEDIA_URL solo se sirve en DEBUG; la descarga pasa por la API
+        if not obj.archivo:
+            return None
+        return reverse("documento-roi-archivo", args=[obj.pk])
 
-class DocumentoROIWriteSerializer(serializers.ModelSerializer):
+
+class DocumentoROIPrioridadSerializer(
+    MedicionSerializerMixin,
+    serializers.ModelSerializer,
+):
+    """
+    Versión liviana para la cola de prioridad (sin el árbol del evento).
+    """
+
+    puntaje = serializers.IntegerField(read_only=True)
+    evento_nombre = serializers.CharField(
+        source="evento_relacionado.nombre",
+        read_only=True,
+        default=None,
+    )
+
+    class Meta:
+        model = DocumentoROI
+        fields = [
+            "id",
+            "codigo",
+            "titulo",
+            "cliente",
+            "fecha_evento",
+            "fecha_limite_oferta",
+            "estado_urgencia",
+            "estado_proceso",
+            "origen_clasificacion",
+            "evento_relacionado",
+            "evento_nombre",
+            "puntaje",
+        ]
+
+
+class DocumentoROIWriteSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Para crear/editar ROI desde la UI (archivo o enlace, al menos uno).
     """
@@ -66,10 +129,17 @@ class DocumentoROIWriteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Debe proporcionar un archivo o un enlace del documento."
             )
+        # Una urgencia enviada sin origen es una clasificación manual: si
+        # quedara AUTOMATICO, save() la reemplazaría por la calculada
+        if "estado_urgencia" in attrs and "origen_clasificacion" not in attrs:
+            attrs["origen_clasificacion"] = DocumentoROI.ORIGEN_MANUAL
         return attrs
 
 
-class DocumentoROIClasificacionSerializer(serializers.Serializer):
+class DocumentoROIClasificacionSerializer(
+    MedicionSerializerMixin,
+    serializers.Serializer,
+):
     """
     Para actualizar urgencia/estado desde el frontend (clasificación manual).
     """
@@ -1,3 +1,512 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Rol, Usuario
+from people.models import Empleado
+from . import views
+from .clasificacion import clasificar
+from .models import Evento, Tarea, SubTarea, DocumentoROI
+from .prioridad import expresion_puntaje
+
+FILAS = 50_000
+
+
+class AdminChangelistConsultasTests(TestCase):
+    """
+    Los changelists del admin deben costar un número fijo de consultas,
+    sin importar cuántas filas haya (sin N+1 por __str__ de las FK).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_superuser(
+            "admin", "admin@example.com", "clave-segura"
+        )
+        ahora = timezone.now()
+        eventos = Evento.objects.bulk_create(
+            Evento(nombre=f"Evento {i}", fecha_inicio=ahora, fecha_fin=ahora)
+            for i in range(100)
+        )
+        empleados = Empleado.objects.bulk_create(
+            Empleado(nombres=f"Nombre {i}", apellidos="Apellido") for i in range(50)
+        )
+        tareas = Tarea.objects.bulk_create(
+            (
+                Tarea(
+                    evento=eventos[i % len(eventos)],
+                    responsable=empleados[i % len(empleados)],
+                    nombre=f"Tarea {i}",
+                    fecha_inicio=ahora,
+                )
+                for i in range(FILAS)
+            ),
+            batch_size=5000,
+        )
+        SubTarea.objects.bulk_create(
+            (
+                SubTarea(tarea=tareas[i % len(tareas)], nombre=f"Subtarea {i}")
+                for i in range(FILAS)
+            ),
+            batch_size=5000,
+        )
+        DocumentoROI.objects.bulk_create(
+            (
+                DocumentoROI(
+                    codigo=f"ROI-{i}",
+                    titulo=f"ROI {i}",
+                    evento_relacionado=eventos[i % len(eventos)],
+                    fecha_evento=ahora.date(),
+                )
+                for i in range(FILAS)
+            ),
+            batch_size=5000,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assertChangelistConsultas(self, modelo, maximo):
+        url = reverse(f"admin:events_{modelo}_changelist")
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(consultas), maximo)
+
+    def test_changelist_tareas(self):
+        self.assertChangelistConsultas("tarea", 8)
+
+    def test_changelist_subtareas(self):
+        self.assertChangelistConsultas("subtarea", 8)
+
+    def test_changelist_documentos_roi(self):
+        self.assertChangelistConsultas("documentoroi", 8)
+
+
+class PrioridadTests(TestCase):
+    """
+    Puntaje de prioridad de ROI y top K por candidatos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hoy = timezone.localdate()
+
+        def dia(n):
+            return cls.hoy + timedelta(days=n)
+
+        documentos = [
+            # (límite de oferta, evento, urgencia, estado)
+            (dia(0), dia(5), "URGENTE", "EN_ANALISIS"),
+            (dia(-2), None, "URGENTE", "PENDIENTE"),
+            (dia(-30), dia(-20), "NO_URGENTE", "PENDIENTE"),
+            (dia(10), dia(40), "EVENTO_LEJANO", "PENDIENTE"),
+            (None, None, "EVENTO_CERCANO", "EN_ANALISIS"),
+            (None, dia(60), "NO_URGENTE", "OFERTA_GENERADA"),
+            (dia(2), dia(12), "NO_URGENTE", "PENDIENTE"),
+        ]
+        for i, (limite, evento, urgencia, estado) in enumerate(documentos):
+            DocumentoROI.objects.create(
+                codigo=f"P-{i}",
+                titulo=f"ROI {i}",
+                fecha_limite_oferta=limite,
+                fecha_evento=evento,
+                estado_urgencia=urgencia,
+                estado_proceso=estado,
+                origen_clasificacion=DocumentoROI.ORIGEN_MANUAL,
+            )
+
+    def _puntajes(self):
+        return dict(
+            DocumentoROI.objects.annotate(puntaje=expresion_puntaje(self.hoy))
+            .values_list("codigo", "puntaje")
+        )
+
+    def test_fechas_vencidas_no_suman(self):
+        puntajes = self._puntajes()
+        self.assertEqual(puntajes["P-0"], 40 + 30 + 40 + 15)
+        # Vencido hace 2 días: dentro de la gracia
+        self.assertEqual(puntajes["P-1"], 40 + 40 + 10)
+        # Límite y evento pasados hace semanas: solo el estado
+        self.assertEqual(puntajes["P-2"], 10)
+
+    def test_empates_con_fechas_nulas_al_final(self):
+        # Mismo puntaje (URGENTE + EN_ANALISIS; las fechas no suman)
+        for codigo, limite, evento in (
+            ("T-0", None, None),
+            ("T-1", self.hoy - timedelta(days=30), None),
+            ("T-2", self.hoy - timedelta(days=30), self.hoy + timedelta(days=60)),
+        ):
+            DocumentoROI.objects.create(
+                codigo=codigo,
+                titulo=codigo,
+                fecha_limite_oferta=limite,
+                fecha_evento=evento,
+                estado_urgencia="URGENTE",
+                estado_proceso="EN_ANALISIS",
+                origen_clasificacion=DocumentoROI.ORIGEN_MANUAL,
+            )
+        top = DocumentoROI.objects.prioritarios(6, hoy=self.hoy)
+        self.assertEqual(
+            [d.codigo for d in top], ["P-0", "P-1", "P-6", "T-2", "T-1", "T-0"]
+        )
+
+    def test_top_igual_a_ordenar_toda_la_tabla(self):
+        puntajes = self._puntajes()
+        completo = sorted(
+            DocumentoROI.objects.all(),
+            key=lambda d: -puntajes[d.codigo],
+        )
+        for limite in range(1, 9):
+            top = DocumentoROI.objects.prioritarios(limite, hoy=self.hoy)
+            self.assertEqual(
+                [d.codigo for d in top],
+                [d.codigo for d in completo[:limite]],
+                limite,
+            )
+
+    def test_top_sin_recorrer_el_resto(self):
+        with CaptureQueriesContext(connection) as consultas:
+            top = DocumentoROI.objects.prioritarios(2, hoy=self.hoy)
+        self.assertEqual([d.codigo for d in top], ["P-0", "P-1"])
+        self.assertEqual(len(consultas), 1)
+        # P-4 no tiene fechas (35 puntos): con 5 hay que mirar el resto
+        with CaptureQueriesContext(connection) as consultas:
+            top = DocumentoROI.objects.prioritarios(5, hoy=self.hoy)
+        self.assertIn("P-4", [d.codigo for d in top])
+        self.assertEqual(len(consultas), 2)
+
+
+class ClasificacionTests(TestCase):
+    """
+    Clasificación automática al guardar, reclasificación en bloque y
+    clasificaciones manuales.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        cls.hoy = timezone.localdate()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def dia(self, n):
+        return self.hoy + timedelta(days=n)
+
+    def _crear(self, codigo, **campos):
+        return DocumentoROI.objects.create(codigo=codigo, titulo=codigo, **campos)
+
+    def test_se_clasifica_al_crear(self):
+        documento = self._crear("C-1", fecha_limite_oferta=self.dia(2))
+        self.assertEqual(documento.origen_clasificacion, DocumentoROI.ORIGEN_AUTOMATICO)
+        self.assertEqual(documento.estado_urgencia, DocumentoROI.URGENTE)
+        self.assertTrue(documento.motivo_urgencia)
+
+    def test_limite_vencido_deja_de_ser_urgente(self):
+        documento = self._crear(
+            "C-1", fecha_limite_oferta=self.dia(2), fecha_evento=self.dia(10)
+        )
+        urgencia, _motivo = clasificar(documento, hoy=self.dia(3))
+        self.assertEqual(urgencia, DocumentoROI.NO_URGENTE)
+
+        DocumentoROI.objects.reclasificar(self.dia(3))
+        documento.refresh_from_db()
+        self.assertEqual(documento.estado_urgencia, DocumentoROI.NO_URGENTE)
+        self.assertIn("vencido", documento.motivo_urgencia)
+
+    def test_reclasificar_coincide_con_clasificar(self):
+        fechas = [None, -5, 0, 2, 3, 4, 20, 40]
+        for i, limite in enumerate(fechas):
+            for j, evento in enumerate(fechas):
+                self._crear(
+                    f"C-{i}-{j}",
+                    fecha_limite_oferta=None if limite is None else self.dia(limite),
+                    fecha_evento=None if evento is None else self.dia(evento),
+                    estado_proceso=(
+                        DocumentoROI.ESTADO_CERRADO
+                        if (i + j) % 5 == 0
+                        else DocumentoROI.ESTADO_PENDIENTE
+                    ),
+                )
+        hoy = self.dia(7)
+        cambian = sum(
+            (documento.estado_urgencia, documento.motivo_urgencia)
+            != clasificar(documento, hoy)
+            for documento in DocumentoROI.objects.all()
+        )
+        self.assertTrue(0 < cambian < len(fechas) ** 2)
+        total = DocumentoROI.objects.reclasificar(hoy)
+        self.assertEqual(total, cambian)
+        for documento in DocumentoROI.objects.all():
+            self.assertEqual(
+                (documento.estado_urgencia, documento.motivo_urgencia),
+                clasificar(documento, hoy),
+                documento.codigo,
+            )
+
+    def test_reclasificar_sin_cambios_no_escribe(self):
+        documento = self._crear(
+            "C-1", fecha_limite_oferta=self.dia(2), fecha_evento=self.dia(10)
+        )
+        self.assertEqual(DocumentoROI.objects.reclasificar(self.dia(3)), 1)
+        documento.refresh_from_db()
+        antes = documento.fecha_actualizacion
+
+        self.assertEqual(DocumentoROI.objects.reclasificar(self.dia(3)), 0)
+        documento.refresh_from_db()
+        self.assertEqual(documento.fecha_actualizacion, antes)
+
+    def test_reclasificar_no_toca_las_manuales(self):
+        manual = self._crear(
+            "C-1",
+            fecha_evento=self.dia(60),
+            estado_urgencia=DocumentoROI.URGENTE,
+            origen_clasificacion=DocumentoROI.ORIGEN_MANUAL,
+        )
+        self.assertEqual(DocumentoROI.objects.reclasificar(self.hoy), 0)
+        manual.refresh_from_db()
+        self.assertEqual(manual.estado_urgencia, DocumentoROI.URGENTE)
+
+    def test_urgencia_enviada_por_api_es_manual(self):
+        response = self.client.post(
+            reverse("documento-roi-list"),
+            {
+                "codigo": "C-1",
+                "titulo": "ROI",
+                "enlace_documento": "https://example.com/roi",
+                "fecha_evento": self.dia(60),
+                "estado_urgencia": DocumentoROI.URGENTE,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        documento = DocumentoROI.objects.get(codigo="C-1")
+        self.assertEqual(documento.estado_urgencia, DocumentoROI.URGENTE)
+        self.assertEqual(documento.origen_clasificacion, DocumentoROI.ORIGEN_MANUAL)
+
+        # Sin urgencia, el alta por la API se clasifica sola
+        response = self.client.post(
+            reverse("documento-roi-list"),
+            {
+                "codigo": "C-2",
+                "titulo": "ROI",
+                "enlace_documento": "https://example.com/roi",
+                "fecha_evento": self.dia(60),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        documento = DocumentoROI.objects.get(codigo="C-2")
+        self.assertEqual(documento.estado_urgencia, DocumentoROI.EVENTO_LEJANO)
+
+    def test_clasificar_manual_sobrevive_a_ediciones(self):
+        documento = self._crear("C-1", fecha_evento=self.dia(60))
+        response = self.client.post(
+            reverse("documento-roi-clasificar", args=[documento.pk]),
+            {"estado_urgencia": DocumentoROI.URGENTE, "motivo_urgencia": "Cliente"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        documento.refresh_from_db()
+        self.assertEqual(documento.origen_clasificacion, DocumentoROI.ORIGEN_MANUAL)
+
+        documento.titulo = "Otro título"
+        documento.save()
+        DocumentoROI.objects.reclasificar(self.hoy)
+        documento.refresh_from_db()
+        self.assertEqual(documento.estado_urgencia, DocumentoROI.URGENTE)
+        self.assertEqual(documento.motivo_urgencia, "Cliente")
+
+
+class CalendarioTests(TestCase):
+    """
+    Solapamiento de en_rango() y el endpoint /api/calendario/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        cls.desde = timezone.make_aware(datetime(2025, 1, 6))
+        cls.hasta = timezone.make_aware(datetime(2025, 1, 12, 23, 59, 59))
+
+        def hora(dias, horas=0):
+            return cls.desde + timedelta(days=dias, hours=horas)
+
+        cls.eventos = {}
+        for nombre, inicio, fin in (
+            ("antes", hora(-5), hora(-1)),
+            ("toca_inicio", hora(-3), cls.desde),
+            ("dentro", hora(1, 9), hora(1, 18)),
+            ("cubre", hora(-10), hora(20)),
+            ("toca_fin", cls.hasta, hora(9)),
+            ("despues", hora(8), hora(9)),
+        ):
+            cls.eventos[nombre] = Evento.objects.create(
+                nombre=nombre, fecha_inicio=inicio, fecha_fin=fin
+            )
+        evento = cls.eventos["dentro"]
+        Tarea.objects.create(
+            evento=evento,
+            nombre="tarea",
+            fecha_inicio=hora(1, 10),
+            fecha_fin=hora(1, 12),
+        )
+        Tarea.objects.create(evento=evento, nombre="sin fechas")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _nombres(self, qs):
+        return set(qs.values_list("nombre", flat=True))
+
+    def test_en_rango_solapamiento(self):
+        self.assertEqual(
+            self._nombres(Evento.objects.en_rango(self.desde, self.hasta)),
+            {"toca_inicio", "dentro", "cubre", "toca_fin"},
+        )
+        self.assertEqual(
+            self._nombres(Evento.objects.en_rango(desde=self.hasta)),
+            {"cubre", "toca_fin", "despues"},
+        )
+        self.assertEqual(
+            self._nombres(Evento.objects.en_rango(hasta=self.desde)),
+            {"antes", "toca_inicio", "cubre"},
+        )
+        self.assertEqual(
+            self._nombres(Tarea.objects.en_rango(self.desde, self.hasta)), {"tarea"}
+        )
+        self.assertEqual(Tarea.objects.en_rango().count(), 2)
+
+    def test_calendario(self):
+        response = self.client.get(
+            reverse("calendario"), {"desde": "2025-01-06", "hasta": "2025-01-12"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item["tipo"], item["nombre"]) for item in response.data],
+            [
+                ("evento", "cubre"),
+                ("evento", "toca_inicio"),
+                ("evento", "dentro"),
+                ("tarea", "tarea"),
+                ("evento", "toca_fin"),
+            ],
+        )
+        self.assertNotIn("X-Calendario-Truncado", response)
+
+    def test_calendario_rango_maximo(self):
+        response = self.client.get(
+            reverse("calendario"), {"desde": "2025-01-01", "hasta": "2025-12-31"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_calendario_truncado(self):
+        with mock.patch.object(views, "MAX_ITEMS_CALENDARIO", 2):
+            response = self.client.get(
+                reverse("calendario"), {"desde": "2025-01-06", "hasta": "2025-01-12"}
+            )
+        self.assertEqual(
+            [item["nombre"] for item in response.data], ["cubre", "toca_inicio"]
+        )
+        self.assertEqual(response["X-Calendario-Truncado"], "true")
+
+
+class ProgresoTests(TestCase):
+    """
+    Avance por evento (con_progreso) y KPIs globales (resumen) en SQL.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@example.com", "clave-segura", is_staff=True
+        )
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        cls.ahora = timezone.now()
+        ayer = cls.ahora - timedelta(days=1)
+        manana = cls.ahora + timedelta(days=1)
+
+        cls.lleno = Evento.objects.create(
+            nombre="Lleno", fecha_inicio=ayer, fecha_fin=manana
+        )
+        cls.vacio = Evento.objects.create(
+            nombre="Vacío", fecha_inicio=ayer, fecha_fin=manana, activo=False
+        )
+        vencida = Tarea.objects.create(
+            evento=cls.lleno, nombre="Vencida", fecha_inicio=ayer, fecha_fin=ayer
+        )
+        Tarea.objects.create(
+            evento=cls.lleno,
+            nombre="Completada vencida",
+            fecha_fin=ayer,
+            completada=True,
+        )
+        Tarea.objects.create(evento=cls.lleno, nombre="Sin fecha")
+        SubTarea.objects.create(tarea=vencida, nombre="Hecha", completada=True)
+        SubTarea.objects.create(tarea=vencida, nombre="Pendiente")
+
+    def test_con_progreso(self):
+        progreso = {
+            evento.nombre: (
+                evento.tareas_total,
+                evento.tareas_completadas,
+                evento.tareas_vencidas,
+                evento.subtareas_total,
+                evento.subtareas_completadas,
+            )
+            for evento in Evento.objects.con_progreso(self.ahora)
+        }
+        self.assertEqual(
+            progreso, {"Lleno": (3, 1, 1, 2, 1), "Vacío": (0, 0, 0, 0, 0)}
+        )
+
+    def test_resumen(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resumen = Evento.objects.resumen(self.ahora)
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(
+            resumen,
+            {
+                "eventos_total": 2,
+                "eventos_activos": 1,
+                "tareas_total": 3,
+                "tareas_completadas": 1,
+                "tareas_vencidas": 1,
+                "subtareas_total": 2,
+                "subtareas_completadas": 1,
+            },
+        )
+        # Sin eventos, los totales son 0 y no None
+        vacio = Evento.objects.filter(pk=self.vacio.pk).resumen(self.ahora)
+        self.assertEqual(vacio["tareas_total"], 0)
+        self.assertEqual(Evento.objects.none().resumen()["subtareas_total"], 0)
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(reverse("evento-resumen"), {"activo": "false"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.data["eventos_total"], response.data["tareas_total"]), (1, 0)
+        )
 
-# Create your tests here.
+        response = client.get(reverse("evento-detail", args=[self.lleno.pk]))
+        self.assertEqual(
+            (response.data["tareas_total"], response.data["subtareas_completadas"]),
+            (3, 1),
+        )
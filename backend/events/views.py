@@ -1,8 +1,21 @@
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.http import Http404
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from accounts.permissions import IsAdminOrRespAdmContable
+from core.cambios import hub
+from core.descargas import respuesta_archivo
+from core.rangos import rango_desde_params
+from core.serializers import AltaEnLoteMixin
+from core.sincronizacion import SincronizacionMixin
 from .models import Evento, Tarea, SubTarea, DocumentoROI
 from .serializers import (
     EventoSerializer,
@@ -12,18 +25,48 @@ from .serializers import (
     DocumentoROISerializer,
     DocumentoROIWriteSerializer,
     DocumentoROIClasificacionSerializer,
+    DocumentoROIPrioridadSerializer,
 )
 
 
-class EventoViewSet(viewsets.ModelViewSet):
+class EventoViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = Evento.objects.all().order_by("-fecha_inicio")
     serializer_class = EventoSerializer
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {"list": 6, "retrieve": 6, "resumen": 3}
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "list":
+            qs = qs.en_rango(*rango_desde_params(self.request.query_params))
+        return qs.con_progreso().prefetch_related(
+            "tareas__responsable", "tareas__subtareas"
+        )
+
+    @action(detail=False, methods=["get"], url_path="resumen")
+    def resumen(self, request):
+        """
+        KPIs del tablero en una sola consulta agregada.
+
+        GET /api/eventos/resumen/?activo=true
+        """
+        qs = Evento.objects.all()
+        activo = request.query_params.get("activo")
+        if activo is not None:
+            qs = qs.filter(activo=activo.lower() in ("1", "true", "si"))
+        return Response(qs.resumen(), status=status.HTTP_200_OK)
 
 
-class TareaViewSet(viewsets.ModelViewSet):
+class TareaViewSet(AltaEnLoteMixin, SincronizacionMixin, viewsets.ModelViewSet):
     queryset = Tarea.objects.all().order_by("-fecha_inicio")
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {"list": 4, "retrieve": 4}
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "list":
+            qs = qs.en_rango(*rango_desde_params(self.request.query_params))
+        return qs.select_related("responsable").prefetch_related("subtareas")
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -31,21 +74,43 @@ class TareaViewSet(viewsets.ModelViewSet):
         return TareaSerializer
 
 
-class SubTareaViewSet(viewsets.ModelViewSet):
+class SubTareaViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = SubTarea.objects.all()
     serializer_class = SubTareaSerializer
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {"list": 3, "retrieve": 3}
 
 
-class DocumentoROIViewSet(viewsets.ModelViewSet):
+class DocumentoROIViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     """
     CRUD de documentos ROI.
     - Admin y Responsable adm-contable pueden crear/editar.
-    - Clasificación de urgencia se hace manualmente desde el frontend o admin.
+    - Clasificación de urgencia manual desde el frontend o admin (`clasificar`),
+      o automática al guardar si origen_clasificacion es AUTOMATICO.
     - Endpoint `proximos` para ver los más cercanos por estados.
+    - Endpoint `prioridad` con el top K por puntaje calculado en SQL.
+    - Endpoint `archivo` para descargar el adjunto con control de acceso.
     """
     queryset = DocumentoROI.objects.all()
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {
+        "list": 6,
+        "retrieve": 6,
+        "proximos": 6,
+        # +1 cuando los candidatos no alcanzan para el top (ver prioritarios)
+        "prioridad": 4,
+        "archivo": 3,
+    }
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "archivo":
+            return qs
+        # El serializer anida el evento con sus tareas y subtareas
+        return qs.select_related("evento_relacionado").prefetch_related(
+            "evento_relacionado__tareas__responsable",
+            "evento_relacionado__tareas__subtareas",
+        )
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -82,6 +147,17 @@ class DocumentoROIViewSet(viewsets.ModelViewSet):
             documento.estado_proceso = datos["estado_proceso"]
 
         documento.save()
+        hub.publicar_al_confirmar(
+            "roi",
+            lambda: [
+                {
+                    "documento": documento.pk,
+                    "estado_urgencia": documento.estado_urgencia,
+                    "estado_proceso": documento.estado_proceso,
+                    "origen_clasificacion": documento.origen_clasificacion,
+                }
+            ],
+        )
         return Response(
             DocumentoROISerializer(documento).data,
             status=status.HTTP_200_OK,
@@ -105,3 +181,118 @@ class DocumentoROIViewSet(viewsets.ModelViewSet):
         qs = qs.order_by("fecha_evento")
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="prioridad")
+    def prioridad(self, request):
+        """
+        Top K de ROI por puntaje de prioridad (días al límite de oferta,
+        días al evento, urgencia y estado). Excluye cerrados por defecto.
+
+        GET /api/documentos-roi/prioridad/?limite=20&estados=PENDIENTE,EN_ANALISIS
+        """
+        try:
+            limite = int(request.query_params.get("limite", 20))
+        except ValueError:
+            return Response(
+                {"limite": "Debe ser un número entero."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limite = max(1, min(limite, 100))
+
+        estados = request.query_params.get("estados")
+        qs = DocumentoROI.objects.select_related("evento_relacionado")
+        if estados:
+            lista_estados = [e.strip() for e in estados.split(",") if e.strip()]
+            qs = qs.filter(estado_proceso__in=lista_estados)
+        else:
+            qs = qs.exclude(estado_proceso=DocumentoROI.ESTADO_CERRADO)
+
+        serializer = DocumentoROIPrioridadSerializer(qs.prioritarios(limite), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"], url_path="archivo")
+    def archivo(self, request, pk=None):
+        """
+        Descarga protegida del archivo adjunto (MEDIA no se publica en
+        producción). Soporta Range, ETag y X-Accel-Redirect/X-Sendfile.
+
+        GET /api/documentos-roi/{id}/archivo/?descargar=1
+        """
+        documento = self.get_object()
+        if not documento.archivo:
+            raise Http404("El documento no tiene archivo adjunto.")
+        descargar = request.query_params.get("descargar") in ("1", "true")
+        try:
+            return respuesta_archivo(request, documento.archivo, descargar=descargar)
+        except FileNotFoundError:
+            raise Http404("El archivo no existe en el almacenamiento.")
+
+
+# Rango máximo del calendario y elementos por respuesta
+MAX_DIAS_CALENDARIO = 93
+MAX_ITEMS_CALENDARIO = 5000
+
+
+def _item_calendario(tipo, fila):
+    fila["fecha_inicio"] = timezone.localtime(fila["fecha_inicio"])
+    fila["fecha_fin"] = timezone.localtime(fila["fecha_fin"])
+    return {"tipo": tipo, **fila}
+
+
+class CalendarioView(APIView):
+    """
+    Eventos y tareas que se solapan con un rango, en un solo flujo
+    ordenado por fecha de inicio.
+
+    GET /api/calendario/?desde=2025-01-06&hasta=2025-01-12
+
+    El rango admite hasta MAX_DIAS_CALENDARIO días. Se devuelven como
+    máximo MAX_ITEMS_CALENDARIO elementos; si hay más, la respuesta trae
+    `X-Calendario-Truncado: true` y hay que pedir un rango más corto.
+    """
+
+    permission_classes = [IsAdminOrRespAdmContable]
+
+    def get(self, request):
+        desde, hasta = rango_desde_params(request.query_params, requerido=True)
+        if hasta - desde > timedelta(days=MAX_DIAS_CALENDARIO):
+            raise ValidationError(
+                f"El rango no puede superar {MAX_DIAS_CALENDARIO} días."
+            )
+
+        eventos = (
+            Evento.objects.en_rango(desde, hasta)
+            .order_by("fecha_inicio", "id")
+            .values("id", "nombre", "fecha_inicio", "fecha_fin", "lugar", "activo")
+        )
+        tareas = (
+            Tarea.objects.en_rango(desde, hasta)
+            .order_by("fecha_inicio", "id")
+            .values(
+                "id",
+                "nombre",
+                "fecha_inicio",
+                "fecha_fin",
+                "evento_id",
+                "responsable_id",
+                "completada",
+            )
+        )
+
+        # Ambas consultas ya vienen ordenadas: se mezclan en O(n) sin re-ordenar.
+        # Cada una se corta en el máximo (+1 para detectar el exceso).
+        limite = MAX_ITEMS_CALENDARIO + 1
+        items = list(
+            islice(
+                heapq.merge(
+                    (_item_calendario("evento", e) for e in eventos[:limite]),
+                    (_item_calendario("tarea", t) for t in tareas[:limite]),
+                    key=lambda item: item["fecha_inicio"],
+                ),
+                limite,
+            )
+        )
+        response = Response(items[:MAX_ITEMS_CALENDARIO], status=status.HTTP_200_OK)
+        if len(items) > MAX_ITEMS_CALENDARIO:
+            response["X-Calendario-Truncado"] = "true"
+        return response
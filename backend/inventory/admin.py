@@ -13,5 +13,49 @@ admin.site.register(Marca)
 admin.site.register(Categoria)
 admin.site.register(UnidadMedida)
 admin.site.register(TipoEstado)
-admin.site.register(Producto)
-admin.site.register(MovimientoInventario)
+
+
+@admin.register(Producto)
+class ProductoAdmin(admin.ModelAdmin):
+    list_display = (
+        "codigo_producto",
+        "nombre",
+        "stock",
+        "unidad_medida",
+        "tipo_estado",
+        "marca",
+        "categoria",
+    )
+    list_filter = ("tipo_estado", "categoria")
+    list_select_related = ("unidad_medida", "tipo_estado", "marca", "categoria")
+    search_fields = ("codigo_producto", "nombre")
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        if change and "stock" in form.changed_data:
+            stock = obj.stock
+            obj.stock = form.initial["stock"]
+            obj.ajustar_stock(stock)
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(MovimientoInventario)
+class MovimientoInventarioAdmin(admin.ModelAdmin):
+    list_display = ("producto", "tipo", "cantidad", "fecha", "referencia")
+    list_filter = ("tipo",)
+    list_select_related = ("producto",)
+    search_fields = ("referencia", "producto__codigo_producto", "producto__nombre")
+    autocomplete_fields = ("producto",)
+    date_hierarchy = "fecha"
+    show_full_result_count = False
+
+    # Los saldos arrastrados del archivado no se editan ni se eliminan
+    def has_change_permission(self, request, obj=None):
+        if obj is not None and obj.saldo_inicial:
+            return False
+        return super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and obj.saldo_inicial:
+            return False
+        return super().has_delete_permission(request, obj)
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        from core.catalogos import registro
+        from .models import Categoria, Marca, TipoEstado, UnidadMedida
+        from .serializers import (
+            CategoriaSerializer,
+            MarcaSerializer,
+            TipoEstadoSerializer,
+            UnidadMedidaSerializer,
+        )
+
+        registro.registrar(Marca, MarcaSerializer)
+        registro.registrar(Categoria, CategoriaSerializer)
+        registro.registrar(UnidadMedida, UnidadMedidaSerializer)
+        registro.registrar(TipoEstado, TipoEstadoSerializer)
@@ -0,0 +1,134 @@
+"""
+Archivado de movimientos: tabla caliente (MovimientoInventario) y fría
+(MovimientoArchivado).
+
+`archivar(horizonte)` mueve los movimientos anteriores al horizonte, por
+lotes de productos y con SQL en bloque (sin cargar filas en Python):
+
+1. INSERT ... SELECT de los movimientos reales a la tabla fría.
+2. Registro de las eliminaciones (INSERT ... SELECT en Eliminacion), para
+   que el feed `?updated_since=` las informe junto al saldo nuevo.
+3. DELETE de esas filas (y de los saldos arrastrados previos).
+4. INSERT de una fila `saldo_inicial` por producto con el neto archivado,
+   fechada justo antes del horizonte.
+
+El stock no cambia: en modo triggers el DELETE resta el neto y el saldo lo
+vuelve a sumar; en modo ORM ninguna de las dos sentencias lo toca. La suma
+de la tabla caliente sigue cuadrando con Producto.stock y el resumen
+diario conserva los días archivados. Los saldos arrastrados son de solo
+lectura en la API.
+
+El horizonte es siempre una medianoche local, de modo que ningún día
+queda repartido entre las dos tablas.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import DateTimeField, Value
+from django.utils import timezone
+
+from core.sincronizacion import registrar_eliminaciones
+from .models import MovimientoArchivado, MovimientoInventario
+
+# Productos por transacción
+LOTE_PRODUCTOS = 500
+
+COLUMNAS = ("id", "producto_id", "tipo", "cantidad", "fecha", "referencia")
+
+
+def horizonte(dias=None, hoy=None):
+    """
+    Medianoche local de hace `dias` días (INVENTARIO_ARCHIVO_DIAS por defecto).
+    """
+    if dias is None:
+        dias = settings.INVENTARIO_ARCHIVO_DIAS
+    hoy = hoy or timezone.localdate()
+    return timezone.make_aware(datetime.combine(hoy - timedelta(days=dias), time.min))
+
+
+def horizonte_de_fecha(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def pendientes(antes_de):
+    """
+    Movimientos reales que se archivarían con este horizonte.
+    """
+    return MovimientoInventario.objects.filter(fecha__lt=antes_de, saldo_inicial=False)
+
+
+def archivar(antes_de, lote=LOTE_PRODUCTOS):
+    """
+    Archiva los movimientos con fecha < antes_de. Devuelve
+    {"productos": n, "archivados": n, "saldos": n}.
+    """
+    # Solo productos con movimientos reales: un producto cuyo único
+    # movimiento viejo es el saldo ya arrastrado no tiene nada que archivar
+    productos = list(
+        pendientes(antes_de)
+        .order_by("producto_id")
+        .values_list("producto_id", flat=True)
+        .distinct()
+    )
+    totales = {"productos": len(productos), "archivados": 0, "saldos": 0}
+    for i in range(0, len(productos), lote):
+        archivados, saldos = _archivar_lote(productos[i : i + lote], antes_de)
+        totales["archivados"] += archivados
+        totales["saldos"] += saldos
+    return totales
+
+
+@transaction.atomic
+def _archivar_lote(productos, antes_de):
+    viejos = MovimientoInventario.objects.filter(
+        producto_id__in=productos, fecha__lt=antes_de
+    ).order_by()
+    # Incluye los saldos arrastrados de archivados anteriores
+    netos = viejos.deltas_por_producto()
+
+    ahora = timezone.now()
+    seleccion, params_seleccion = (
+        viejos.filter(saldo_inicial=False)
+        .annotate(archivado=Value(ahora, output_field=DateTimeField()))
+        .values_list(*COLUMNAS, "archivado")
+        .query.sql_with_params()
+    )
+    ids, params_ids = viejos.values("id").query.sql_with_params()
+
+    caliente = MovimientoInventario._meta.db_table
+    fria = MovimientoArchivado._meta.db_table
+    columnas = ", ".join(COLUMNAS + ("fecha_archivado",))
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {fria} ({columnas}) {seleccion}", params_seleccion)
+        archivados = cursor.rowcount
+        registrar_eliminaciones(viejos, ahora)
+        cursor.execute(f"DELETE FROM {caliente} WHERE id IN ({ids})", params_ids)
+
+        campo = MovimientoInventario._meta.get_field
+        fecha_saldo = campo("fecha").get_db_prep_value(
+            antes_de - timedelta(microseconds=1), connection
+        )
+        actualizado = campo("fecha_actualizacion").get_db_prep_value(ahora, connection)
+        referencia = f"Saldo arrastrado al {timezone.localdate(antes_de):%Y-%m-%d}"
+        saldos = [
+            (
+                producto,
+                "entrada" if neto >= 0 else "salida",
+                abs(neto),
+                fecha_saldo,
+                referencia,
+                actualizado,
+                True,
+            )
+            for producto, neto in netos.items()
+            if neto
+        ]
+        cursor.executemany(
+            f"INSERT INTO {caliente} (producto_id, tipo, cantidad, fecha, referencia, "
+            "fecha_actualizacion, saldo_inicial) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            saldos,
+        )
+    return archivados, len(saldos)
@@ -0,0 +1,88 @@
+"""
+Conciliación de Producto.stock contra la suma de sus movimientos.
+
+Los productos se reparten en rangos de ids contiguos con la misma cantidad
+de productos cada uno. Cada rango se verifica con una sola consulta
+(LEFT JOIN + GROUP BY ... HAVING) que devuelve solo los productos con
+diferencia, de modo que los rangos se pueden procesar en paralelo, uno
+por proceso y con su propia conexión.
+
+El stock esperado es Producto.stock_inicial (stock de apertura fijado en
+el alta, el importador o un ajuste manual) más la suma de movimientos.
+La suma incluye los saldos arrastrados del archivado (ver archivado.py),
+así que los productos con movimientos archivados concilian igual.
+
+La reparación no toca los productos sin ningún movimiento: una diferencia
+ahí solo puede venir de un stock escrito por fuera del modelo (UPDATE
+directo, carga de datos) y se incluyen únicamente si se pide de forma
+explícita.
+"""
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Producto, aplicar_deltas_stock, delta_stock
+
+# Productos por rango
+LOTE = 5000
+
+
+def rangos(lote=LOTE):
+    """
+    Rangos (desde_id, hasta_id, productos), ids inclusivos, de `lote`
+    productos cada uno.
+    """
+    ids = list(Producto.objects.order_by("pk").values_list("pk", flat=True))
+    rangos = []
+    for i in range(0, len(ids), lote):
+        bloque = ids[i : i + lote]
+        rangos.append((bloque[0], bloque[-1], len(bloque)))
+    return rangos
+
+
+def diferencias(desde, hasta):
+    """
+    [(producto_id, stock, calculado, movimientos), ...] de los productos
+    del rango de ids cuyo stock no coincide con el stock de apertura más
+    la suma de sus movimientos.
+    """
+    return list(
+        Producto.objects.filter(pk__gte=desde, pk__lte=hasta)
+        .order_by()
+        .annotate(
+            calculado=F("stock_inicial")
+            + Coalesce(
+                Sum(delta_stock(F("movimientos__tipo"), F("movimientos__cantidad"))), 0
+            ),
+            cantidad_movimientos=Count("movimientos"),
+        )
+        .exclude(stock=F("calculado"))
+        .values_list("pk", "stock", "calculado", "cantidad_movimientos")
+    )
+
+
+def reparables(filas, sin_movimientos=False):
+    """
+    Filas de diferencias() que se pueden reparar: las de productos con
+    movimientos, o todas si `sin_movimientos`.
+    """
+    return [fila for fila in filas if sin_movimientos or fila[3]]
+
+
+def reparar(filas):
+    """
+    Ajusta el stock al calculado. Se aplica como delta (UPDATE stock =
+    stock + diferencia) para no pisar movimientos registrados después de
+    la lectura.
+    """
+    aplicar_deltas_stock(
+        {pk: calculado - stock for pk, stock, calculado, _movimientos in filas}
+    )
+
+
+def conciliar_rango(rango):
+    """
+    Tarea del pool: (rango, diferencias del rango).
+    """
+    desde, hasta, _productos = rango
+    return rango, diferencias(desde, hasta)
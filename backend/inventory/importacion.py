@@ -0,0 +1,280 @@
+"""
+Importación masiva del catálogo de productos desde CSV o XLSX.
+
+- El archivo se lee fila a fila (sin cargarlo entero en memoria).
+- Los catálogos (marca, categoría, unidad de medida, tipo de estado) se
+  resuelven por nombre contra un diccionario precargado por catálogo; los
+  que no existen se crean en bloque.
+- Los productos se insertan o actualizan por `codigo_producto` con
+  bulk_create(update_conflicts=True), por lotes.
+- El stock solo se fija al crear: en productos existentes lo mantienen
+  los movimientos.
+- Un archivo ilegible (codificación, CSV mal formado, XLSX corrupto)
+  corta la importación con ErrorImportacion. Los lotes ya procesados
+  quedan guardados; como se importa por código, se puede reintentar con
+  el archivo corregido.
+"""
+
+import csv
+import io
+import os
+from zipfile import BadZipFile
+
+from django.db import transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
+
+from .models import Categoria, Marca, Producto, TipoEstado, UnidadMedida
+
+LOTE = 2000
+MAX_ERRORES = 1000
+
+# Rango de IntegerField (stock, stock mínimo). SQLite acepta 64 bits, pero
+# el mismo archivo debe importar igual en PostgreSQL.
+ENTERO_MIN, ENTERO_MAX = BaseDatabaseOperations.integer_field_ranges["IntegerField"]
+
+COLUMNAS_REQUERIDAS = ("codigo_producto", "nombre", "unidad_medida", "tipo_estado")
+
+# max_length de cada columna de texto (producto y nombre de cada catálogo)
+LARGOS = {
+    "codigo_producto": 50,
+    "nombre": 150,
+    "unidad_medida": 50,
+    "tipo_estado": 50,
+    "marca": 100,
+    "categoria": 100,
+}
+
+CAMPOS_ACTUALIZABLES = [
+    "nombre",
+    "stock_minimo_inicial",
+    "unidad_medida",
+    "tipo_estado",
+    "marca",
+    "categoria",
+    "fecha_actualizacion",
+]
+
+
+class ErrorImportacion(Exception):
+    pass
+
+
+def _ilegible(numero, exc):
+    return ErrorImportacion(
+        f"No se pudo leer el archivo después de la fila {numero}: {exc}"
+    )
+
+
+def _leer_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    numero = 1
+    try:
+        for numero, fila in enumerate(csv.DictReader(texto), start=2):
+            yield fila
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise _ilegible(numero, exc)
+
+
+def _leer_xlsx(archivo):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ErrorImportacion(
+            "Para importar XLSX se requiere openpyxl (pip install openpyxl)."
+        )
+
+    numero = 1
+    try:
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [
+            str(c).strip() if c is not None else "" for c in next(filas, ())
+        ]
+        for numero, valores in enumerate(filas, start=2):
+            yield {
+                encabezado: "" if valor is None else str(valor)
+                for encabezado, valor in zip(encabezados, valores)
+            }
+    # KeyError: el ZIP es válido pero le faltan partes del libro
+    except (BadZipFile, InvalidFileException, KeyError) as exc:
+        raise _ilegible(numero, exc)
+    libro.close()
+
+
+def leer_filas(archivo, nombre):
+    extension = os.path.splitext(nombre)[1].lower()
+    if extension == ".csv":
+        return _leer_csv(archivo)
+    if extension == ".xlsx":
+        return _leer_xlsx(archivo)
+    raise ErrorImportacion("Formato no soportado, use .csv o .xlsx.")
+
+
+class _Catalogo:
+    """
+    Diccionario nombre -> id de un catálogo, precargado con una consulta.
+    """
+
+    def __init__(self, modelo, campos_busqueda=("nombre",)):
+        self.modelo = modelo
+        self.ids = {}
+        self.creados = 0
+        for fila in modelo.objects.values("id", *campos_busqueda):
+            for campo in campos_busqueda:
+                self.ids.setdefault(fila[campo].strip().lower(), fila["id"])
+
+    def crear_faltantes(self, nombres):
+        faltantes = {}
+        for nombre in nombres:
+            clave = nombre.lower()
+            if nombre and clave not in self.ids:
+                faltantes.setdefault(clave, nombre)
+        if not faltantes:
+            return
+        nuevos = self.modelo.objects.bulk_create(
+            [self._nuevo(nombre) for nombre in faltantes.values()]
+        )
+        for clave, objeto in zip(faltantes, nuevos):
+            self.ids[clave] = objeto.pk
+        self.creados += len(nuevos)
+
+    def _nuevo(self, nombre):
+        if self.modelo is UnidadMedida:
+            return UnidadMedida(nombre=nombre, nomenclatura=nombre[:10])
+        return self.modelo(nombre=nombre)
+
+    def id(self, nombre):
+        return self.ids.get(nombre.lower()) if nombre else None
+
+
+def _entero(valor, campo, errores, minimo=None, defecto=None):
+    valor = (valor or "").strip()
+    if not valor:
+        if defecto is None:
+            errores[campo] = "Campo requerido."
+        return defecto
+    try:
+        # int() de inf lanza OverflowError y el de nan, ValueError
+        numero = int(float(valor))
+    except (ValueError, OverflowError):
+        errores[campo] = "Debe ser un número entero."
+        return None
+    if minimo is not None and numero < minimo:
+        errores[campo] = f"Debe ser mayor o igual a {minimo}."
+    elif not ENTERO_MIN <= numero <= ENTERO_MAX:
+        errores[campo] = f"Debe estar entre {ENTERO_MIN} y {ENTERO_MAX}."
+    return numero
+
+
+def _validar(fila):
+    campos_texto = (
+        "codigo_producto",
+        "nombre",
+        "unidad_medida",
+        "tipo_estado",
+        "marca",
+        "categoria",
+    )
+    datos = {campo: (fila.get(campo) or "").strip() for campo in campos_texto}
+    errores = {}
+    for campo in COLUMNAS_REQUERIDAS:
+        if not datos[campo]:
+            errores[campo] = "Campo requerido."
+    for campo, largo in LARGOS.items():
+        if len(datos[campo]) > largo:
+            errores[campo] = f"Máximo {largo} caracteres."
+    datos["stock_minimo_inicial"] = _entero(
+        fila.get("stock_minimo_inicial"),
+        "stock_minimo_inicial",
+        errores,
+        minimo=0,
+        defecto=0,
+    )
+    datos["stock"] = _entero(fila.get("stock"), "stock", errores, defecto=0)
+    return datos, errores
+
+
+class ImportadorProductos:
+    def __init__(self, lote=LOTE):
+        self.lote = lote
+        self.catalogos = {
+            "marca": _Catalogo(Marca),
+            "categoria": _Catalogo(Categoria),
+            "unidad_medida": _Catalogo(UnidadMedida, ("nombre", "nomenclatura")),
+            "tipo_estado": _Catalogo(TipoEstado),
+        }
+        self.creados = 0
+        self.actualizados = 0
+        self.errores = []
+        self.total_errores = 0
+
+    def _error(self, numero, errores):
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append({"fila": numero, "errores": errores})
+
+    @transaction.atomic
+    def _procesar_lote(self, lote):
+        for campo, catalogo in self.catalogos.items():
+            catalogo.crear_faltantes({datos[campo] for _, datos in lote})
+
+        # Un mismo código repetido en el lote: gana la última fila
+        productos = {}
+        for _, datos in lote:
+            productos[datos["codigo_producto"]] = Producto(
+                codigo_producto=datos["codigo_producto"],
+                nombre=datos["nombre"],
+                stock_minimo_inicial=datos["stock_minimo_inicial"],
+                stock=datos["stock"],
+                stock_inicial=datos["stock"],
+                **{
+                    f"{campo}_id": catalogo.id(datos[campo])
+                    for campo, catalogo in self.catalogos.items()
+                },
+            )
+
+        existentes = set(
+            Producto.objects.filter(codigo_producto__in=productos).values_list(
+                "codigo_producto", flat=True
+            )
+        )
+        Producto.objects.bulk_create(
+            productos.values(),
+            update_conflicts=True,
+            unique_fields=["codigo_producto"],
+            update_fields=CAMPOS_ACTUALIZABLES,
+        )
+        self.actualizados += len(existentes)
+        self.creados += len(productos) - len(existentes)
+
+    def importar(self, filas):
+        lote = []
+        # La fila 1 es el encabezado
+        for numero, fila in enumerate(filas, start=2):
+            datos, errores = _validar(fila)
+            if errores:
+                self._error(numero, errores)
+                continue
+            lote.append((numero, datos))
+            if len(lote) >= self.lote:
+                self._procesar_lote(lote)
+                lote = []
+        if lote:
+            self._procesar_lote(lote)
+        return self.resultado()
+
+    def resultado(self):
+        return {
+            "creados": self.creados,
+            "actualizados": self.actualizados,
+            "catalogos_creados": {
+                campo: catalogo.creados for campo, catalogo in self.catalogos.items()
+            },
+            "total_errores": self.total_errores,
+            "errores": self.errores,
+        }
+
+
+def importar_productos(archivo, nombre, lote=LOTE):
+    return ImportadorProductos(lote).importar(leer_filas(archivo, nombre))
@@ -0,0 +1,78 @@
+"""
+Kardex: saldo de stock acumulado movimiento a movimiento.
+
+El saldo se calcula en SQL con funciones de ventana:
+
+    saldo = stock_actual - SUM(delta) OVER (PARTITION BY producto)
+            + SUM(delta) OVER (PARTITION BY producto ORDER BY fecha, id)
+
+es decir, el stock inicial implícito más el acumulado hasta cada fila.
+Las filas se recorren con `iterator()` y se escriben a medida que llegan,
+así que la memoria no crece con la cantidad de movimientos.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Sum, Window
+from django.utils import timezone
+
+from .models import MovimientoInventario, delta_stock
+
+FORMATOS = ("json", "csv")
+COLUMNAS = ("producto", "movimiento", "fecha", "tipo", "cantidad", "referencia", "saldo")
+CHUNK = 2000
+
+
+def kardex(productos=None):
+    """
+    Filas (producto, movimiento, fecha, tipo, cantidad, referencia, saldo)
+    ordenadas por producto, fecha e id.
+    """
+    qs = MovimientoInventario.objects.order_by()
+    if productos is not None:
+        qs = qs.filter(producto_id__in=productos)
+
+    delta = delta_stock(F("tipo"), F("cantidad"))
+    particion = [F("producto_id")]
+    return (
+        qs.annotate(
+            saldo=F("producto__stock")
+            - Window(Sum(delta), partition_by=particion)
+            + Window(
+                Sum(delta),
+                partition_by=particion,
+                order_by=[F("fecha").asc(), F("id").asc()],
+            )
+        )
+        .order_by("producto_id", "fecha", "id")
+        .values_list("producto_id", "id", "fecha", "tipo", "cantidad", "referencia", "saldo")
+    )
+
+
+class _Eco:
+    """Buffer mínimo para que csv.writer devuelva cada línea."""
+
+    def write(self, valor):
+        return valor
+
+
+def filas_csv(filas):
+    writer = csv.writer(_Eco())
+    yield writer.writerow(COLUMNAS)
+    for fila in filas.iterator(chunk_size=CHUNK):
+        fila = list(fila)
+        fila[2] = timezone.localtime(fila[2]).isoformat()
+        yield writer.writerow(fila)
+
+
+def filas_json(filas):
+    yield "["
+    separador = ""
+    for fila in filas.iterator(chunk_size=CHUNK):
+        item = dict(zip(COLUMNAS, fila))
+        item["fecha"] = timezone.localtime(item["fecha"])
+        yield separador + json.dumps(item, cls=DjangoJSONEncoder)
+        separador = ","
+    yield "]"
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventory import archivado
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve los movimientos anteriores al horizonte a la tabla de archivo "
+        "y deja un saldo arrastrado por producto. El stock no cambia."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            help="Antigüedad en días (por defecto INVENTARIO_ARCHIVO_DIAS).",
+        )
+        parser.add_argument(
+            "--antes-de",
+            help="Fecha YYYY-MM-DD: archiva lo anterior a esa medianoche local.",
+        )
+        parser.add_argument("--lote", type=int, default=archivado.LOTE_PRODUCTOS)
+        parser.add_argument(
+            "--simular",
+            action="store_true",
+            help="Solo cuenta los movimientos que se archivarían.",
+        )
+
+    def handle(self, *args, **options):
+        if options["antes_de"]:
+            fecha = parse_date(options["antes_de"])
+            if fecha is None:
+                raise CommandError("--antes-de debe tener formato YYYY-MM-DD.")
+            horizonte = archivado.horizonte_de_fecha(fecha)
+        else:
+            horizonte = archivado.horizonte(options["dias"])
+
+        if options["simular"]:
+            total = archivado.pendientes(horizonte).count()
+            self.stdout.write(f"{total} movimientos anteriores a {horizonte:%Y-%m-%d}.")
+            return
+
+        inicio = time.perf_counter()
+        resultado = archivado.archivar(horizonte, lote=options["lote"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado['archivados']} movimientos archivados "
+                f"(anteriores a {horizonte:%Y-%m-%d}) de {resultado['productos']} "
+                f"productos, {resultado['saldos']} saldos arrastrados, "
+                f"en {time.perf_counter() - inicio:.1f} s."
+            )
+        )
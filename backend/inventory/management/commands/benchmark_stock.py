@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from inventory import triggers
+from inventory.models import (
+    MovimientoInventario,
+    Producto,
+    TipoEstado,
+    UnidadMedida,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara movimientos/seg registrando stock por ORM y por triggers. "
+        "Todo se ejecuta en una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movimientos", type=int, default=2000)
+
+    def _medir(self, producto, cantidad):
+        inicio = time.perf_counter()
+        for i in range(cantidad):
+            MovimientoInventario.objects.create(
+                producto=producto,
+                tipo="entrada" if i % 2 else "salida",
+                cantidad=1 + i % 5,
+            )
+        duracion = time.perf_counter() - inicio
+
+        producto.refresh_from_db(fields=["stock"])
+        esperado = sum(
+            (1 + i % 5) * (1 if i % 2 else -1) for i in range(cantidad)
+        )
+        return cantidad / duracion, producto.stock == esperado
+
+    def handle(self, *args, **options):
+        cantidad = options["movimientos"]
+
+        with transaction.atomic():
+            unidad = UnidadMedida.objects.create(nombre="bench", nomenclatura="b")
+            estado = TipoEstado.objects.create(nombre="bench")
+
+            def producto(codigo):
+                return Producto.objects.create(
+                    codigo_producto=codigo,
+                    nombre=codigo,
+                    stock_minimo_inicial=0,
+                    stock=0,
+                    unidad_medida=unidad,
+                    tipo_estado=estado,
+                )
+
+            with override_settings(INVENTARIO_STOCK_TRIGGERS=False):
+                triggers.desinstalar(connection)
+                orm, orm_ok = self._medir(producto("BENCH-ORM"), cantidad)
+
+            with override_settings(INVENTARIO_STOCK_TRIGGERS=True):
+                triggers.instalar(connection)
+                trig, trig_ok = self._medir(producto("BENCH-TRIGGER"), cantidad)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"ORM:      {orm:10.0f} mov/s  stock correcto: {orm_ok}")
+        self.stdout.write(f"Triggers: {trig:10.0f} mov/s  stock correcto: {trig_ok}")
+        self.stdout.write(f"Mejora:   {trig / orm:.2f}x")
@@ -0,0 +1,126 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from inventory import conciliacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que Producto.stock sea igual a su stock de apertura más la "
+        "suma de sus movimientos, "
+        "repartiendo los productos por rangos de id entre varios procesos. "
+        "Con --reparar ajusta el stock de los productos con diferencia que "
+        "tienen movimientos; los que no tienen ninguno solo se reparan con "
+        "--incluir-sin-movimientos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--procesos",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Procesos en paralelo (1 = en este proceso).",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=conciliacion.LOTE,
+            help="Productos por rango.",
+        )
+        parser.add_argument("--reparar", action="store_true")
+        parser.add_argument(
+            "--incluir-sin-movimientos",
+            action="store_true",
+            help=(
+                "Con --reparar, lleva también a su stock de apertura los "
+                "productos sin movimientos."
+            ),
+        )
+        parser.add_argument(
+            "--mostrar",
+            type=int,
+            default=20,
+            help="Diferencias a listar en el informe.",
+        )
+
+    def handle(self, *args, **options):
+        if options["procesos"] < 1 or options["lote"] < 1:
+            raise CommandError("--procesos y --lote deben ser mayores que 0.")
+
+        inicio = time.perf_counter()
+        rangos = conciliacion.rangos(options["lote"])
+        total = sum(productos for _desde, _hasta, productos in rangos)
+        self.stdout.write(
+            f"{total} productos en {len(rangos)} rangos, "
+            f"{min(options['procesos'], len(rangos) or 1)} procesos."
+        )
+
+        diferencias = []
+        for hechos, ((desde, hasta, productos), filas) in enumerate(
+            self._conciliar(rangos, options["procesos"]), start=1
+        ):
+            diferencias.extend(filas)
+            self.stdout.write(
+                f"  [{hechos}/{len(rangos)}] ids {desde}-{hasta}: "
+                f"{productos} productos, {len(filas)} con diferencia "
+                f"({time.perf_counter() - inicio:.1f} s)"
+            )
+
+        diferencias.sort()
+        for pk, stock, calculado, movimientos in diferencias[: options["mostrar"]]:
+            detalle = f"movimientos {calculado}" if movimientos else "sin movimientos"
+            self.stdout.write(
+                f"  producto {pk}: stock {stock}, {detalle} ({calculado - stock:+d})"
+            )
+        if len(diferencias) > options["mostrar"]:
+            self.stdout.write(f"  ... y {len(diferencias) - options['mostrar']} más.")
+
+        reparados = []
+        if options["reparar"]:
+            reparados = conciliacion.reparables(
+                diferencias, options["incluir_sin_movimientos"]
+            )
+            with transaction.atomic():
+                conciliacion.reparar(reparados)
+        resultado = f"{len(diferencias)} productos con diferencia"
+        if options["reparar"]:
+            resultado += f", {len(reparados)} reparados"
+            omitidos = len(diferencias) - len(reparados)
+            if omitidos:
+                resultado += (
+                    f" ({omitidos} sin movimientos omitidos; "
+                    "use --incluir-sin-movimientos)"
+                )
+        estilo = (
+            self.style.WARNING
+            if len(reparados) < len(diferencias)
+            else self.style.SUCCESS
+        )
+        self.stdout.write(
+            estilo(
+                f"{total} productos revisados, {resultado}, "
+                f"en {time.perf_counter() - inicio:.1f} s."
+            )
+        )
+
+    def _conciliar(self, rangos, procesos):
+        """
+        Resultados (rango, diferencias) a medida que terminan los rangos.
+        """
+        if procesos == 1 or len(rangos) <= 1:
+            for rango in rangos:
+                yield conciliacion.conciliar_rango(rango)
+            return
+
+        # Cada proceso abre su propia conexión: no se heredan las del padre
+        # (fork) y django.setup() configura los procesos nuevos (spawn)
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=procesos, initializer=django.setup) as pool:
+            tareas = [pool.submit(conciliacion.conciliar_rango, r) for r in rangos]
+            for tarea in as_completed(tareas):
+                yield tarea.result()
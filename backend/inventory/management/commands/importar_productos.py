@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importacion import LOTE, ErrorImportacion, importar_productos
+
+
+class Command(BaseCommand):
+    help = "Importa o actualiza productos desde un archivo CSV o XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ruta")
+        parser.add_argument("--lote", type=int, default=LOTE)
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options["ruta"], "rb") as archivo:
+                resultado = importar_productos(archivo, options["ruta"], options["lote"])
+        except (OSError, ErrorImportacion) as exc:
+            raise CommandError(str(exc))
+        duracion = time.perf_counter() - inicio
+
+        for error in resultado["errores"]:
+            self.stderr.write(f"Fila {error['fila']}: {error['errores']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado['creados']} creados, {resultado['actualizados']} "
+                f"actualizados, {resultado['total_errores']} con errores "
+                f"en {duracion:.2f} s. Catálogos creados: {resultado['catalogos_creados']}"
+            )
+        )
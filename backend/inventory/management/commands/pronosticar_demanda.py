@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import pronostico
+
+
+class Command(BaseCommand):
+    help = (
+        "Pronostica la demanda diaria de todos los productos a partir de las "
+        "salidas registradas y guarda el stock de seguridad y el punto de "
+        "reorden sugeridos (GET /api/productos/reabastecimiento/). Requiere numpy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=pronostico.DIAS,
+            help="Días de historia a considerar.",
+        )
+        parser.add_argument(
+            "--ventana",
+            type=int,
+            default=pronostico.VENTANA,
+            help="Días de la media móvil.",
+        )
+        parser.add_argument(
+            "--alfa",
+            type=float,
+            default=pronostico.ALFA,
+            help="Factor del suavizado exponencial (0-1].",
+        )
+        parser.add_argument(
+            "--plazo",
+            type=int,
+            default=pronostico.PLAZO_DIAS,
+            help="Plazo de reposición en días.",
+        )
+        parser.add_argument(
+            "--nivel-servicio",
+            type=float,
+            default=pronostico.NIVEL_SERVICIO,
+            help="Probabilidad de no quedarse sin stock durante el plazo.",
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            resultado = pronostico.calcular(
+                dias=options["dias"],
+                ventana=options["ventana"],
+                alfa=options["alfa"],
+                plazo=options["plazo"],
+                nivel_servicio=options["nivel_servicio"],
+            )
+        except pronostico.ErrorPronostico as exc:
+            raise CommandError(str(exc))
+        calculo = time.perf_counter() - inicio
+
+        total = pronostico.guardar(resultado, plazo=options["plazo"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Pronóstico de {total} productos: cálculo {calculo:.1f} s, "
+                f"total {time.perf_counter() - inicio:.1f} s."
+            )
+        )
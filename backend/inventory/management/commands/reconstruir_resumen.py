@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory.models import ResumenDiarioMovimiento
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el resumen diario de movimientos por producto."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--producto",
+            type=int,
+            action="append",
+            help="Id de producto a reconstruir (se puede repetir).",
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        filas = ResumenDiarioMovimiento.reconstruir(productos=options["producto"])
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(
+            self.style.SUCCESS(f"{filas} filas de resumen creadas en {duracion:.2f} s.")
+        )
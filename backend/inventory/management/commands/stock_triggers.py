@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from inventory import triggers
+
+
+class Command(BaseCommand):
+    help = "Instala, elimina o consulta los triggers de stock de movimientos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("accion", choices=["instalar", "desinstalar", "estado"])
+
+    def handle(self, *args, **options):
+        accion = options["accion"]
+        if accion == "instalar":
+            triggers.instalar(connection)
+        elif accion == "desinstalar":
+            triggers.desinstalar(connection)
+
+        instalados = triggers.instalados(connection)
+        activo = triggers.stock_por_triggers()
+        self.stdout.write(
+            f"Triggers instalados: {'sí' if instalados else 'no'} | "
+            f"INVENTARIO_STOCK_TRIGGERS={activo}"
+        )
+        if instalados != activo:
+            self.stderr.write(
+                self.style.WARNING(
+                    "Los triggers y INVENTARIO_STOCK_TRIGGERS no coinciden: "
+                    "el stock se aplicaría dos veces o ninguna."
+                )
+            )
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db import migrations
+
+# SQL de los triggers tal como era al crear esta migración. Se copia aquí
+# en lugar de importar inventory/triggers.py, que puede cambiar después
+# sin que cambie lo que esta migración instaló.
+
+SQL_INSTALAR = {
+    "sqlite": [
+        """
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_ai
+        AFTER INSERT ON inventory_movimientoinventario
+        BEGIN
+            UPDATE inventory_producto
+            SET stock = stock + (CASE WHEN NEW.tipo = 'entrada' THEN NEW.cantidad ELSE -NEW.cantidad END)
+            WHERE id = NEW.producto_id;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_au
+        AFTER UPDATE OF producto_id, tipo, cantidad ON inventory_movimientoinventario
+        BEGIN
+            UPDATE inventory_producto
+            SET stock = stock - (CASE WHEN OLD.tipo = 'entrada' THEN OLD.cantidad ELSE -OLD.cantidad END)
+            WHERE id = OLD.producto_id;
+            UPDATE inventory_producto
+            SET stock = stock + (CASE WHEN NEW.tipo = 'entrada' THEN NEW.cantidad ELSE -NEW.cantidad END)
+            WHERE id = NEW.producto_id;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_ad
+        AFTER DELETE ON inventory_movimientoinventario
+        BEGIN
+            UPDATE inventory_producto
+            SET stock = stock - (CASE WHEN OLD.tipo = 'entrada' THEN OLD.cantidad ELSE -OLD.cantidad END)
+            WHERE id = OLD.producto_id;
+        END;
+        """,
+    ],
+    "postgresql": [
+        """
+        CREATE OR REPLACE FUNCTION inventory_movimiento_stock() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE inventory_producto
+                SET stock = stock - (CASE WHEN OLD.tipo = 'entrada' THEN OLD.cantidad ELSE -OLD.cantidad END)
+                WHERE id = OLD.producto_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE inventory_producto
+                SET stock = stock + (CASE WHEN NEW.tipo = 'entrada' THEN NEW.cantidad ELSE -NEW.cantidad END)
+                WHERE id = NEW.producto_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock ON inventory_movimientoinventario;",
+        """
+        CREATE TRIGGER inventory_movimiento_stock
+        AFTER INSERT OR UPDATE OF producto_id, tipo, cantidad OR DELETE
+        ON inventory_movimientoinventario
+        FOR EACH ROW EXECUTE FUNCTION inventory_movimiento_stock();
+        """,
+    ],
+}
+
+SQL_ELIMINAR = {
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock_ai;",
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock_au;",
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock_ad;",
+    ],
+    "postgresql": [
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock ON inventory_movimientoinventario;",
+        "DROP FUNCTION IF EXISTS inventory_movimiento_stock();",
+    ],
+}
+
+
+def _ejecutar(connection, sentencias):
+    if connection.vendor not in sentencias:
+        raise NotImplementedError(
+            f"Triggers de stock no soportados para '{connection.vendor}'."
+        )
+    # Sin parámetros: el SQL lleva % literales (strftime)
+    with connection.cursor() as cursor:
+        for sql in sentencias[connection.vendor]:
+            cursor.execute(sql)
+
+
+def instalar_triggers(apps, schema_editor):
+    # Solo se instalan si el modo está activo (INVENTARIO_STOCK_TRIGGERS=True);
+    # después se puede cambiar con `manage.py stock_triggers`.
+    if getattr(settings, "INVENTARIO_STOCK_TRIGGERS", False):
+        _ejecutar(schema_editor.connection, SQL_INSTALAR)
+
+
+def eliminar_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor in SQL_ELIMINAR:
+        _ejecutar(schema_editor.connection, SQL_ELIMINAR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_movimientoinventario'),
+    ]
+
+    operations = [
+        migrations.RunPython(instalar_triggers, eliminar_triggers),
+    ]
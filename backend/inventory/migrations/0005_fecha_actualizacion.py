@@ -0,0 +1,150 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+# SQL de los triggers tal como era al crear esta migración. Se copia aquí
+# en lugar de importar inventory/triggers.py, que puede cambiar después
+# sin que cambie lo que esta migración instaló.
+#
+# En SQLite, fecha_actualizacion con el mismo formato que guarda Django
+# (texto UTC) para que los filtros por fecha comparen bien.
+SQL_INSTALAR = {
+    "sqlite": [
+        """
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_ai
+        AFTER INSERT ON inventory_movimientoinventario
+        BEGIN
+            UPDATE inventory_producto
+            SET stock = stock + (CASE WHEN NEW.tipo = 'entrada' THEN NEW.cantidad ELSE -NEW.cantidad END),
+                fecha_actualizacion = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE id = NEW.producto_id;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_au
+        AFTER UPDATE OF producto_id, tipo, cantidad ON inventory_movimientoinventario
+        BEGIN
+            UPDATE inventory_producto
+            SET stock = stock - (CASE WHEN OLD.tipo = 'entrada' THEN OLD.cantidad ELSE -OLD.cantidad END),
+                fecha_actualizacion = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE id = OLD.producto_id;
+            UPDATE inventory_producto
+            SET stock = stock + (CASE WHEN NEW.tipo = 'entrada' THEN NEW.cantidad ELSE -NEW.cantidad END),
+                fecha_actualizacion = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE id = NEW.producto_id;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_ad
+        AFTER DELETE ON inventory_movimientoinventario
+        BEGIN
+            UPDATE inventory_producto
+            SET stock = stock - (CASE WHEN OLD.tipo = 'entrada' THEN OLD.cantidad ELSE -OLD.cantidad END),
+                fecha_actualizacion = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE id = OLD.producto_id;
+        END;
+        """,
+    ],
+    "postgresql": [
+        """
+        CREATE OR REPLACE FUNCTION inventory_movimiento_stock() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE inventory_producto
+                SET stock = stock - (CASE WHEN OLD.tipo = 'entrada' THEN OLD.cantidad ELSE -OLD.cantidad END),
+                    fecha_actualizacion = clock_timestamp()
+                WHERE id = OLD.producto_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE inventory_producto
+                SET stock = stock + (CASE WHEN NEW.tipo = 'entrada' THEN NEW.cantidad ELSE -NEW.cantidad END),
+                    fecha_actualizacion = clock_timestamp()
+                WHERE id = NEW.producto_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock ON inventory_movimientoinventario;",
+        """
+        CREATE TRIGGER inventory_movimiento_stock
+        AFTER INSERT OR UPDATE OF producto_id, tipo, cantidad OR DELETE
+        ON inventory_movimientoinventario
+        FOR EACH ROW EXECUTE FUNCTION inventory_movimiento_stock();
+        """,
+    ],
+}
+
+SQL_ELIMINAR = {
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock_ai;",
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock_au;",
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock_ad;",
+    ],
+    "postgresql": [
+        "DROP TRIGGER IF EXISTS inventory_movimiento_stock ON inventory_movimientoinventario;",
+        "DROP FUNCTION IF EXISTS inventory_movimiento_stock();",
+    ],
+}
+
+
+def _ejecutar(connection, sentencias):
+    if connection.vendor not in sentencias:
+        raise NotImplementedError(
+            f"Triggers de stock no soportados para '{connection.vendor}'."
+        )
+    # Sin parámetros: el SQL lleva % literales (strftime)
+    with connection.cursor() as cursor:
+        for sql in sentencias[connection.vendor]:
+            cursor.execute(sql)
+
+
+def reinstalar_triggers(apps, schema_editor):
+    # SQLite recrea la tabla de movimientos al agregar la columna (y con ella
+    # se pierden los triggers); además el UPDATE de stock ahora también
+    # marca fecha_actualizacion.
+    if getattr(settings, "INVENTARIO_STOCK_TRIGGERS", False):
+        _ejecutar(schema_editor.connection, SQL_ELIMINAR)
+        _ejecutar(schema_editor.connection, SQL_INSTALAR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_resumendiariomovimiento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoria',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='marca',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='movimientoinventario',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='tipoestado',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='unidadmedida',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(reinstalar_triggers, migrations.RunPython.noop),
+    ]
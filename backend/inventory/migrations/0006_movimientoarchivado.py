@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:47
+
+import importlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Reinstala el mismo SQL de triggers que 0005: se importa de esa migración
+# (inmutable) en lugar de copiarlo otra vez. El nombre empieza con dígito,
+# por eso importlib.
+_triggers = importlib.import_module("inventory.migrations.0005_fecha_actualizacion")
+
+
+def reinstalar_triggers(apps, schema_editor):
+    # SQLite recrea la tabla de movimientos al agregar saldo_inicial
+    if getattr(settings, "INVENTARIO_STOCK_TRIGGERS", False):
+        _triggers._ejecutar(schema_editor.connection, _triggers.SQL_ELIMINAR)
+        _triggers._ejecutar(schema_editor.connection, _triggers.SQL_INSTALAR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movimientoinventario',
+            name='saldo_inicial',
+            field=models.BooleanField(default=False, editable=False, help_text='Saldo arrastrado de los movimientos archivados (ver inventory/archivado.py).'),
+        ),
+        migrations.CreateModel(
+            name='MovimientoArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('entrada', 'Entrada'), ('salida', 'Salida')], max_length=10)),
+                ('cantidad', models.IntegerField()),
+                ('fecha', models.DateTimeField()),
+                ('referencia', models.CharField(blank=True, max_length=200)),
+                ('fecha_archivado', models.DateTimeField()),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos_archivados', to='inventory.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['producto', 'fecha'], name='archivo_producto_fecha_idx'), models.Index(fields=['fecha'], name='archivo_fecha_idx')],
+            },
+        ),
+        migrations.RunPython(reinstalar_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_movimientoarchivado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PronosticoDemanda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('demanda_media', models.FloatField()),
+                ('demanda_suavizada', models.FloatField()),
+                ('desviacion', models.FloatField()),
+                ('plazo_dias', models.PositiveIntegerField()),
+                ('stock_seguridad', models.PositiveIntegerField()),
+                ('punto_reorden', models.PositiveIntegerField()),
+                ('stock_objetivo', models.PositiveIntegerField()),
+                ('fecha_calculo', models.DateTimeField()),
+                ('producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pronostico', to='inventory.producto')),
+            ],
+        ),
+    ]
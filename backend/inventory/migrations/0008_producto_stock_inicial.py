@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:52
+
+import importlib
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+# SQL de los triggers vigente desde 0005 (0006 lo reinstala sin cambios)
+_triggers = importlib.import_module("inventory.migrations.0005_fecha_actualizacion")
+
+
+def eliminar_triggers(apps, schema_editor):
+    # SQLite recrea la tabla de productos al agregar la columna y no puede
+    # renombrarla con triggers de movimientos que la referencian
+    if getattr(settings, "INVENTARIO_STOCK_TRIGGERS", False):
+        _triggers._ejecutar(schema_editor.connection, _triggers.SQL_ELIMINAR)
+
+
+def instalar_triggers(apps, schema_editor):
+    if getattr(settings, "INVENTARIO_STOCK_TRIGGERS", False):
+        _triggers._ejecutar(schema_editor.connection, _triggers.SQL_INSTALAR)
+
+
+def calcular_stock_inicial(apps, schema_editor):
+    """
+    Stock de apertura de los productos existentes: lo que los movimientos
+    no explican (stock - suma de movimientos).
+    """
+    Producto = apps.get_model("inventory", "Producto")
+    MovimientoInventario = apps.get_model("inventory", "MovimientoInventario")
+    suma = (
+        MovimientoInventario.objects.filter(producto=OuterRef("pk"))
+        .order_by()
+        .values("producto")
+        .annotate(
+            total=Sum(
+                Case(
+                    When(tipo="entrada", then=F("cantidad")),
+                    default=-F("cantidad"),
+                    output_field=models.IntegerField(),
+                )
+            )
+        )
+        .values("total")
+    )
+    Producto.objects.using(schema_editor.connection.alias).update(
+        stock_inicial=F("stock") - Coalesce(Subquery(suma), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_pronosticodemanda'),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_triggers, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='producto',
+            name='stock_inicial',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_stock_inicial, migrations.RunPython.noop),
+        migrations.RunPython(instalar_triggers, eliminar_triggers),
+    ]
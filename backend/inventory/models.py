@@ -1,44 +1,70 @@
-from django.db import models, transaction
-from django.db.models import F
+from collections import Counter
+from itertools import chain
 
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Min, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.db.models.lookups import Exact
+from django.utils import timezone
 
-class Marca(models.Model):
+from core.cambios import hub
+from core.catalogos import CatalogoQuerySet
+from core.sincronizacion import SincronizableMixin, SincronizableQuerySet
+from .triggers import stock_por_triggers
+
+
+class Marca(SincronizableMixin, models.Model):
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CatalogoQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
 
-class Categoria(models.Model):
+class Categoria(SincronizableMixin, models.Model):
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CatalogoQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
 
-class UnidadMedida(models.Model):
+class UnidadMedida(SincronizableMixin, models.Model):
     nombre = models.CharField(max_length=50)
     nomenclatura = models.CharField(max_length=10)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CatalogoQuerySet.as_manager()
 
     def __str__(self):
         return self.nomenclatura
 
 
-class TipoEstado(models.Model):
+class TipoEstado(SincronizableMixin, models.Model):
     nombre = models.CharField(max_length=50)
     descripcion = models.TextField(blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CatalogoQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
 
-class Producto(models.Model):
+class Producto(SincronizableMixin, models.Model):
     codigo_producto = models.CharField(max_length=50, unique=True)
     nombre = models.CharField(max_length=150)
     stock_minimo_inicial = models.PositiveIntegerField()
     stock = models.IntegerField()
+    # Stock de apertura (alta o ajuste manual): la conciliación compara
+    # stock contra stock_inicial + suma de movimientos
+    stock_inicial = models.IntegerField(default=0, editable=False)
     fecha_ingreso = models.DateTimeField(auto_now_add=True)
 
     unidad_medida = models.ForeignKey(
@@ -65,12 +91,181 @@ class Producto(models.Model):
         null=True,
         blank=True,
     )
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = SincronizableQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and not hasattr(self.stock, "resolve_expression"):
+            self.stock_inicial = self.stock
+        super().save(*args, **kwargs)
+
+    def ajustar_stock(self, stock):
+        """
+        Fija el stock a mano (sin movimiento) y corre el stock de apertura
+        en la misma diferencia para que la conciliación no la cuente.
+        """
+        self.stock_inicial += stock - self.stock
+        self.stock = stock
+
+
+# Campos de MovimientoInventario que afectan el stock
+CAMPOS_STOCK = {"producto", "producto_id", "tipo", "cantidad"}
+
+# Productos por sentencia UPDATE (respeta el límite de parámetros de SQLite)
+LOTE_DELTAS = 500
+
+
+def _como_expresion(valor):
+    if hasattr(valor, "resolve_expression"):
+        return valor
+    if isinstance(valor, models.Model):
+        valor = valor.pk
+    return Value(valor)
+
+
+def delta_stock(tipo, cantidad):
+    """
+    Efecto de un movimiento en el stock: +cantidad (entrada) o -cantidad (salida).
+    """
+    return Case(
+        When(Exact(tipo, "entrada"), then=cantidad),
+        default=-cantidad,
+        output_field=IntegerField(),
+    )
+
+
+def aplicar_deltas_stock(deltas):
+    """
+    Suma a cada producto su delta {producto_id: delta} con un UPDATE
+    agrupado (CASE por id) por cada lote de productos.
+    """
+    pendientes = [(pk, delta) for pk, delta in deltas.items() if delta]
+    for i in range(0, len(pendientes), LOTE_DELTAS):
+        lote = pendientes[i : i + LOTE_DELTAS]
+        Producto.objects.filter(pk__in=[pk for pk, _ in lote]).update(
+            stock=F("stock")
+            + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in lote],
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            fecha_actualizacion=timezone.now(),
+        )
+
 
-class MovimientoInventario(models.Model):
+def notificar_stock(productos):
+    """
+    Publica el stock confirmado de los productos en el canal "stock"
+    (solo consulta si hay clientes conectados).
+    """
+    productos = list(productos)
+
+    def _eventos():
+        return [
+            {"producto": pk, "stock": stock}
+            for pk, stock in Producto.objects.filter(pk__in=productos).values_list(
+                "pk", "stock"
+            )
+        ]
+
+    hub.publicar_al_confirmar("stock", _eventos)
+
+
+class MovimientoInventarioQuerySet(SincronizableQuerySet):
+    """
+    delete() y update() en bloque mantienen Producto.stock: calculan el
+    delta neto por producto con un GROUP BY y lo aplican con un UPDATE
+    agrupado, dentro de la misma transacción. En modo triggers la base de
+    datos ya lo hace y aquí no se aplica nada.
+    """
+
+    def deltas_por_producto(self, producto=None, tipo=None, cantidad=None):
+        filas = (
+            self.order_by()
+            .annotate(producto_delta=producto or F("producto_id"))
+            .values("producto_delta")
+            .annotate(
+                delta=Sum(delta_stock(tipo or F("tipo"), cantidad or F("cantidad")))
+            )
+            .values_list("producto_delta", "delta")
+        )
+        return Counter(dict(filas))
+
+    def _alcance_resumen(self):
+        """
+        Productos y rango de fechas afectados, para reconstruir el resumen diario.
+        """
+        alcance = self.order_by().aggregate(desde=Min("fecha"), hasta=Max("fecha"))
+        productos = set(
+            self.order_by().values_list("producto_id", flat=True).distinct()
+        )
+        if len(productos) > LOTE_DELTAS:
+            # Demasiados para un IN (...): se reconstruye el rango completo
+            productos = None
+        return productos, alcance["desde"], alcance["hasta"]
+
+    @transaction.atomic
+    def delete(self):
+        productos, desde, hasta = self._alcance_resumen()
+        if stock_por_triggers():
+            resultado = super().delete()
+        else:
+            deltas = self.deltas_por_producto()
+            resultado = super().delete()
+            aplicar_deltas_stock({pk: -delta for pk, delta in deltas.items()})
+        ResumenDiarioMovimiento.reconstruir(productos, desde, hasta)
+        if productos:
+            notificar_stock(productos)
+        return resultado
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    @transaction.atomic
+    def update(self, **kwargs):
+        if not CAMPOS_STOCK.union({"fecha"}).intersection(kwargs):
+            return super().update(**kwargs)
+
+        productos, desde, hasta = self._alcance_resumen()
+        producto = kwargs.get("producto", kwargs.get("producto_id"))
+        if producto is not None and productos is not None:
+            productos.add(producto.pk if isinstance(producto, models.Model) else producto)
+        if "fecha" in kwargs:
+            desde = hasta = None
+
+        if stock_por_triggers():
+            filas = super().update(**kwargs)
+            ResumenDiarioMovimiento.reconstruir(productos, desde, hasta)
+            if productos:
+                notificar_stock(productos)
+            return filas
+
+        antes = self.deltas_por_producto()
+        # Los valores nuevos se calculan antes del UPDATE: el filtro podría
+        # dejar de coincidir una vez cambiadas las filas.
+        despues = self.deltas_por_producto(
+            producto=_como_expresion(producto) if producto is not None else None,
+            tipo=_como_expresion(kwargs["tipo"]) if "tipo" in kwargs else None,
+            cantidad=(
+                _como_expresion(kwargs["cantidad"]) if "cantidad" in kwargs else None
+            ),
+        )
+        filas = super().update(**kwargs)
+
+        despues.subtract(antes)
+        aplicar_deltas_stock(despues)
+        ResumenDiarioMovimiento.reconstruir(productos, desde, hasta)
+        notificar_stock(despues.keys())
+        return filas
+
+    update.alters_data = True
+
+
+class MovimientoInventario(SincronizableMixin, models.Model):
     TIPO_CHOICES = (
         ("entrada", "Entrada"),
         ("salida", "Salida"),
@@ -85,6 +280,14 @@ class MovimientoInventario(models.Model):
     cantidad = models.IntegerField()
     fecha = models.DateTimeField(auto_now_add=True)
     referencia = models.CharField(max_length=200, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+    saldo_inicial = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Saldo arrastrado de los movimientos archivados (ver inventory/archivado.py).",
+    )
+
+    objects = MovimientoInventarioQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.tipo} {self.cantidad} de {self.producto}"
@@ -102,7 +305,7 @@ class MovimientoInventario(models.Model):
             prod.stock = F("stock") + signo * cantidad
         else:  # salida
             prod.stock = F("stock") - signo * cantidad
-        prod.save(update_fields=["stock"])
+        prod.save(update_fields=["stock", "fecha_actualizacion"])
         # Traemos el valor real desde la BD por si usamos F()
         prod.refresh_from_db(fields=["stock"])
 
@@ -111,33 +314,237 @@ class MovimientoInventario(models.Model):
         """
         - Si es un movimiento nuevo: aplica su efecto al stock.
         - Si se está editando: revierte el movimiento anterior y aplica el nuevo.
+        - En modo triggers la base de datos mantiene el stock.
+        - En ambos modos se actualiza el resumen diario por producto.
         """
+        por_triggers = stock_por_triggers()
+
         # ¿Es una edición (ya existía)?
+        old = None
         if self.pk:
             # Bloqueamos el movimiento anterior para consistencia
             old = MovimientoInventario.objects.select_for_update().get(pk=self.pk)
 
-            # Si cambiaron el producto, revertimos en el producto viejo
-            # y aplicamos en el nuevo
-            if old.producto_id != self.producto_id:
-                # Revertir en producto viejo
-                self._aplicar_en_stock(old.producto, old.tipo, old.cantidad, signo=-1)
-            else:
-                # Revertir en el mismo producto
-                self._aplicar_en_stock(self.producto, old.tipo, old.cantidad, signo=-1)
+            if not por_triggers:
+                # Si cambiaron el producto, revertimos en el producto viejo
+                # y aplicamos en el nuevo
+                if old.producto_id != self.producto_id:
+                    # Revertir en producto viejo
+                    self._aplicar_en_stock(
+                        old.producto, old.tipo, old.cantidad, signo=-1
+                    )
+                else:
+                    # Revertir en el mismo producto
+                    self._aplicar_en_stock(
+                        self.producto, old.tipo, old.cantidad, signo=-1
+                    )
+            ResumenDiarioMovimiento.acumular(old, signo=-1)
 
         # Guardamos el movimiento (nuevo o editado)
         super().save(*args, **kwargs)
 
         # Aplicar el movimiento sobre el producto actual
-        self._aplicar_en_stock(self.producto, self.tipo, self.cantidad, signo=1)
+        if not por_triggers:
+            self._aplicar_en_stock(self.producto, self.tipo, self.cantidad, signo=1)
+        ResumenDiarioMovimiento.acumular(self, signo=1)
+
+        afectados = {self.producto_id}
+        if old is not None:
+            afectados.add(old.producto_id)
+        notificar_stock(afectados)
 
     @transaction.atomic
     def delete(self, *args, **kwargs):
         """
-        Al eliminar un movimiento, se revierte su efecto en el stock.
+        Al eliminar un movimiento, se revierte su efecto en el stock
+        (salvo en modo triggers) y en el resumen diario.
         """
         # Revertimos su efecto
-        self._aplicar_en_stock(self.producto, self.tipo, self.cantidad, signo=-1)
+        if not stock_por_triggers():
+            self._aplicar_en_stock(self.producto, self.tipo, self.cantidad, signo=-1)
+        ResumenDiarioMovimiento.acumular(self, signo=-1)
+        notificar_stock([self.producto_id])
         # Luego borramos el registro
-        super().delete(*args, **kwargs)
+        return super().delete(*args, **kwargs)
+
+
+class MovimientoArchivado(models.Model):
+    """
+    Movimientos anteriores al horizonte de archivado (tabla fría). Conserva
+    el id original; en la tabla caliente los reemplaza una fila de saldo
+    arrastrado por producto. Ver inventory/archivado.py.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name="movimientos_archivados",
+    )
+    tipo = models.CharField(max_length=10, choices=MovimientoInventario.TIPO_CHOICES)
+    cantidad = models.IntegerField()
+    fecha = models.DateTimeField()
+    referencia = models.CharField(max_length=200, blank=True)
+    fecha_archivado = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["producto", "fecha"], name="archivo_producto_fecha_idx"),
+            models.Index(fields=["fecha"], name="archivo_fecha_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.cantidad} de {self.producto_id} (archivado)"
+
+
+class ResumenDiarioMovimiento(models.Model):
+    """
+    Totales de entradas/salidas por producto y día (hora local).
+
+    Se mantiene incrementalmente al guardar/eliminar movimientos y se puede
+    reconstruir con `manage.py reconstruir_resumen`. Las gráficas leen esta
+    tabla en lugar de agregar todos los movimientos.
+    """
+
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name="resumenes_diarios",
+    )
+    dia = models.DateField()
+    entradas = models.IntegerField(default=0)
+    salidas = models.IntegerField(default=0)
+    movimientos = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["producto", "dia"],
+                name="resumen_producto_dia_unico",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["dia"], name="resumen_dia_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id} {self.dia}"
+
+    @classmethod
+    def acumular(cls, movimiento, signo=1):
+        """
+        Suma (signo=1) o resta (signo=-1) un movimiento en su día.
+        """
+        if movimiento.saldo_inicial:
+            # Igual que en reconstruir(): el saldo no es un movimiento real
+            return
+        dia = timezone.localdate(movimiento.fecha)
+        entrada = movimiento.cantidad if movimiento.tipo == "entrada" else 0
+        salida = movimiento.cantidad if movimiento.tipo != "entrada" else 0
+
+        actualizados = cls.objects.filter(
+            producto_id=movimiento.producto_id, dia=dia
+        ).update(
+            entradas=F("entradas") + signo * entrada,
+            salidas=F("salidas") + signo * salida,
+            movimientos=F("movimientos") + signo,
+        )
+        if actualizados or signo < 0:
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    producto_id=movimiento.producto_id,
+                    dia=dia,
+                    entradas=entrada,
+                    salidas=salida,
+                    movimientos=1,
+                )
+        except IntegrityError:
+            # Otro proceso creó la fila entre el UPDATE y el INSERT
+            cls.acumular(movimiento, signo)
+
+    @classmethod
+    @transaction.atomic
+    def reconstruir(cls, productos=None, desde=None, hasta=None, lote=5000):
+        """
+        Recalcula el resumen desde los movimientos. Sin argumentos reconstruye
+        todo; si no, solo los productos y el rango de fechas indicados.
+        Devuelve la cantidad de filas de resumen creadas.
+        """
+        # Los saldos arrastrados no son movimientos reales; los archivados sí
+        origenes = [
+            MovimientoInventario.objects.filter(saldo_inicial=False).order_by(),
+            MovimientoArchivado.objects.order_by(),
+        ]
+        resumenes = cls.objects.all()
+        if productos is not None:
+            productos = list(productos)
+            origenes = [qs.filter(producto_id__in=productos) for qs in origenes]
+            resumenes = resumenes.filter(producto_id__in=productos)
+        if desde is not None:
+            dia_desde = timezone.localdate(desde)
+            origenes = [qs.filter(fecha__date__gte=dia_desde) for qs in origenes]
+            resumenes = resumenes.filter(dia__gte=dia_desde)
+        if hasta is not None:
+            dia_hasta = timezone.localdate(hasta)
+            origenes = [qs.filter(fecha__date__lte=dia_hasta) for qs in origenes]
+            resumenes = resumenes.filter(dia__lte=dia_hasta)
+
+        resumenes.delete()
+        movimientos, archivados = (
+            qs.annotate(dia=TruncDate("fecha"))
+            .values("producto_id", "dia")
+            .annotate(
+                total_entradas=Sum("cantidad", filter=Q(tipo="entrada"), default=0),
+                total_salidas=Sum("cantidad", filter=~Q(tipo="entrada"), default=0),
+                total_movimientos=Count("id"),
+            )
+            for qs in origenes
+        )
+        # El horizonte de archivado es siempre una medianoche local, así que
+        # ningún día tiene filas en ambas tablas
+        filas = chain(archivados.iterator(), movimientos.iterator())
+
+        creadas = cls.objects.bulk_create(
+            (
+                cls(
+                    producto_id=f["producto_id"],
+                    dia=f["dia"],
+                    entradas=f["total_entradas"],
+                    salidas=f["total_salidas"],
+                    movimientos=f["total_movimientos"],
+                )
+                for f in filas
+            ),
+            batch_size=lote,
+        )
+        return len(creadas)
+
+
+class PronosticoDemanda(models.Model):
+    """
+    Demanda diaria pronosticada y punto de reorden sugerido por producto.
+    Lo recalcula `manage.py pronosticar_demanda` para todo el catálogo
+    (ver inventory/pronostico.py); la API solo lee esta tabla.
+    """
+
+    producto = models.OneToOneField(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name="pronostico",
+    )
+    # Salidas por día: media móvil de la ventana y suavizado exponencial
+    demanda_media = models.FloatField()
+    demanda_suavizada = models.FloatField()
+    desviacion = models.FloatField()
+    plazo_dias = models.PositiveIntegerField()
+    stock_seguridad = models.PositiveIntegerField()
+    punto_reorden = models.PositiveIntegerField()
+    # Nivel al que se repone: punto de reorden + demanda de un plazo
+    stock_objetivo = models.PositiveIntegerField()
+    fecha_calculo = models.DateTimeField()
+
+    def __str__(self):
+        return f"Pronóstico de {self.producto_id}: reorden en {self.punto_reorden}"
@@ -0,0 +1,225 @@
+"""
+Pronóstico de demanda y punto de reorden para todo el catálogo.
+
+Las salidas diarias se leen del resumen diario (derivado de los
+movimientos; conserva los días archivados) y se procesan en NumPy en una
+sola pasada vectorizada. No se arma la matriz productos × días: cada fila
+(producto, día, salidas) se acumula con np.bincount, de modo que la
+memoria crece con las filas de resumen y no con el calendario completo.
+
+Por producto, sobre sus días de historia (desde su primer movimiento en
+el periodo, como máximo `dias`); los días sin salidas cuentan como 0:
+
+- demanda_media: media móvil de los últimos `ventana` días.
+- demanda_suavizada: suavizado exponencial simple con factor `alfa`,
+  iniciado en la media histórica y evaluado en forma cerrada:
+
+      F = Σ α·(1-α)^(T-t)·x_t + (1-α)^n · media
+
+- desviacion: desviación estándar de las salidas diarias.
+- stock_seguridad = z · desviacion · √plazo (z del nivel de servicio).
+- punto_reorden = demanda_suavizada · plazo + stock_seguridad.
+- stock_objetivo = punto_reorden + demanda_suavizada · plazo.
+
+NumPy se importa al calcular: la API solo lee PronosticoDemanda.
+"""
+
+import math
+from datetime import timedelta
+from itertools import islice
+from statistics import NormalDist
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Producto, PronosticoDemanda, ResumenDiarioMovimiento
+
+DIAS = 730
+VENTANA = 28
+ALFA = 0.2
+PLAZO_DIAS = 7
+NIVEL_SERVICIO = 0.95
+LOTE = 2000
+
+CAMPOS_DEMANDA = ("demanda_media", "demanda_suavizada", "desviacion")
+CAMPOS_STOCK = ("stock_seguridad", "punto_reorden", "stock_objetivo")
+CAMPOS = CAMPOS_DEMANDA + CAMPOS_STOCK
+
+
+class ErrorPronostico(Exception):
+    pass
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ErrorPronostico("El pronóstico requiere numpy (pip install numpy).")
+    return numpy
+
+
+def _validar(dias, ventana, alfa, plazo, nivel_servicio):
+    if dias < 1 or ventana < 1 or plazo < 1:
+        raise ErrorPronostico("dias, ventana y plazo deben ser mayores que 0.")
+    if not 0 < alfa <= 1:
+        raise ErrorPronostico("alfa debe estar entre 0 (excluido) y 1.")
+    if not 0.5 <= nivel_servicio < 1:
+        raise ErrorPronostico("El nivel de servicio debe estar entre 0.5 y 1 (excluido).")
+
+
+def _columnas(np, consulta, tipos):
+    """
+    Un arreglo por columna de `consulta` (values_list), leído por bloques
+    de LOTE * 10 filas: nunca se arma la lista completa de tuplas.
+    """
+    bloques = [[] for _ in tipos]
+    iterador = consulta.iterator(chunk_size=LOTE * 10)
+    while filas := list(islice(iterador, LOTE * 10)):
+        for columna, valores, tipo in zip(bloques, zip(*filas), tipos):
+            columna.append(np.array(valores, dtype=tipo))
+    return [
+        np.concatenate(columna) if columna else np.empty(0, dtype=tipo)
+        for columna, tipo in zip(bloques, tipos)
+    ]
+
+
+def _dias_desde(np, fechas, inicio):
+    return (fechas - np.datetime64(inicio, "D")).astype(np.int64)
+
+
+def _salidas_diarias(np, inicio, hoy):
+    """
+    Arreglos (producto_id, día desde `inicio`, salidas) de los días
+    completos del periodo [inicio, hoy) con salidas.
+    """
+    productos, dias, salidas = _columnas(
+        np,
+        ResumenDiarioMovimiento.objects.filter(dia__gte=inicio, dia__lt=hoy, salidas__gt=0)
+        .order_by()
+        .values_list("producto_id", "dia", "salidas"),
+        (np.int64, "datetime64[D]", np.float64),
+    )
+    return productos, _dias_desde(np, dias, inicio), salidas
+
+
+def _primer_dia(np, inicio, hoy):
+    """
+    Arreglos (producto_id, día desde `inicio`) del primer movimiento de
+    cada producto en el periodo.
+    """
+    productos, dias = _columnas(
+        np,
+        ResumenDiarioMovimiento.objects.filter(dia__gte=inicio, dia__lt=hoy)
+        .values_list("producto_id")
+        .annotate(primero=Min("dia"))
+        .order_by(),
+        (np.int64, "datetime64[D]"),
+    )
+    return productos, _dias_desde(np, dias, inicio)
+
+
+def calcular(
+    dias=DIAS,
+    ventana=VENTANA,
+    alfa=ALFA,
+    plazo=PLAZO_DIAS,
+    nivel_servicio=NIVEL_SERVICIO,
+    hoy=None,
+):
+    """
+    Pronóstico de todos los productos. Devuelve un dict de arreglos
+    alineados: "producto_id" y uno por cada campo de CAMPOS.
+    """
+    _validar(dias, ventana, alfa, plazo, nivel_servicio)
+    np = _numpy()
+    hoy = hoy or timezone.localdate()
+    inicio = hoy - timedelta(days=dias)
+
+    ids = np.fromiter(
+        Producto.objects.order_by("pk").values_list("pk", flat=True), dtype=np.int64
+    )
+    n = len(ids)
+    # El resumen se lee después que los ids: se descartan las filas de
+    # productos creados entre ambas lecturas (searchsorted los ubicaría en
+    # la fila de otro producto)
+    productos, t, x = _salidas_diarias(np, inicio, hoy)
+    conocidos = np.isin(productos, ids)
+    productos, t, x = productos[conocidos], t[conocidos], x[conocidos]
+    fila = np.searchsorted(ids, productos)
+
+    # Días de historia por producto: desde su primer día con movimientos
+    primero = np.full(n, dias, dtype=np.int64)
+    con_movimientos, dia_inicial = _primer_dia(np, inicio, hoy)
+    conocidos = np.isin(con_movimientos, ids)
+    primero[np.searchsorted(ids, con_movimientos[conocidos])] = dia_inicial[conocidos]
+    historia = dias - primero
+    h = np.maximum(historia, 1)
+
+    suma = np.bincount(fila, weights=x, minlength=n)
+    suma_cuadrados = np.bincount(fila, weights=x * x, minlength=n)
+    media = suma / h
+    varianza = (suma_cuadrados - h * media**2) / np.maximum(h - 1, 1)
+    desviacion = np.sqrt(np.clip(varianza, 0, None))
+
+    reciente = t >= dias - ventana
+    demanda_media = np.bincount(
+        fila[reciente], weights=x[reciente], minlength=n
+    ) / np.minimum(ventana, h)
+
+    pesos = alfa * (1 - alfa) ** (dias - 1 - t)
+    suavizada = (
+        np.bincount(fila, weights=x * pesos, minlength=n) + (1 - alfa) ** historia * media
+    )
+
+    z = NormalDist().inv_cdf(nivel_servicio)
+    demanda_plazo = suavizada * plazo
+    # Redondeo previo para que el ruido de coma flotante no sume una unidad
+    stock_seguridad = np.ceil(np.round(z * desviacion * math.sqrt(plazo), 6))
+    punto_reorden = np.ceil(np.round(demanda_plazo + stock_seguridad, 6))
+    stock_objetivo = np.ceil(np.round(punto_reorden + demanda_plazo, 6))
+
+    return {
+        "producto_id": ids,
+        "demanda_media": demanda_media,
+        "demanda_suavizada": suavizada,
+        "desviacion": desviacion,
+        "stock_seguridad": stock_seguridad,
+        "punto_reorden": punto_reorden,
+        "stock_objetivo": stock_objetivo,
+    }
+
+
+@transaction.atomic
+def guardar(resultado, plazo=PLAZO_DIAS, lote=LOTE):
+    """
+    Inserta o actualiza PronosticoDemanda por producto. Devuelve las filas.
+    """
+    ahora = timezone.now()
+    # tolist() convierte a tipos de Python antes de pasar al ORM
+    columnas = (
+        [resultado["producto_id"].tolist()]
+        + [resultado[campo].round(4).tolist() for campo in CAMPOS_DEMANDA]
+        + [resultado[campo].astype("int64").tolist() for campo in CAMPOS_STOCK]
+    )
+    pronosticos = (
+        PronosticoDemanda(
+            producto_id=producto,
+            plazo_dias=plazo,
+            fecha_calculo=ahora,
+            **dict(zip(CAMPOS, valores)),
+        )
+        for producto, *valores in zip(*columnas)
+    )
+
+    total = 0
+    iterador = iter(pronosticos)
+    while objetos := list(islice(iterador, lote)):
+        PronosticoDemanda.objects.bulk_create(
+            objetos,
+            update_conflicts=True,
+            unique_fields=["producto"],
+            update_fields=[*CAMPOS, "plazo_dias", "fecha_calculo"],
+        )
+        total += len(objetos)
+    return total
@@ -1,4 +1,11 @@
 from rest_framework import serializers
+from core.catalogos import CatalogoField
+from core.metricas import MedicionSerializerMixin
+from core.serializers import (
+    BatchPrimaryKeyRelatedField,
+    BatchRelatedListSerializer,
+    BatchRelatedMixin,
+)
 from .models import (
     Marca,
     Categoria,
@@ -6,63 +13,69 @@ from .models import (
     TipoEstado,
     Producto,
     MovimientoInventario,
+    MovimientoArchivado,
 )
 
 
-class MarcaSerializer(serializers.ModelSerializer):
+class MarcaSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Marca
         fields = "__all__"
 
 
-class CategoriaSerializer(serializers.ModelSerializer):
+class CategoriaSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Categoria
         fields = "__all__"
 
 
-class UnidadMedidaSerializer(serializers.ModelSerializer):
+class UnidadMedidaSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = UnidadMedida
         fields = "__all__"
 
 
-class TipoEstadoSerializer(serializers.ModelSerializer):
+class TipoEstadoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TipoEstado
         fields = "__all__"
 
 
-class ProductoSerializer(serializers.ModelSerializer):
-    marca = MarcaSerializer(read_only=True)
-    categoria = CategoriaSerializer(read_only=True)
-    unidad_medida = UnidadMedidaSerializer(read_only=True)
-    tipo_estado = TipoEstadoSerializer(read_only=True)
+class ProductoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
+    # Catálogos renderizados desde memoria (core/catalogos.py), sin joins
+    marca = CatalogoField(Marca, source="marca_id")
+    categoria = CatalogoField(Categoria, source="categoria_id")
+    unidad_medida = CatalogoField(UnidadMedida, source="unidad_medida_id")
+    tipo_estado = CatalogoField(TipoEstado, source="tipo_estado_id")
 
     class Meta:
         model = Producto
         fields = "__all__"
 
 
-class ProductoWriteSerializer(serializers.ModelSerializer):
-    marca_id = serializers.PrimaryKeyRelatedField(
+class ProductoWriteSerializer(
+    MedicionSerializerMixin,
+    BatchRelatedMixin,
+    serializers.ModelSerializer,
+):
+    marca_id = BatchPrimaryKeyRelatedField(
         queryset=Marca.objects.all(),
         source="marca",
         allow_null=True,
         required=False,
     )
-    categoria_id = serializers.PrimaryKeyRelatedField(
+    categoria_id = BatchPrimaryKeyRelatedField(
         queryset=Categoria.objects.all(),
         source="categoria",
         allow_null=True,
         required=False,
     )
-    unidad_medida_id = serializers.PrimaryKeyRelatedField(
+    unidad_medida_id = BatchPrimaryKeyRelatedField(
         queryset=UnidadMedida.objects.all(),
         source="unidad_medida",
         required=True,
     )
-    tipo_estado_id = serializers.PrimaryKeyRelatedField(
+    tipo_estado_id = BatchPrimaryKeyRelatedField(
         queryset=TipoEstado.objects.all(),
         source="tipo_estado",
         required=True,
@@ -70,6 +83,7 @@ class ProductoWriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Producto
+        list_serializer_class = BatchRelatedListSerializer
         fields = [
             "id",
             "codigo_producto",
@@ -82,8 +96,30 @@ class ProductoWriteSerializer(serializers.ModelSerializer):
             "categoria_id",
         ]
 
+    def update(self, instance, validated_data):
+        if "stock" in validated_data:
+            instance.ajustar_stock(validated_data.pop("stock"))
+        return super().update(instance, validated_data)
+
+
+class MovimientoInventarioSerializer(
+    MedicionSerializerMixin,
+    serializers.ModelSerializer,
+):
+    # Mismas claves que MovimientoArchivadoSerializer en el listado unido
+    archivado = serializers.BooleanField(default=False, read_only=True)
 
-class MovimientoInventarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = MovimientoInventario
         fields = "__all__"
+
+
+class MovimientoArchivadoSerializer(
+    MedicionSerializerMixin,
+    serializers.ModelSerializer,
+):
+    archivado = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = MovimientoArchivado
+        fields = "__all__"
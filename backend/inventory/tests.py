@@ -1,3 +1,964 @@
-from django.test import TestCase
+import io
+import json
+import math
+import unittest
+from datetime import date, timedelta
+from statistics import NormalDist
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Rol, Usuario
+from core.models import Eliminacion
+from .models import (
+    Marca,
+    Categoria,
+    UnidadMedida,
+    TipoEstado,
+    Producto,
+    MovimientoInventario,
+    MovimientoArchivado,
+    PronosticoDemanda,
+    ResumenDiarioMovimiento,
+)
+from . import archivado, conciliacion, kardex, pronostico, triggers
+from .importacion import ErrorImportacion, importar_productos
+from .serializers import ProductoWriteSerializer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FILAS = 50_000
+
+
+class AdminChangelistConsultasTests(TestCase):
+    """
+    Los changelists del admin deben costar un número fijo de consultas,
+    sin importar cuántas filas haya (sin N+1 por __str__ de las FK).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_superuser(
+            "admin", "admin@example.com", "clave-segura"
+        )
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        estado = TipoEstado.objects.create(nombre="Activo")
+        marca = Marca.objects.create(nombre="Marca")
+        categoria = Categoria.objects.create(nombre="Categoría")
+        productos = Producto.objects.bulk_create(
+            (
+                Producto(
+                    codigo_producto=f"P-{i}",
+                    nombre=f"Producto {i}",
+                    stock_minimo_inicial=0,
+                    stock=0,
+                    unidad_medida=unidad,
+                    tipo_estado=estado,
+                    marca=marca,
+                    categoria=categoria,
+                )
+                for i in range(FILAS)
+            ),
+            batch_size=5000,
+        )
+        MovimientoInventario.objects.bulk_create(
+            (
+                MovimientoInventario(
+                    producto=productos[i % len(productos)],
+                    tipo="entrada",
+                    cantidad=1,
+                )
+                for i in range(FILAS)
+            ),
+            batch_size=5000,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assertChangelistConsultas(self, modelo, maximo):
+        url = reverse(f"admin:inventory_{modelo}_changelist")
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(consultas), maximo)
+
+    def test_changelist_productos(self):
+        self.assertChangelistConsultas("producto", 8)
+
+    def test_changelist_movimientos(self):
+        self.assertChangelistConsultas("movimientoinventario", 8)
+
+
+class ConciliacionTests(TestCase):
+    """
+    conciliar_stock: rangos de ids, diferencias con HAVING y reparación.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        estado = TipoEstado.objects.create(nombre="Activo")
+        cls.productos = [
+            Producto.objects.create(
+                codigo_producto=f"C-{i}",
+                nombre=f"Producto {i}",
+                stock_minimo_inicial=0,
+                stock=0,
+                unidad_medida=unidad,
+                tipo_estado=estado,
+            )
+            for i in range(7)
+        ]
+        for producto in cls.productos[:6]:
+            MovimientoInventario.objects.create(producto=producto, tipo="entrada", cantidad=10)
+            MovimientoInventario.objects.create(producto=producto, tipo="salida", cantidad=3)
+        cls.desfasado, cls.manual = cls.productos[2], cls.productos[6]
+        # Stock cambiado sin movimientos: uno con historia, otro fijado a mano
+        Producto.objects.filter(pk=cls.desfasado.pk).update(stock=99)
+        Producto.objects.filter(pk=cls.manual.pk).update(stock=50)
+
+    def _stock(self, producto):
+        return Producto.objects.get(pk=producto.pk).stock
+
+    def test_rangos_cubren_todos_los_productos(self):
+        rangos = conciliacion.rangos(lote=3)
+        self.assertEqual([n for _desde, _hasta, n in rangos], [3, 3, 1])
+        ids = [p.pk for p in self.productos]
+        self.assertEqual(rangos[0][:2], (ids[0], ids[2]))
+        self.assertEqual(rangos[-1][:2], (ids[6], ids[6]))
+        self.assertEqual(conciliacion.rangos(lote=100), [(ids[0], ids[6], 7)])
+
+    def test_diferencias_solo_del_rango(self):
+        todos = conciliacion.diferencias(self.productos[0].pk, self.productos[-1].pk)
+        self.assertEqual(
+            sorted(todos),
+            [(self.desfasado.pk, 99, 7, 2), (self.manual.pk, 50, 0, 0)],
+        )
+        self.assertEqual(
+            conciliacion.diferencias(self.productos[3].pk, self.productos[5].pk), []
+        )
+
+    def test_reparar_omite_productos_sin_movimientos(self):
+        salida = io.StringIO()
+        call_command("conciliar_stock", procesos=1, lote=3, reparar=True, stdout=salida)
+        self.assertEqual(self._stock(self.desfasado), 7)
+        self.assertEqual(self._stock(self.manual), 50)
+        self.assertIn("1 sin movimientos omitidos", salida.getvalue())
+
+        call_command(
+            "conciliar_stock",
+            procesos=1,
+            reparar=True,
+            incluir_sin_movimientos=True,
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(self._stock(self.manual), 0)
+        self.assertEqual(
+            conciliacion.diferencias(self.productos[0].pk, self.productos[-1].pk), []
+        )
+
+    def test_stock_de_apertura_no_es_diferencia(self):
+        producto = Producto.objects.create(
+            codigo_producto="C-apertura",
+            nombre="Con stock inicial",
+            stock_minimo_inicial=0,
+            stock=100,
+            unidad_medida=self.productos[0].unidad_medida,
+            tipo_estado=self.productos[0].tipo_estado,
+        )
+        MovimientoInventario.objects.create(
+            producto=producto, tipo="salida", cantidad=5
+        )
+        self.assertEqual(self._stock(producto), 95)
+        self.assertEqual(conciliacion.diferencias(producto.pk, producto.pk), [])
+
+        # Un ajuste manual por la API corre el stock de apertura
+        serializer = ProductoWriteSerializer(
+            Producto.objects.get(pk=producto.pk), data={"stock": 120}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(conciliacion.diferencias(producto.pk, producto.pk), [])
+
+        call_command("conciliar_stock", procesos=1, reparar=True, stdout=io.StringIO())
+        self.assertEqual(self._stock(producto), 120)
+
+
+class ArchivadoTests(TestCase):
+    """
+    archivar(): movimientos a la tabla fría, saldo arrastrado, stock y
+    resumen sin cambios, eliminaciones en el feed y listado unido.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user("admin", "admin@example.com", "clave")
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        estado = TipoEstado.objects.create(nombre="Activo")
+        cls.producto = Producto.objects.create(
+            codigo_producto="A-1",
+            nombre="Archivado",
+            stock_minimo_inicial=0,
+            stock=0,
+            unidad_medida=unidad,
+            tipo_estado=estado,
+        )
+        cls.hace = timezone.now() - timedelta(days=400)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _crear_movimientos(self):
+        viejos = [
+            MovimientoInventario.objects.create(
+                producto=self.producto, tipo=tipo, cantidad=n
+            )
+            for tipo, n in (("entrada", 20), ("salida", 5), ("entrada", 3))
+        ]
+        MovimientoInventario.objects.filter(pk__in=[m.pk for m in viejos]).update(
+            fecha=self.hace
+        )
+        MovimientoInventario.objects.create(
+            producto=self.producto, tipo="salida", cantidad=4
+        )
+        return [m.pk for m in viejos]
+
+    def _estado(self):
+        return (
+            Producto.objects.get(pk=self.producto.pk).stock,
+            sorted(
+                ResumenDiarioMovimiento.objects.values_list(
+                    "dia", "entradas", "salidas", "movimientos"
+                )
+            ),
+        )
+
+    def _archivar(self):
+        ids = self._crear_movimientos()
+        antes = self._estado()
+        totales = archivado.archivar(archivado.horizonte(dias=30))
+        self.assertEqual(totales, {"productos": 1, "archivados": 3, "saldos": 1})
+        self.assertEqual(self._estado(), antes)
+        self.assertEqual(antes[0], 14)
+        return ids
+
+    def test_archivar_conserva_stock_y_resumen(self):
+        ids = self._archivar()
+        self.assertEqual(
+            sorted(MovimientoArchivado.objects.values_list("id", flat=True)), ids
+        )
+        saldo = MovimientoInventario.objects.get(saldo_inicial=True)
+        self.assertEqual((saldo.tipo, saldo.cantidad), ("entrada", 18))
+
+        # Segundo archivado: el saldo previo se reemplaza por uno nuevo
+        manana = timezone.localdate() + timedelta(days=1)
+        archivado.archivar(archivado.horizonte(dias=0, hoy=manana))
+        self.assertEqual(Producto.objects.get(pk=self.producto.pk).stock, 14)
+        self.assertEqual(
+            list(MovimientoInventario.objects.values_list("tipo", "cantidad")),
+            [("entrada", 14)],
+        )
+
+    def test_segundo_archivado_sin_cambios(self):
+        self._archivar()
+        saldos = list(
+            MovimientoInventario.objects.filter(saldo_inicial=True).values_list(
+                "pk", flat=True
+            )
+        )
+        eliminaciones = Eliminacion.objects.count()
+
+        totales = archivado.archivar(archivado.horizonte(dias=30))
+        self.assertEqual(totales, {"productos": 0, "archivados": 0, "saldos": 0})
+        self.assertEqual(
+            list(
+                MovimientoInventario.objects.filter(saldo_inicial=True).values_list(
+                    "pk", flat=True
+                )
+            ),
+            saldos,
+        )
+        self.assertEqual(Eliminacion.objects.count(), eliminaciones)
+
+    @override_settings(INVENTARIO_STOCK_TRIGGERS=True)
+    def test_archivar_con_triggers(self):
+        triggers.instalar(connection)
+        try:
+            self._archivar()
+        finally:
+            triggers.desinstalar(connection)
+
+    def test_eliminaciones_en_el_feed(self):
+        ids = self._archivar()
+        self.assertEqual(
+            set(
+                Eliminacion.objects.filter(
+                    modelo="inventory.movimientoinventario"
+                ).values_list("objeto_id", flat=True)
+            ),
+            set(ids),
+        )
+        datos = self.client.get(
+            reverse("movimiento-list"),
+            {"updated_since": (timezone.now() - timedelta(minutes=1)).isoformat()},
+        ).data
+        self.assertEqual(sorted(datos["eliminados"]), ids)
+        saldo = MovimientoInventario.objects.get(saldo_inicial=True)
+        self.assertIn(saldo.pk, [m["id"] for m in datos["cambios"]])
+
+    def test_saldo_arrastrado_es_de_solo_lectura(self):
+        self._archivar()
+        saldo = MovimientoInventario.objects.get(saldo_inicial=True)
+        url = reverse("movimiento-detail", args=[saldo.pk])
+        for metodo, datos in (
+            (self.client.patch, {"cantidad": 1}),
+            (
+                self.client.put,
+                {"producto": self.producto.pk, "tipo": "entrada", "cantidad": 1},
+            ),
+            (self.client.delete, None),
+        ):
+            response = metodo(url, datos, format="json")
+            self.assertEqual(response.status_code, 400, metodo)
+        self.assertEqual(self._estado()[0], 14)
+        self.assertTrue(
+            MovimientoInventario.objects.filter(pk=saldo.pk, cantidad=18).exists()
+        )
+
+    def test_listado_une_archivo_y_tabla_caliente(self):
+        self._archivar()
+        url = reverse("movimiento-list")
+        desde = timezone.localdate(self.hace).isoformat()
+        datos = self.client.get(url, {"desde": desde}).data
+        self.assertEqual(
+            [(m["tipo"], m["cantidad"], m["archivado"]) for m in datos],
+            [
+                ("salida", 4, False),
+                ("entrada", 3, True),
+                ("salida", 5, True),
+                ("entrada", 20, True),
+            ],
+        )
+        # Sin `desde` en el archivo: solo la tabla caliente, con el saldo
+        datos = self.client.get(url).data
+        self.assertEqual(len(datos), 2)
+
+
+class ResumenDiarioTests(TestCase):
+    """
+    Resumen diario por producto: acumulación incremental, reconstrucción y
+    el endpoint /api/movimientos/serie/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user("admin", "admin@example.com", "clave")
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        estado = TipoEstado.objects.create(nombre="Activo")
+        cls.a, cls.b = (
+            Producto.objects.create(
+                codigo_producto=codigo,
+                nombre=codigo,
+                stock_minimo_inicial=0,
+                stock=0,
+                unidad_medida=unidad,
+                tipo_estado=estado,
+            )
+            for codigo in ("R-A", "R-B")
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.hoy = timezone.localdate()
+
+    def _resumen(self):
+        return sorted(
+            ResumenDiarioMovimiento.objects.values_list(
+                "producto_id", "dia", "entradas", "salidas", "movimientos"
+            )
+        )
+
+    def test_acumular_al_crear_editar_y_eliminar(self):
+        entrada = MovimientoInventario.objects.create(
+            producto=self.a, tipo="entrada", cantidad=10
+        )
+        salida = MovimientoInventario.objects.create(
+            producto=self.a, tipo="salida", cantidad=4
+        )
+        self.assertEqual(self._resumen(), [(self.a.pk, self.hoy, 10, 4, 2)])
+
+        salida.producto = self.b
+        salida.cantidad = 3
+        salida.save()
+        self.assertEqual(
+            self._resumen(),
+            [(self.a.pk, self.hoy, 10, 0, 1), (self.b.pk, self.hoy, 0, 3, 1)],
+        )
+
+        entrada.delete()
+        self.assertEqual(
+            self._resumen(),
+            [(self.a.pk, self.hoy, 0, 0, 0), (self.b.pk, self.hoy, 0, 3, 1)],
+        )
+
+    def test_reconstruir_coincide_con_acumular(self):
+        for producto, tipo, cantidad in (
+            (self.a, "entrada", 8),
+            (self.a, "salida", 2),
+            (self.b, "entrada", 5),
+        ):
+            MovimientoInventario.objects.create(
+                producto=producto, tipo=tipo, cantidad=cantidad
+            )
+        MovimientoInventario.objects.filter(producto=self.b).update(
+            fecha=timezone.now() - timedelta(days=3)
+        )
+        acumulado = self._resumen()
+
+        ResumenDiarioMovimiento.objects.all().delete()
+        ResumenDiarioMovimiento.reconstruir()
+        self.assertEqual(self._resumen(), acumulado)
+
+        # Reconstrucción parcial: solo el producto y el rango indicados
+        ResumenDiarioMovimiento.objects.filter(producto=self.a).update(entradas=0)
+        ResumenDiarioMovimiento.reconstruir([self.a.pk], timezone.now(), timezone.now())
+        self.assertEqual(self._resumen(), acumulado)
+
+    def test_serie(self):
+        MovimientoInventario.objects.create(producto=self.a, tipo="entrada", cantidad=7)
+        MovimientoInventario.objects.create(producto=self.b, tipo="salida", cantidad=2)
+        url = reverse("movimiento-serie")
+        hoy = self.hoy.isoformat()
+
+        datos = self.client.get(url, {"desde": hoy, "hasta": hoy}).data
+        self.assertEqual(
+            [tuple(f.values()) for f in datos],
+            [(self.hoy, 7, 2, 2)],
+        )
+        params = {"producto": self.b.pk, "granularidad": "month"}
+        datos = self.client.get(url, params).data
+        self.assertEqual([(f["entradas"], f["salidas"]) for f in datos], [(0, 2)])
+
+    def test_serie_parametros_invalidos(self):
+        url = reverse("movimiento-serie")
+        for params in (
+            {"granularidad": "year"},
+            {"producto": "abc"},
+            {"desde": "ayer"},
+            {"desde": "2025-02-30"},
+            {"hasta": "2025-13-01"},
+        ):
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
+
+
+class KardexTests(TestCase):
+    """
+    Saldo acumulado del kardex (funciones de ventana) y sus endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user("admin", "admin@example.com", "clave")
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        estado = TipoEstado.objects.create(nombre="Activo")
+        cls.a, cls.b = (
+            Producto.objects.create(
+                codigo_producto=codigo,
+                nombre=codigo,
+                stock_minimo_inicial=0,
+                stock=0,
+                unidad_medida=unidad,
+                tipo_estado=estado,
+            )
+            for codigo in ("K-A", "K-B")
+        )
+        # Stock fijado a mano antes de los movimientos: saldo inicial implícito
+        Producto.objects.filter(pk=cls.a.pk).update(stock=100)
+        base = timezone.now() - timedelta(days=10)
+        for producto, tipo, cantidad, dias in (
+            (cls.a, "entrada", 10, 3),
+            (cls.a, "salida", 4, 1),
+            (cls.b, "entrada", 6, 2),
+            # Misma fecha que la siguiente: desempata el id
+            (cls.a, "salida", 30, 2),
+            (cls.a, "entrada", 5, 2),
+        ):
+            movimiento = MovimientoInventario.objects.create(
+                producto=producto, tipo=tipo, cantidad=cantidad
+            )
+            MovimientoInventario.objects.filter(pk=movimiento.pk).update(
+                fecha=base + timedelta(days=dias)
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _saldos_en_python(self, producto):
+        movimientos = MovimientoInventario.objects.filter(producto=producto).order_by(
+            "fecha", "id"
+        )
+        delta = {"entrada": 1, "salida": -1}
+        saldo = Producto.objects.get(pk=producto.pk).stock - sum(
+            delta[m.tipo] * m.cantidad for m in movimientos
+        )
+        saldos = []
+        for m in movimientos:
+            saldo += delta[m.tipo] * m.cantidad
+            saldos.append((m.pk, saldo))
+        return saldos
+
+    def test_saldo_acumulado(self):
+        filas = list(kardex.kardex())
+        self.assertEqual(
+            [(fila[1], fila[6]) for fila in filas if fila[0] == self.a.pk],
+            self._saldos_en_python(self.a),
+        )
+        # Saldo inicial 100; por fecha: -4, -30 y +5 el mismo día, +10
+        self.assertEqual(
+            [fila[6] for fila in filas if fila[0] == self.a.pk], [96, 66, 71, 81]
+        )
+        # El último saldo de cada producto es su stock
+        self.assertEqual([fila[6] for fila in filas if fila[0] == self.b.pk], [6])
+        self.assertEqual(list(kardex.kardex([self.b.pk]).values_list("saldo")), [(6,)])
+
+    def test_endpoints(self):
+        response = self.client.get(reverse("producto-kardex", args=[self.a.pk]))
+        self.assertEqual(response.status_code, 200)
+        datos = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([fila["saldo"] for fila in datos], [96, 66, 71, 81])
+
+        response = self.client.get(
+            reverse("producto-kardex-exportar"), {"productos": f"{self.b.pk}"}
+        )
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lineas = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lineas[0], ",".join(kardex.COLUMNAS))
+        self.assertEqual(lineas[1].split(",")[-1], "6")
+
+    def test_formato_invalido(self):
+        for url in (
+            reverse("producto-kardex", args=[self.a.pk]),
+            reverse("producto-kardex-exportar"),
+        ):
+            response = self.client.get(url, {"formato": "xml"})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("formato", response.data)
+
+
+@unittest.skipIf(numpy is None, "El pronóstico requiere numpy.")
+class PronosticoTests(TestCase):
+    """
+    Pronóstico vectorizado contra un cálculo día a día en Python, y el
+    endpoint de reabastecimiento.
+    """
+
+    HOY = date(2025, 3, 1)
+    PARAMETROS = {"dias": 60, "ventana": 7, "alfa": 0.3, "plazo": 5}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user("admin", "admin@example.com", "clave")
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        estado = TipoEstado.objects.create(nombre="Activo")
+        cls.productos = {
+            codigo: Producto.objects.create(
+                codigo_producto=codigo,
+                nombre=codigo,
+                stock_minimo_inicial=0,
+                stock=stock,
+                unidad_medida=unidad,
+                tipo_estado=estado,
+            )
+            for codigo, stock in (("P-A", 3), ("P-B", 0), ("P-C", 500))
+        }
+
+        # (producto, días antes de HOY, entradas, salidas)
+        filas = [("P-A", d, 0, (d * 7) % 11) for d in range(1, 61) if d % 4]
+        # P-C empieza hace 10 días, con una entrada sin salidas
+        filas += [("P-C", 10, 50, 0)] + [("P-C", d, 0, 20 - d) for d in range(1, 10)]
+        # Fuera del periodo: no cuentan
+        filas += [("P-A", 0, 0, 99), ("P-A", 61, 0, 99)]
+        ResumenDiarioMovimiento.objects.bulk_create(
+            ResumenDiarioMovimiento(
+                producto=cls.productos[codigo],
+                dia=cls.HOY - timedelta(days=dias),
+                entradas=entradas,
+                salidas=salidas,
+                movimientos=1,
+            )
+            for codigo, dias, entradas, salidas in filas
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _referencia(self, producto, dias, ventana, alfa, plazo):
+        """
+        El mismo pronóstico, día a día y sin vectorizar.
+        """
+        inicio = self.HOY - timedelta(days=dias)
+        resumen = dict(
+            ResumenDiarioMovimiento.objects.filter(
+                producto=producto, dia__gte=inicio, dia__lt=self.HOY
+            ).values_list("dia", "salidas")
+        )
+        if not resumen:
+            return dict.fromkeys(pronostico.CAMPOS, 0)
+        serie = [
+            resumen.get(min(resumen) + timedelta(days=t), 0)
+            for t in range((self.HOY - min(resumen)).days)
+        ]
+        n = len(serie)
+        media = sum(serie) / n
+        varianza = sum((x - media) ** 2 for x in serie) / max(n - 1, 1)
+        suavizada = media
+        for x in serie:
+            suavizada = alfa * x + (1 - alfa) * suavizada
+        z = NormalDist().inv_cdf(pronostico.NIVEL_SERVICIO)
+        seguridad = math.ceil(round(z * math.sqrt(varianza) * math.sqrt(plazo), 6))
+        reorden = math.ceil(round(suavizada * plazo + seguridad, 6))
+        return {
+            "demanda_media": sum(serie[-ventana:]) / min(ventana, n),
+            "demanda_suavizada": suavizada,
+            "desviacion": math.sqrt(varianza),
+            "stock_seguridad": seguridad,
+            "punto_reorden": reorden,
+            "stock_objetivo": math.ceil(round(reorden + suavizada * plazo, 6)),
+        }
+
+    def test_calcular_coincide_con_la_referencia(self):
+        resultado = pronostico.calcular(hoy=self.HOY, **self.PARAMETROS)
+        for fila, producto_id in enumerate(resultado["producto_id"].tolist()):
+            esperado = self._referencia(producto_id, **self.PARAMETROS)
+            for campo in pronostico.CAMPOS:
+                self.assertAlmostEqual(
+                    float(resultado[campo][fila]),
+                    esperado[campo],
+                    places=6,
+                    msg=(producto_id, campo),
+                )
+
+    def test_lectura_por_bloques_y_productos_nuevos(self):
+        esperado = pronostico.calcular(hoy=self.HOY, **self.PARAMETROS)
+        original = pronostico._salidas_diarias
+
+        def con_producto_nuevo(*args):
+            # Un producto creado entre la lectura de ids y la del resumen
+            nuevo = Producto.objects.create(
+                codigo_producto="P-N",
+                nombre="Nuevo",
+                stock_minimo_inicial=0,
+                stock=0,
+                unidad_medida=self.productos["P-A"].unidad_medida,
+                tipo_estado=self.productos["P-A"].tipo_estado,
+            )
+            ResumenDiarioMovimiento.objects.create(
+                producto=nuevo, dia=self.HOY - timedelta(days=1), salidas=7
+            )
+            return original(*args)
+
+        with (
+            mock.patch.object(pronostico, "LOTE", 1),
+            mock.patch.object(pronostico, "_salidas_diarias", con_producto_nuevo),
+        ):
+            resultado = pronostico.calcular(hoy=self.HOY, **self.PARAMETROS)
+        for campo in ("producto_id", *pronostico.CAMPOS):
+            self.assertEqual(
+                resultado[campo].tolist(), esperado[campo].tolist(), msg=campo
+            )
+
+    def test_parametros_invalidos(self):
+        for parametros in (
+            {"dias": 0},
+            {"ventana": 0},
+            {"alfa": 0},
+            {"alfa": 1.5},
+            {"nivel_servicio": 1},
+        ):
+            with self.assertRaises(pronostico.ErrorPronostico, msg=parametros):
+                pronostico.calcular(hoy=self.HOY, **parametros)
+
+    def test_guardar_y_reabastecimiento(self):
+        resultado = pronostico.calcular(hoy=self.HOY, **self.PARAMETROS)
+        self.assertEqual(pronostico.guardar(resultado, plazo=5), 3)
+        # Recalcular actualiza las mismas filas
+        self.assertEqual(pronostico.guardar(resultado, plazo=5), 3)
+        self.assertEqual(PronosticoDemanda.objects.count(), 3)
+
+        a, b, c = (self.productos[codigo] for codigo in ("P-A", "P-B", "P-C"))
+        objetivo = PronosticoDemanda.objects.get(producto=a).stock_objetivo
+        url = reverse("producto-reabastecimiento")
+        datos = self.client.get(url).data
+        # P-C tiene stock de sobra; P-B sin demanda queda al final con 0
+        self.assertEqual([f["producto_id"] for f in datos], [a.pk, b.pk])
+        self.assertEqual(datos[0]["cantidad_sugerida"], objetivo - 3)
+        self.assertEqual(datos[1]["cantidad_sugerida"], 0)
+
+        datos = self.client.get(url, {"todos": "true"}).data
+        self.assertEqual({f["producto_id"] for f in datos}, {a.pk, b.pk, c.pk})
+        datos = self.client.get(url, {"producto": c.pk, "todos": "1"}).data
+        self.assertEqual([f["cantidad_sugerida"] for f in datos], [0])
+        self.assertEqual(self.client.get(url, {"producto": "x"}).status_code, 400)
+
+
+class _StockEnBloque:
+    """
+    delete() y update() en bloque de movimientos mantienen el stock y el
+    resumen diario. Se corre en modo ORM y en modo triggers.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        estado = TipoEstado.objects.create(nombre="Activo")
+        cls.a, cls.b = (
+            Producto.objects.create(
+                codigo_producto=codigo,
+                nombre=codigo,
+                stock_minimo_inicial=0,
+                stock=0,
+                unidad_medida=unidad,
+                tipo_estado=estado,
+            )
+            for codigo in ("B-A", "B-B")
+        )
+
+    def setUp(self):
+        for producto, tipo, cantidad in (
+            (self.a, "entrada", 10),
+            (self.a, "salida", 3),
+            (self.a, "entrada", 5),
+            (self.b, "entrada", 7),
+            (self.b, "salida", 2),
+        ):
+            MovimientoInventario.objects.create(
+                producto=producto, tipo=tipo, cantidad=cantidad
+            )
+
+    def assertStock(self, a, b):
+        self.assertEqual(
+            (
+                Producto.objects.get(pk=self.a.pk).stock,
+                Producto.objects.get(pk=self.b.pk).stock,
+            ),
+            (a, b),
+        )
+        self.assertEqual(conciliacion.diferencias(self.a.pk, self.b.pk), [])
+        # El resumen mantenido en bloque es igual a reconstruirlo desde cero
+        resumen = sorted(
+            ResumenDiarioMovimiento.objects.filter(movimientos__gt=0).values_list(
+                "producto_id", "dia", "entradas", "salidas", "movimientos"
+            )
+        )
+        ResumenDiarioMovimiento.objects.all().delete()
+        ResumenDiarioMovimiento.reconstruir()
+        self.assertEqual(
+            sorted(
+                ResumenDiarioMovimiento.objects.values_list(
+                    "producto_id", "dia", "entradas", "salidas", "movimientos"
+                )
+            ),
+            resumen,
+        )
+
+    def test_delete_en_bloque(self):
+        self.assertStock(12, 5)
+        MovimientoInventario.objects.filter(tipo="salida").delete()
+        self.assertStock(15, 7)
+        MovimientoInventario.objects.filter(producto=self.b).delete()
+        self.assertStock(15, 0)
+
+    def test_update_cantidad_y_tipo(self):
+        MovimientoInventario.objects.filter(producto=self.a, tipo="entrada").update(
+            cantidad=F("cantidad") * 2
+        )
+        self.assertStock(27, 5)
+        MovimientoInventario.objects.filter(producto=self.b).update(tipo="salida")
+        self.assertStock(27, -9)
+
+    def test_update_cambia_producto(self):
+        MovimientoInventario.objects.filter(producto=self.a, tipo="salida").update(
+            producto=self.b
+        )
+        self.assertStock(15, 2)
+        MovimientoInventario.objects.filter(producto=self.b).update(
+            producto_id=self.a.pk, cantidad=1
+        )
+        # b tenía una entrada y dos salidas: pasan a a con cantidad 1
+        self.assertStock(15 + 1 - 1 - 1, 0)
+
+    def test_update_fecha(self):
+        ayer = timezone.now() - timedelta(days=1)
+        MovimientoInventario.objects.filter(producto=self.a, tipo="salida").update(
+            fecha=ayer
+        )
+        self.assertStock(12, 5)
+        self.assertEqual(
+            ResumenDiarioMovimiento.objects.get(
+                producto=self.a, dia=timezone.localdate(ayer)
+            ).salidas,
+            3,
+        )
+
+
+class StockEnBloqueTests(_StockEnBloque, TestCase):
+    pass
+
+
+@override_settings(INVENTARIO_STOCK_TRIGGERS=True)
+class StockEnBloqueTriggersTests(_StockEnBloque, TestCase):
+    def setUp(self):
+        triggers.instalar(connection)
+        self.addCleanup(triggers.desinstalar, connection)
+        super().setUp()
+
+
+@override_settings(INVENTARIO_STOCK_TRIGGERS=True)
+class MigracionTriggersTests(TransactionTestCase):
+    """
+    Con el modo triggers activo, migrar desde cero instala los triggers con
+    el SQL de las migraciones y mantienen el stock.
+    """
+
+    def tearDown(self):
+        triggers.desinstalar(connection)
+
+    def test_triggers_despues_de_migrar(self):
+        call_command("migrate", "inventory", "0002", verbosity=0)
+        self.assertFalse(triggers.instalados(connection))
+        call_command("migrate", "inventory", verbosity=0)
+        self.assertTrue(triggers.instalados(connection))
+
+        unidad = UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+        producto = Producto.objects.create(
+            codigo_producto="M-1",
+            nombre="Migrado",
+            stock_minimo_inicial=0,
+            stock=0,
+            unidad_medida=unidad,
+            tipo_estado=TipoEstado.objects.create(nombre="Activo"),
+        )
+        antes = producto.fecha_actualizacion
+        MovimientoInventario.objects.create(
+            producto=producto, tipo="entrada", cantidad=9
+        )
+        salida = MovimientoInventario.objects.create(
+            producto=producto, tipo="salida", cantidad=4
+        )
+        MovimientoInventario.objects.filter(pk=salida.pk).update(cantidad=2)
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock, 7)
+        self.assertGreater(producto.fecha_actualizacion, antes)
+        self.assertEqual(conciliacion.diferencias(producto.pk, producto.pk), [])
+
+
+class ImportacionTests(TestCase):
+    """
+    Importación de productos desde CSV: altas, actualizaciones, catálogos,
+    validación por fila y archivos ilegibles.
+    """
+
+    ENCABEZADO = (
+        "codigo_producto,nombre,stock,unidad_medida,tipo_estado,marca,categoria\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user("admin", "admin@example.com", "clave")
+        cls.admin.roles.add(Rol.objects.create(nombre="Administrador", slug="admin"))
+        UnidadMedida.objects.create(nombre="Unidad", nomenclatura="u")
+
+    def _importar(self, contenido):
+        return importar_productos(io.BytesIO(contenido.encode()), "productos.csv")
+
+    def test_crea_y_actualiza_por_codigo(self):
+        resultado = self._importar(
+            self.ENCABEZADO
+            + "P-1,Tornillo,10,u,Activo,Acme,Ferretería\n"
+            + "P-2,Tuerca,5,Unidad,Activo,,\n"
+        )
+        self.assertEqual((resultado["creados"], resultado["actualizados"]), (2, 0))
+        self.assertEqual(
+            resultado["catalogos_creados"],
+            {"marca": 1, "categoria": 1, "unidad_medida": 0, "tipo_estado": 1},
+        )
+
+        resultado = self._importar(
+            self.ENCABEZADO + "P-1,Tornillo 3mm,99,u,Activo,acme,\n"
+        )
+        self.assertEqual((resultado["creados"], resultado["actualizados"]), (0, 1))
+        producto = Producto.objects.get(codigo_producto="P-1")
+        # El stock de un producto existente no se toca
+        self.assertEqual((producto.nombre, producto.stock), ("Tornillo 3mm", 10))
+        self.assertEqual(Marca.objects.count(), 1)
+
+    def test_errores_por_fila(self):
+        resultado = self._importar(
+            self.ENCABEZADO
+            + ",Sin código,1,u,Activo,,\n"
+            + f"P-3,Largo,1,u,Activo,{'m' * 101},{'c' * 100}\n"
+            + f"P-4,Largo,1,{'u' * 51},{'e' * 51},,\n"
+            + "P-5,Stock,muchos,u,Activo,,\n"
+            + "P-6,Infinito,inf,u,Activo,,\n"
+            + "P-7,Nan,nan,u,Activo,,\n"
+            + "P-8,Enorme,1e12,u,Activo,,\n"
+        )
+        self.assertEqual(resultado["creados"], 0)
+        self.assertEqual(
+            [(e["fila"], sorted(e["errores"])) for e in resultado["errores"]],
+            [
+                (2, ["codigo_producto"]),
+                (3, ["marca"]),
+                (4, ["tipo_estado", "unidad_medida"]),
+                (5, ["stock"]),
+                (6, ["stock"]),
+                (7, ["stock"]),
+                (8, ["stock"]),
+            ],
+        )
+
+    def test_archivos_ilegibles(self):
+        for contenido in (
+            self.ENCABEZADO.encode() + "P-1,Año,1,u,Activo,,\n".encode("latin-1"),
+            self.ENCABEZADO.encode() + b'"' + b"x" * 200_000 + b'"\n',
+        ):
+            with self.assertRaises(ErrorImportacion):
+                importar_productos(io.BytesIO(contenido), "productos.csv")
+        with self.assertRaises(ErrorImportacion):
+            importar_productos(io.BytesIO(b"PK\x03\x04 roto"), "productos.xlsx")
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = reverse("producto-importar")
+        archivo = SimpleUploadedFile("productos.csv", b"\xff\xfe\x00roto")
+        response = client.post(url, {"archivo": archivo}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("archivo", response.data)
+
+        archivo = SimpleUploadedFile(
+            "productos.csv", (self.ENCABEZADO + "P-9,Clavo,3,u,Activo,,\n").encode()
+        )
+        response = client.post(url, {"archivo": archivo}, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["creados"], 1)
@@ -0,0 +1,139 @@
+"""
+Modo opcional de stock por triggers de base de datos.
+
+Con INVENTARIO_STOCK_TRIGGERS=True, los triggers sobre la tabla de
+movimientos mantienen Producto.stock en INSERT/UPDATE/DELETE, incluyendo
+SQL crudo y bulk_create. En ese modo el ORM no vuelve a aplicar el stock.
+Soporta SQLite y PostgreSQL.
+"""
+
+from django.conf import settings
+
+
+def stock_por_triggers():
+    return getattr(settings, "INVENTARIO_STOCK_TRIGGERS", False)
+
+
+def _tablas():
+    from .models import MovimientoInventario, Producto
+
+    return {
+        "movimientos": MovimientoInventario._meta.db_table,
+        "productos": Producto._meta.db_table,
+    }
+
+
+_DELTA = "(CASE WHEN {fila}.tipo = 'entrada' THEN {fila}.cantidad ELSE -{fila}.cantidad END)"
+
+_APLICAR = (
+    "UPDATE {productos} SET stock = stock {signo} " + _DELTA + ", "
+    "fecha_actualizacion = {ahora} WHERE id = {fila}.producto_id;"
+)
+
+# Mismo formato que guarda Django en SQLite (texto UTC) para que los
+# filtros por fecha_actualizacion comparen bien
+_AHORA_SQLITE = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+_AHORA_POSTGRESQL = "clock_timestamp()"
+
+
+def _sql_sqlite(t):
+    aplicar_new = _APLICAR.format(signo="+", fila="NEW", ahora=_AHORA_SQLITE, **t)
+    revertir_old = _APLICAR.format(signo="-", fila="OLD", ahora=_AHORA_SQLITE, **t)
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_ai
+        AFTER INSERT ON {t['movimientos']}
+        BEGIN {aplicar_new} END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_au
+        AFTER UPDATE OF producto_id, tipo, cantidad ON {t['movimientos']}
+        BEGIN {revertir_old} {aplicar_new} END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS inventory_movimiento_stock_ad
+        AFTER DELETE ON {t['movimientos']}
+        BEGIN {revertir_old} END;
+        """,
+    ]
+
+
+def _sql_postgresql(t):
+    aplicar_new = _APLICAR.format(signo="+", fila="NEW", ahora=_AHORA_POSTGRESQL, **t)
+    revertir_old = _APLICAR.format(signo="-", fila="OLD", ahora=_AHORA_POSTGRESQL, **t)
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION inventory_movimiento_stock() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {revertir_old}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {aplicar_new}
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        f"DROP TRIGGER IF EXISTS inventory_movimiento_stock ON {t['movimientos']};",
+        f"""
+        CREATE TRIGGER inventory_movimiento_stock
+        AFTER INSERT OR UPDATE OF producto_id, tipo, cantidad OR DELETE
+        ON {t['movimientos']}
+        FOR EACH ROW EXECUTE FUNCTION inventory_movimiento_stock();
+        """,
+    ]
+
+
+def _sql_eliminar(vendor, t):
+    if vendor == "sqlite":
+        return [
+            f"DROP TRIGGER IF EXISTS inventory_movimiento_stock_{sufijo};"
+            for sufijo in ("ai", "au", "ad")
+        ]
+    return [
+        f"DROP TRIGGER IF EXISTS inventory_movimiento_stock ON {t['movimientos']};",
+        "DROP FUNCTION IF EXISTS inventory_movimiento_stock();",
+    ]
+
+
+_INSTALADORES = {
+    "sqlite": _sql_sqlite,
+    "postgresql": _sql_postgresql,
+}
+
+
+def instalar(connection):
+    generador = _INSTALADORES.get(connection.vendor)
+    if generador is None:
+        raise NotImplementedError(
+            f"Triggers de stock no soportados para '{connection.vendor}'."
+        )
+    with connection.cursor() as cursor:
+        for sql in generador(_tablas()):
+            cursor.execute(sql)
+
+
+def desinstalar(connection):
+    if connection.vendor not in _INSTALADORES:
+        return
+    with connection.cursor() as cursor:
+        for sql in _sql_eliminar(connection.vendor, _tablas()):
+            cursor.execute(sql)
+
+
+def instalados(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master "
+                "WHERE type = 'trigger' AND name LIKE 'inventory_movimiento_stock_%'"
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT COUNT(*) FROM pg_trigger "
+                "WHERE tgname = 'inventory_movimiento_stock'"
+            )
+        else:
+            return False
+        return cursor.fetchone()[0] > 0
@@ -1,5 +1,18 @@
-from rest_framework import viewsets
+import heapq
+
+from django.db.models import F, Sum, Value
+from django.http import StreamingHttpResponse
+from django.db.models.functions import Greatest, TruncMonth, TruncWeek
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
 from accounts.permissions import IsAdminOrRespAdmContable
+from core.rangos import rango_desde_params
+from core.serializers import AltaEnLoteMixin
+from core.sincronizacion import SincronizacionMixin
 from .models import (
     Marca,
     Categoria,
@@ -7,7 +20,12 @@ from .models import (
     TipoEstado,
     Producto,
     MovimientoInventario,
+    MovimientoArchivado,
+    PronosticoDemanda,
+    ResumenDiarioMovimiento,
 )
+from .importacion import ErrorImportacion, importar_productos
+from .kardex import FORMATOS, filas_csv, filas_json, kardex
 from .serializers import (
     MarcaSerializer,
     CategoriaSerializer,
@@ -16,44 +34,320 @@ from .serializers import (
     ProductoSerializer,
     ProductoWriteSerializer,
     MovimientoInventarioSerializer,
+    MovimientoArchivadoSerializer,
 )
 
 
-class MarcaViewSet(viewsets.ModelViewSet):
+class MarcaViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = Marca.objects.all().order_by("nombre")
     serializer_class = MarcaSerializer
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {"list": 3, "retrieve": 3}
 
 
-class CategoriaViewSet(viewsets.ModelViewSet):
+class CategoriaViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = Categoria.objects.all().order_by("nombre")
     serializer_class = CategoriaSerializer
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {"list": 3, "retrieve": 3}
 
 
-class UnidadMedidaViewSet(viewsets.ModelViewSet):
+class UnidadMedidaViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = UnidadMedida.objects.all().order_by("nombre")
     serializer_class = UnidadMedidaSerializer
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {"list": 3, "retrieve": 3}
 
 
-class TipoEstadoViewSet(viewsets.ModelViewSet):
+class TipoEstadoViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = TipoEstado.objects.all().order_by("nombre")
     serializer_class = TipoEstadoSerializer
     permission_classes = [IsAdminOrRespAdmContable]
+    presupuesto_consultas = {"list": 3, "retrieve": 3}
 
 
-class ProductoViewSet(viewsets.ModelViewSet):
+class ProductoViewSet(AltaEnLoteMixin, SincronizacionMixin, viewsets.ModelViewSet):
     queryset = Producto.objects.all().order_by("nombre")
     permission_classes = [IsAdminOrRespAdmContable]
+    # list/retrieve en frío: +1 versión de catálogos y +1 por cada uno de los
+    # cuatro catálogos (marca, categoría, unidad, estado) que se cargan
+    presupuesto_consultas = {
+        "list": 8,
+        "retrieve": 8,
+        "kardex": 4,
+        "kardex_exportar": 3,
+        "reabastecimiento": 3,
+    }
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return ProductoWriteSerializer
         return ProductoSerializer
 
+    @staticmethod
+    def _formato_kardex(request, defecto):
+        formato = request.query_params.get("formato", defecto)
+        if formato not in FORMATOS:
+            raise ValidationError(
+                {"formato": f"Formato no soportado, use {' o '.join(FORMATOS)}."}
+            )
+        return formato
+
+    def _respuesta_kardex(self, filas, formato, nombre_archivo):
+        if formato == "csv":
+            response = StreamingHttpResponse(
+                filas_csv(filas), content_type="text/csv; charset=utf-8"
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="{nombre_archivo}.csv"'
+            )
+            return response
+        return StreamingHttpResponse(filas_json(filas), content_type="application/json")
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="importar",
+        parser_classes=[MultiPartParser],
+    )
+    def importar(self, request):
+        """
+        Importa o actualiza productos desde un CSV/XLSX (campo `archivo`).
+        Columnas: codigo_producto, nombre, stock_minimo_inicial, stock,
+        unidad_medida, tipo_estado, marca, categoria (catálogos por nombre).
+
+        POST /api/productos/importar/
+        """
+        archivo = request.FILES.get("archivo")
+        if archivo is None:
+            return Response(
+                {"archivo": "Debe adjuntar un archivo .csv o .xlsx."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            resultado = importar_productos(archivo, archivo.name)
+        except ErrorImportacion as exc:
+            return Response({"archivo": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(resultado, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"], url_path="kardex")
+    def kardex(self, request, pk=None):
+        """
+        Kardex del producto con saldo acumulado por movimiento (streaming).
+
+        GET /api/productos/{id}/kardex/?formato=json|csv
+        """
+        formato = self._formato_kardex(request, "json")
+        producto = self.get_object()
+        return self._respuesta_kardex(
+            kardex([producto.pk]), formato, f"kardex-{producto.codigo_producto}"
+        )
+
+    @action(detail=False, methods=["get"], url_path="kardex")
+    def kardex_exportar(self, request):
+        """
+        Exportación del kardex de varios productos (o de todos) en CSV.
 
-class MovimientoInventarioViewSet(viewsets.ModelViewSet):
+        GET /api/productos/kardex/?productos=1,2,3
+        """
+        formato = self._formato_kardex(request, "csv")
+        productos = request.query_params.get("productos")
+        ids = None
+        if productos:
+            try:
+                ids = [int(p) for p in productos.split(",") if p.strip()]
+            except ValueError:
+                return Response(
+                    {"productos": "Lista de ids separados por coma."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        return self._respuesta_kardex(kardex(ids), formato, "kardex")
+
+    @action(detail=False, methods=["get"], url_path="reabastecimiento")
+    def reabastecimiento(self, request):
+        """
+        Productos con stock en o bajo el punto de reorden pronosticado y la
+        cantidad sugerida para volver al stock objetivo, de mayor a menor.
+        Los pronósticos los calcula `manage.py pronosticar_demanda`.
+
+        GET /api/productos/reabastecimiento/?producto=1&todos=true
+        """
+        params = request.query_params
+        qs = PronosticoDemanda.objects.annotate(
+            cantidad_sugerida=Greatest(
+                F("stock_objetivo") - F("producto__stock"), Value(0)
+            )
+        )
+        if params.get("producto"):
+            if not params["producto"].isdigit():
+                return Response(
+                    {"producto": "Debe ser un id numérico."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(producto_id=params["producto"])
+        if params.get("todos", "").lower() not in ("1", "true"):
+            qs = qs.filter(producto__stock__lte=F("punto_reorden"))
+
+        data = qs.order_by("-cantidad_sugerida", "producto__nombre").values(
+            "producto_id",
+            "demanda_media",
+            "demanda_suavizada",
+            "desviacion",
+            "plazo_dias",
+            "stock_seguridad",
+            "punto_reorden",
+            "stock_objetivo",
+            "cantidad_sugerida",
+            "fecha_calculo",
+            codigo_producto=F("producto__codigo_producto"),
+            nombre=F("producto__nombre"),
+            stock=F("producto__stock"),
+            stock_minimo_inicial=F("producto__stock_minimo_inicial"),
+        )
+        return Response(list(data))
+
+
+class MovimientoInventarioViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = MovimientoInventario.objects.all().order_by("-fecha")
     serializer_class = MovimientoInventarioSerializer
     permission_classes = [IsAdminOrRespAdmContable]
+    # list: +2 cuando ?desde= alcanza el archivo (existencia + tabla fría)
+    presupuesto_consultas = {"list": 5, "retrieve": 3, "serie": 3}
+
+    GRANULARIDADES = {
+        "week": TruncWeek,
+        "month": TruncMonth,
+    }
+
+    def _filtrar(self, qs):
+        params = self.request.query_params
+        if params.get("producto"):
+            if not params["producto"].isdigit():
+                raise ValidationError({"producto": "Debe ser un id numérico."})
+            qs = qs.filter(producto_id=params["producto"])
+        desde, hasta = rango_desde_params(params)
+        if desde:
+            qs = qs.filter(fecha__gte=desde)
+        if hasta:
+            qs = qs.filter(fecha__lte=hasta)
+        return qs
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "list":
+            qs = self._filtrar(qs)
+        return qs
+
+    def _verificar_editable(self, movimiento):
+        # Un saldo arrastrado resume todo lo archivado del producto: editarlo
+        # o borrarlo cambiaría el stock y el resumen diario por ese neto
+        if movimiento.saldo_inicial:
+            raise ValidationError(
+                {"saldo_inicial": "Los saldos arrastrados del archivo no se modifican."}
+            )
+
+    def perform_update(self, serializer):
+        self._verificar_editable(serializer.instance)
+        super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        self._verificar_editable(instance)
+        super().perform_destroy(instance)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Movimientos de la tabla caliente, filtrables por ?producto=&desde=&hasta=.
+
+        Si `desde` alcanza el archivo histórico (ver archivar_movimientos), el
+        listado une ambas tablas ordenado por fecha descendente; los saldos
+        arrastrados no se listan en ese caso porque el detalle archivado ya
+        los explica. Las filas archivadas llevan `archivado: true`.
+        """
+        desde, _hasta = rango_desde_params(request.query_params)
+        if (
+            desde is None
+            or "updated_since" in request.query_params
+            or not MovimientoArchivado.objects.filter(fecha__gte=desde).exists()
+        ):
+            return super().list(request, *args, **kwargs)
+
+        calientes = self.get_queryset().filter(saldo_inicial=False).order_by("-fecha", "-id")
+        archivados = self._filtrar(MovimientoArchivado.objects.all()).order_by("-fecha", "-id")
+        filas = heapq.merge(
+            calientes.iterator(),
+            archivados.iterator(),
+            key=lambda m: (m.fecha, m.id),
+            reverse=True,
+        )
+        return Response(
+            [
+                (
+                    MovimientoArchivadoSerializer
+                    if isinstance(m, MovimientoArchivado)
+                    else MovimientoInventarioSerializer
+                )(m).data
+                for m in filas
+            ]
+        )
+
+    @action(detail=False, methods=["get"], url_path="serie")
+    def serie(self, request):
+        """
+        Serie de entradas/salidas leída del resumen diario por producto.
+
+        GET /api/movimientos/serie/?producto=1&desde=2025-01-01&hasta=2025-12-31&granularidad=day|week|month
+        """
+        params = request.query_params
+        granularidad = params.get("granularidad", "day")
+        if granularidad != "day" and granularidad not in self.GRANULARIDADES:
+            return Response(
+                {"granularidad": "Valores permitidos: day, week, month."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        qs = ResumenDiarioMovimiento.objects.all()
+        if params.get("producto"):
+            if not params["producto"].isdigit():
+                return Response(
+                    {"producto": "Debe ser un id numérico."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(producto_id=params["producto"])
+        for nombre, lookup in (("desde", "dia__gte"), ("hasta", "dia__lte")):
+            if params.get(nombre):
+                try:
+                    fecha = parse_date(params[nombre])
+                except ValueError:
+                    # Formato correcto pero fecha imposible (2025-02-30)
+                    fecha = None
+                if fecha is None:
+                    return Response(
+                        {nombre: "Fecha inválida, use YYYY-MM-DD."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                qs = qs.filter(**{lookup: fecha})
+
+        if granularidad == "day":
+            qs = qs.annotate(periodo=F("dia"))
+        else:
+            qs = qs.annotate(periodo=self.GRANULARIDADES[granularidad]("dia"))
+
+        filas = (
+            qs.values("periodo")
+            .annotate(
+                entradas_total=Sum("entradas"),
+                salidas_total=Sum("salidas"),
+                movimientos_total=Sum("movimientos"),
+            )
+            .order_by("periodo")
+        )
+        data = [
+            {
+                "periodo": f["periodo"],
+                "entradas": f["entradas_total"],
+                "salidas": f["salidas_total"],
+                "movimientos": f["movimientos_total"],
+            }
+            for f in filas
+        ]
+        return Response(data, status=status.HTTP_200_OK)
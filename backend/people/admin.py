@@ -5,9 +5,14 @@ from .models import Cargo, Empleado
 @admin.register(Cargo)
 class CargoAdmin(admin.ModelAdmin):
     list_display = ("nombre",)
+    search_fields = ("nombre",)
 
 
 @admin.register(Empleado)
 class EmpleadoAdmin(admin.ModelAdmin):
     list_display = ("nombres", "apellidos", "cargo", "activo")
     list_filter = ("activo", "cargo")
+    list_select_related = ("cargo",)
+    search_fields = ("nombres", "apellidos", "cedula", "correo")
+    autocomplete_fields = ("usuario",)
+    show_full_result_count = False
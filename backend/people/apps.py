@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class PeopleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'people'
+
+    def ready(self):
+        from core.catalogos import registro
+        from .models import Cargo
+        from .serializers import CargoSerializer
+
+        registro.registrar(Cargo, CargoSerializer)
@@ -0,0 +1,156 @@
+"""
+Análisis de carga de trabajo por empleado sobre las tareas asignadas.
+
+Los conflictos (tareas que se solapan en el tiempo para un mismo responsable)
+se detectan con un barrido ordenado por fecha de inicio: O(n log n) en total
+en lugar de comparar todas las parejas de tareas.
+
+Los reportes se cachean con una clave que incluye la versión de los datos
+leída de la BD (ver _version_datos), de modo que cualquier worker ve el
+cambio hecho por otro aunque el caché sea local a cada proceso, y también
+los cambios en bloque que no disparan señales.
+"""
+
+import hashlib
+import heapq
+from itertools import groupby
+
+from django.core.cache import cache
+from django.db import connection
+
+from core.models import Eliminacion
+from events.models import Tarea
+from .models import Empleado
+
+# Acota lo que puede durar un reporte viejo si una transacción confirma
+# una fecha_actualizacion anterior al máximo ya visible
+CACHE_TIMEOUT = 5 * 60
+
+
+def _version_datos():
+    """
+    Sello de los datos del reporte en una sola consulta: la última
+    actualización de tareas y empleados y su última eliminación. Todas las
+    escrituras (save, update en bloque, delete) los mueven (ver
+    core/sincronizacion.py) y las columnas están indexadas.
+    """
+    tareas = Tarea._meta.db_table
+    empleados = Empleado._meta.db_table
+    eliminaciones = Eliminacion._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT (SELECT MAX(fecha_actualizacion) FROM {tareas}), "
+            f"(SELECT MAX(fecha_actualizacion) FROM {empleados}), "
+            f"(SELECT MAX(fecha) FROM {eliminaciones} WHERE modelo IN (%s, %s))",
+            [Tarea._meta.label_lower, Empleado._meta.label_lower],
+        )
+        return ":".join(str(valor) for valor in cursor.fetchone())
+
+
+def _cache_key(*partes):
+    # Las fechas tienen espacios: se usa un hash para que la clave sirva en
+    # cualquier backend de caché
+    clave = ":".join(str(p) for p in (_version_datos(), *partes))
+    return "people:carga:%s" % hashlib.sha1(clave.encode()).hexdigest()
+
+
+def barrido_conflictos(tareas):
+    """
+    Recibe tuplas (id, inicio, fin) ordenadas por inicio.
+
+    Devuelve (conflictos, max_simultaneas). Se mantiene un heap con las
+    tareas activas ordenado por fecha de fin; cada tarea nueva se solapa
+    exactamente con las que siguen activas en el heap.
+    """
+    activas = []  # (fin, id)
+    conflictos = []
+    max_simultaneas = 0
+
+    for tarea_id, inicio, fin in tareas:
+        while activas and activas[0][0] <= inicio:
+            heapq.heappop(activas)
+
+        for fin_activa, activa_id in activas:
+            conflictos.append(
+                {
+                    "tarea_a": activa_id,
+                    "tarea_b": tarea_id,
+                    "desde": inicio,
+                    "hasta": min(fin, fin_activa),
+                }
+            )
+
+        heapq.heappush(activas, (fin, tarea_id))
+        max_simultaneas = max(max_simultaneas, len(activas))
+
+    return conflictos, max_simultaneas
+
+
+def _horas(tareas, desde=None, hasta=None):
+    """
+    Horas asignadas dentro de [desde, hasta]: cada tarea se recorta al rango.
+    """
+    segundos = 0
+    for _, inicio, fin in tareas:
+        inicio = max(inicio, desde) if desde else inicio
+        fin = min(fin, hasta) if hasta else fin
+        segundos += max((fin - inicio).total_seconds(), 0)
+    return segundos / 3600
+
+
+def _resumen_empleado(empleado_id, tareas, limite, desde=None, hasta=None):
+    conflictos, max_simultaneas = barrido_conflictos(tareas)
+    horas = _horas(tareas, desde, hasta)
+    return {
+        "empleado": empleado_id,
+        "tareas_pendientes": len(tareas),
+        "horas_asignadas": round(horas, 2),
+        "max_simultaneas": max_simultaneas,
+        "sobrecargado": max_simultaneas > limite,
+        "conflictos": conflictos,
+    }
+
+
+def calcular_carga(empleado_id=None, desde=None, hasta=None, limite=2):
+    """
+    Carga de trabajo de un empleado (o de todos si `empleado_id` es None).
+
+    Solo se consideran tareas pendientes con fecha de inicio y fin; las
+    horas se cuentan solo dentro de [desde, hasta]. El resultado se cachea
+    hasta que cambie alguna tarea o empleado.
+    """
+    key = _cache_key(empleado_id or "todos", desde, hasta, limite)
+    resultado = cache.get(key)
+    if resultado is not None:
+        return resultado
+
+    qs = Tarea.objects.filter(
+        responsable__isnull=False,
+        completada=False,
+        fecha_inicio__isnull=False,
+        fecha_fin__isnull=False,
+    ).en_rango(desde, hasta)
+    if empleado_id is not None:
+        qs = qs.filter(responsable_id=empleado_id)
+
+    # El nombre viene en la misma consulta (JOIN) en lugar de una aparte
+    filas = qs.order_by("responsable_id", "fecha_inicio", "id").values_list(
+        "responsable_id",
+        "responsable__nombres",
+        "responsable__apellidos",
+        "id",
+        "fecha_inicio",
+        "fecha_fin",
+    )
+
+    resultado = []
+    for (responsable_id, nombres, apellidos), grupo in groupby(
+        filas.iterator(), key=lambda f: f[:3]
+    ):
+        tareas = [(t_id, inicio, fin) for *_, t_id, inicio, fin in grupo]
+        resumen = _resumen_empleado(responsable_id, tareas, limite, desde, hasta)
+        resumen["nombre"] = f"{nombres} {apellidos}"
+        resultado.append(resumen)
+
+    cache.set(key, resultado, CACHE_TIMEOUT)
+    return resultado
@@ -1,16 +1,21 @@
 from django.db import models
 from accounts.models import Usuario
+from core.catalogos import CatalogoQuerySet
+from core.sincronizacion import SincronizableMixin, SincronizableQuerySet
 
 
-class Cargo(models.Model):
+class Cargo(SincronizableMixin, models.Model):
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CatalogoQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
 
-class Empleado(models.Model):
+class Empleado(SincronizableMixin, models.Model):
     usuario = models.OneToOneField(
         Usuario,
         on_delete=models.CASCADE,
@@ -32,6 +37,9 @@ class Empleado(models.Model):
     )
     fecha_ingreso = models.DateField(null=True, blank=True)
     activo = models.BooleanField(default=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = SincronizableQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.nombres} {self.apellidos}"
@@ -1,16 +1,18 @@
 from rest_framework import serializers
+from core.catalogos import CatalogoField
+from core.metricas import MedicionSerializerMixin
 from .models import Cargo, Empleado
 from accounts.models import Usuario
 
 
-class CargoSerializer(serializers.ModelSerializer):
+class CargoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Cargo
         fields = "__all__"
 
 
-class EmpleadoSerializer(serializers.ModelSerializer):
-    cargo = CargoSerializer(read_only=True)
+class EmpleadoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
+    cargo = CatalogoField(Cargo, source="cargo_id")
     usuario = serializers.PrimaryKeyRelatedField(
         queryset=Usuario.objects.all(),
         allow_null=True,
@@ -22,7 +24,7 @@ class EmpleadoSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class EmpleadoWriteSerializer(serializers.ModelSerializer):
+class EmpleadoWriteSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Empleado
         fields = "__all__"
@@ -1,3 +1,121 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Usuario
+from events.models import Evento, Tarea
+from .carga import barrido_conflictos, calcular_carga
+from .models import Cargo, Empleado
+
+FILAS = 50_000
+
+
+class AdminChangelistConsultasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_superuser(
+            "admin", "admin@example.com", "clave-segura"
+        )
+        cargos = Cargo.objects.bulk_create(
+            Cargo(nombre=f"Cargo {i}") for i in range(20)
+        )
+        Empleado.objects.bulk_create(
+            (
+                Empleado(
+                    nombres=f"Nombre {i}",
+                    apellidos="Apellido",
+                    cargo=cargos[i % len(cargos)],
+                )
+                for i in range(FILAS)
+            ),
+            batch_size=5000,
+        )
+
+    def test_changelist_empleados(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse("admin:people_empleado_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(consultas), 8)
+
+
+class CargaTests(TestCase):
+    """
+    Carga de trabajo: barrido de conflictos, horas dentro del rango y caché
+    invalidado por la versión de los datos en la BD.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.inicio = timezone.now().replace(microsecond=0)
+        cls.empleado = Empleado.objects.create(nombres="Ana", apellidos="Ruiz")
+        evento = Evento.objects.create(
+            nombre="Feria", fecha_inicio=cls.inicio, fecha_fin=cls.inicio
+        )
+        # 0-4 h y 2-6 h se solapan; 10-12 h no
+        cls.tareas = [
+            Tarea.objects.create(
+                evento=evento,
+                nombre=f"Tarea {desde}",
+                responsable=cls.empleado,
+                fecha_inicio=cls.inicio + timedelta(hours=desde),
+                fecha_fin=cls.inicio + timedelta(hours=hasta),
+            )
+            for desde, hasta in ((0, 4), (2, 6), (10, 12))
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def _hora(self, horas):
+        return self.inicio + timedelta(hours=horas)
+
+    def test_barrido_conflictos(self):
+        tareas = [
+            (1, self._hora(0), self._hora(4)),
+            (2, self._hora(1), self._hora(2)),
+            (3, self._hora(3), self._hora(5)),
+            (4, self._hora(5), self._hora(6)),
+        ]
+        conflictos, max_simultaneas = barrido_conflictos(tareas)
+        self.assertEqual(
+            [(c["tarea_a"], c["tarea_b"]) for c in conflictos], [(1, 2), (1, 3)]
+        )
+        self.assertEqual(conflictos[1]["hasta"], self._hora(4))
+        self.assertEqual(max_simultaneas, 2)
+
+    def test_resumen_y_horas_dentro_del_rango(self):
+        (resumen,) = calcular_carga(self.empleado.pk)
+        self.assertEqual(resumen["tareas_pendientes"], 3)
+        self.assertEqual(resumen["horas_asignadas"], 10)
+        self.assertEqual(resumen["max_simultaneas"], 2)
+        self.assertFalse(resumen["sobrecargado"])
+        self.assertEqual(resumen["nombre"], "Ana Ruiz")
+
+        # Solo cuentan las horas entre 3 y 11: 1 + 3 + 1
+        (resumen,) = calcular_carga(
+            self.empleado.pk, desde=self._hora(3), hasta=self._hora(11)
+        )
+        self.assertEqual(resumen["horas_asignadas"], 5)
+        self.assertTrue(calcular_carga(self.empleado.pk, limite=1)[0]["sobrecargado"])
+
+    def test_cache_se_invalida_con_cambios_en_bloque(self):
+        self.assertEqual(calcular_carga()[0]["tareas_pendientes"], 3)
+        # Con caché: solo la consulta de versión
+        with CaptureQueriesContext(connection) as consultas:
+            calcular_carga()
+        self.assertEqual(len(consultas), 1)
+
+        Tarea.objects.filter(pk=self.tareas[0].pk).update(completada=True)
+        self.assertEqual(calcular_carga()[0]["tareas_pendientes"], 2)
+
+        Tarea.objects.filter(pk=self.tareas[1].pk).delete()
+        self.assertEqual(calcular_carga()[0]["tareas_pendientes"], 1)
 
-# Create your tests here.
+        Empleado.objects.update(nombres="Eva")
+        self.assertEqual(calcular_carga()[0]["nombre"], "Eva Ruiz")
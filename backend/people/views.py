@@ -1,20 +1,75 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from accounts.permissions import IsAdminOrRespTI
+from core.rangos import rango_desde_params
+from core.sincronizacion import SincronizacionMixin
+from .carga import calcular_carga
 from .models import Cargo, Empleado
 from .serializers import CargoSerializer, EmpleadoSerializer, EmpleadoWriteSerializer
 
 
-class CargoViewSet(viewsets.ModelViewSet):
+class CargoViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = Cargo.objects.all().order_by("nombre")
     serializer_class = CargoSerializer
     permission_classes = [IsAdminOrRespTI]
+    presupuesto_consultas = {"list": 3, "retrieve": 3}
 
 
-class EmpleadoViewSet(viewsets.ModelViewSet):
+class EmpleadoViewSet(SincronizacionMixin, viewsets.ModelViewSet):
     queryset = Empleado.objects.all().order_by("apellidos", "nombres")
     permission_classes = [IsAdminOrRespTI]
+    # En frío: list/retrieve suman la versión de catálogos y el de cargos;
+    # carga y carga_general, la consulta de versión de la caché de carga
+    presupuesto_consultas = {"list": 5, "retrieve": 5, "carga": 5, "carga_general": 4}
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return EmpleadoWriteSerializer
         return EmpleadoSerializer
+
+    def _parametros_carga(self):
+        desde, hasta = rango_desde_params(self.request.query_params)
+        try:
+            limite = int(self.request.query_params.get("limite", 2))
+        except ValueError:
+            raise ValidationError({"limite": "Debe ser un número entero."})
+        return {"desde": desde, "hasta": hasta, "limite": limite}
+
+    @action(detail=True, methods=["get"], url_path="carga")
+    def carga(self, request, pk=None):
+        """
+        Carga y conflictos de horario de un empleado.
+
+        GET /api/empleados/{id}/carga/?desde=&hasta=&limite=2
+        """
+        empleado = self.get_object()
+        resultado = calcular_carga(empleado.pk, **self._parametros_carga())
+        if resultado:
+            data = resultado[0]
+        else:
+            data = {
+                "empleado": empleado.pk,
+                "nombre": str(empleado),
+                "tareas_pendientes": 0,
+                "horas_asignadas": 0,
+                "max_simultaneas": 0,
+                "sobrecargado": False,
+                "conflictos": [],
+            }
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="carga")
+    def carga_general(self, request):
+        """
+        Reporte de carga de todos los empleados con tareas pendientes.
+
+        GET /api/empleados/carga/?desde=&hasta=&limite=2&solo_conflictos=true
+        """
+        resultado = calcular_carga(**self._parametros_carga())
+        if request.query_params.get("solo_conflictos", "").lower() in ("1", "true"):
+            resultado = [
+                r for r in resultado if r["conflictos"] or r["sobrecargado"]
+            ]
+        return Response(resultado, status=status.HTTP_200_OK)
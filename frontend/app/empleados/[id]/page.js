@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter, usePathname } from "next/navigation";
 import MainLayout from "../../components/MainLayout";
-import { apiGet, apiPatch, getStoredUser } from "../../lib/apiClient";
+import { apiGetVarios, apiPatch, getStoredUser } from "../../lib/apiClient";
 
 function getRoleSlugs(user) {
   return (user?.roles || []).map((r) => r.slug);
@@ -64,9 +64,9 @@ export default function EditarEmpleadoPage() {
       }
 
       try {
-        const [cargosData, emp] = await Promise.all([
-          apiGet("/api/cargos/"),
-          apiGet(`/api/empleados/${id}/`),
+        const [cargosData, emp] = await apiGetVarios([
+          "/api/cargos/",
+          `/api/empleados/${id}/`,
         ]);
 
         setCargos(Array.isArray(cargosData) ? cargosData : []);
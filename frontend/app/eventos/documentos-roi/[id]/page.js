@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter, usePathname } from "next/navigation";
 import MainLayout from "../../../components/MainLayout";
-import { apiGet, apiPatch, getStoredUser } from "../../../lib/apiClient";
+import { apiGetVarios, apiPatch, getStoredUser } from "../../../lib/apiClient";
 
 function getRoleSlugs(user) {
   return (user?.roles || []).map((r) => r.slug);
@@ -77,10 +77,10 @@ export default function EditarDocumentoROIPage() {
       }
 
       try {
-        const [doc, eventosData, empleadosData] = await Promise.all([
-          apiGet(`/api/documentos-roi/${id}/`),
-          apiGet("/api/eventos/"),
-          apiGet("/api/empleados/"),
+        const [doc, eventosData, empleadosData] = await apiGetVarios([
+          `/api/documentos-roi/${id}/`,
+          "/api/eventos/",
+          "/api/empleados/",
         ]);
 
         setEventos(Array.isArray(eventosData) ? eventosData : []);
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import MainLayout from "../../../components/MainLayout";
-import { apiGet, apiPost, getStoredUser } from "../../../lib/apiClient";
+import { apiGetVarios, apiPost, getStoredUser } from "../../../lib/apiClient";
 
 function getRoleSlugs(user) {
   return (user?.roles || []).map((r) => r.slug);
@@ -66,9 +66,9 @@ export default function NuevoDocumentoROIPage() {
       }
 
       try {
-        const [eventosData, empleadosData] = await Promise.all([
-          apiGet("/api/eventos/"),
-          apiGet("/api/empleados/"),
+        const [eventosData, empleadosData] = await apiGetVarios([
+          "/api/eventos/",
+          "/api/empleados/",
         ]);
 
         setEventos(Array.isArray(eventosData) ? eventosData : []);
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter, usePathname } from "next/navigation";
 import MainLayout from "../../../components/MainLayout";
-import { apiGet, apiPatch, getStoredUser } from "../../../lib/apiClient";
+import { apiGetVarios, apiPatch, getStoredUser } from "../../../lib/apiClient";
 
 function getRoleSlugs(user) {
   return (user?.roles || []).map((r) => r.slug);
@@ -98,10 +98,10 @@ export default function EditarTareaPage() {
       }
 
       try {
-        const [eventosData, empleadosData, tareaData] = await Promise.all([
-          apiGet("/api/eventos/"),
-          apiGet("/api/empleados/"),
-          apiGet(`/api/tareas/${id}/`),
+        const [eventosData, empleadosData, tareaData] = await apiGetVarios([
+          "/api/eventos/",
+          "/api/empleados/",
+          `/api/tareas/${id}/`,
         ]);
 
         setEventos(Array.isArray(eventosData) ? eventosData : []);
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter, usePathname } from "next/navigation";
 import MainLayout from "../../../components/MainLayout";
-import { apiGet, apiPatch, getStoredUser } from "../../../lib/apiClient";
+import { apiGetVarios, apiPatch, getStoredUser } from "../../../lib/apiClient";
 
 function getRoleSlugs(user) {
   return (user?.roles || []).map((r) => r.slug);
@@ -62,9 +62,9 @@ export default function EditarMovimientoPage() {
       }
 
       try {
-        const [prods, mov] = await Promise.all([
-          apiGet("/api/productos/"),
-          apiGet(`/api/movimientos/${id}/`),
+        const [prods, mov] = await apiGetVarios([
+          "/api/productos/",
+          `/api/movimientos/${id}/`,
         ]);
 
         setProductos(Array.isArray(prods) ? prods : []);
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import MainLayout from "../../components/MainLayout";
-import { apiGet, apiDelete, getStoredUser } from "../../lib/apiClient";
+import { apiGetVarios, apiDelete, getStoredUser } from "../../lib/apiClient";
 
 // Helpers de rol
 function getRoleSlugs(user) {
@@ -49,9 +49,9 @@ export default function MovimientosPage() {
 
       try {
         // Traemos movimientos y productos para poder mostrar el nombre del producto
-        const [movs, prods] = await Promise.all([
-          apiGet("/api/movimientos/"),
-          apiGet("/api/productos/"),
+        const [movs, prods] = await apiGetVarios([
+          "/api/movimientos/",
+          "/api/productos/",
         ]);
 
         setMovimientos(Array.isArray(movs) ? movs : []);
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter, usePathname } from "next/navigation";
 import MainLayout from "../../../components/MainLayout";
-import { apiGet, apiPatch, getStoredUser } from "../../../lib/apiClient";
+import { apiGetVarios, apiPatch, getStoredUser } from "../../../lib/apiClient";
 
 // Helpers de roles
 function getRoleSlugs(user) {
@@ -72,13 +72,14 @@ export default function EditarProductoPage() {
       }
 
       try {
-        // Cargar catálogos en paralelo
-        const [marcasData, categoriasData, unidadesData, tiposEstadoData] =
-          await Promise.all([
-            apiGet("/api/marcas/"),
-            apiGet("/api/categorias/"),
-            apiGet("/api/unidades-medida/"),
-            apiGet("/api/tipos-estado/"),
+        // Catálogos y producto en una sola petición
+        const [marcasData, categoriasData, unidadesData, tiposEstadoData, prod] =
+          await apiGetVarios([
+            "/api/marcas/",
+            "/api/categorias/",
+            "/api/unidades-medida/",
+            "/api/tipos-estado/",
+            `/api/productos/${id}/`,
           ]);
 
         setMarcas(Array.isArray(marcasData) ? marcasData : []);
@@ -86,9 +87,6 @@ export default function EditarProductoPage() {
         setUnidades(Array.isArray(unidadesData) ? unidadesData : []);
         setTiposEstado(Array.isArray(tiposEstadoData) ? tiposEstadoData : []);
 
-        // Cargar producto
-        const prod = await apiGet(`/api/productos/${id}/`);
-
         setCodigo(prod.codigo_producto || "");
         setNombre(prod.nombre || "");
         setStockMinimo(
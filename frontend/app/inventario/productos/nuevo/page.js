@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import MainLayout from "../../../components/MainLayout";
-import { apiGet, apiPost, getStoredUser } from "../../../lib/apiClient";
+import { apiGetVarios, apiPost, getStoredUser } from "../../../lib/apiClient";
 
 function getRoleSlugs(user) {
   return (user?.roles || []).map((r) => r.slug);
@@ -64,11 +64,11 @@ export default function NuevoProductoPage() {
 
       try {
         const [marcasData, categoriasData, unidadesData, tiposEstadoData] =
-          await Promise.all([
-            apiGet("/api/marcas/"),
-            apiGet("/api/categorias/"),
-            apiGet("/api/unidades-medida/"),
-            apiGet("/api/tipos-estado/"),
+          await apiGetVarios([
+            "/api/marcas/",
+            "/api/categorias/",
+            "/api/unidades-medida/",
+            "/api/tipos-estado/",
           ]);
 
         setMarcas(Array.isArray(marcasData) ? marcasData : []);
@@ -113,4 +113,32 @@ export function apiDelete(path) {
   return api(path, { method: "DELETE" });
 }
 
+/**
+ * Varios GET en una sola petición (POST /api/batch/).
+ * Devuelve [{ id, url, status, body }] en el mismo orden que `paths`.
+ */
+export async function apiBatch(paths, { concurrente = false } = {}) {
+  const data = await apiPost("/api/batch/", {
+    solicitudes: paths,
+    concurrente,
+  });
+  return data?.resultados || [];
+}
+
+/**
+ * Varios GET por /api/batch/ con el contrato de apiGet: devuelve los
+ * cuerpos en el mismo orden que `paths` y lanza un Error con el detalle
+ * de la primera sub-solicitud que falle.
+ */
+export async function apiGetVarios(paths) {
+  const resultados = await apiBatch(paths);
+  const fallido = resultados.find((r) => r.status < 200 || r.status >= 300);
+  if (fallido) {
+    throw new Error(
+      fallido.body?.detail || `Error ${fallido.status}: ${fallido.url}`
+    );
+  }
+  return resultados.map((r) => r.body);
+}
+
 export default api;
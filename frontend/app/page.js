@@ -4,7 +4,7 @@ import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import Link from "next/link";
 import MainLayout from "./components/MainLayout";
-import { apiGet, getStoredUser } from "./lib/apiClient";
+import { apiBatch, getStoredUser } from "./lib/apiClient";
 
 const EMPTY_COUNTERS = {
   usuarios: null,
@@ -60,25 +60,25 @@ export default function DashboardPage() {
 
       // Usuarios: admin o resp_ti
       if (isAdmin || isRespTI) {
-        requests.push(["usuarios", () => apiGet("/api/usuarios/")]);
+        requests.push(["usuarios", "/api/usuarios/"]);
       }
 
       // Roles: solo admin
       if (isAdmin) {
-        requests.push(["roles", () => apiGet("/api/roles/")]);
+        requests.push(["roles", "/api/roles/"]);
       }
 
       // Empleados: admin, resp_ti, resp_adm_contable
       if (isAdmin || isRespTI || isRespAdmCont) {
-        requests.push(["empleados", () => apiGet("/api/empleados/")]);
+        requests.push(["empleados", "/api/empleados/"]);
       }
 
       // Inventario + eventos + ROI: admin o resp_adm_contable
       if (isAdmin || isRespAdmCont) {
-        requests.push(["productos", () => apiGet("/api/productos/")]);
-        requests.push(["movimientos", () => apiGet("/api/movimientos/")]);
-        requests.push(["eventos", () => apiGet("/api/eventos/")]);
-        requests.push(["documentosRoi", () => apiGet("/api/documentos-roi/")]);
+        requests.push(["productos", "/api/productos/"]);
+        requests.push(["movimientos", "/api/movimientos/"]);
+        requests.push(["eventos", "/api/eventos/"]);
+        requests.push(["documentosRoi", "/api/documentos-roi/"]);
       }
 
       setGlobalError(null);
@@ -92,23 +92,23 @@ export default function DashboardPage() {
       }
 
       try {
-        const results = await Promise.allSettled(
-          requests.map(([, fn]) => fn())
-        );
+        // Una sola petición para todos los contadores
+        const results = await apiBatch(requests.map(([, path]) => path));
 
         results.forEach((res, index) => {
           const [key] = requests[index];
-          if (res.status === "fulfilled") {
-            newCounters[key] = Array.isArray(res.value)
-              ? res.value.length
-              : 0;
+          const ok = res.status >= 200 && res.status < 300;
+          if (ok) {
+            newCounters[key] = Array.isArray(res.body) ? res.body.length : 0;
           } else {
-            console.warn(`No se pudo cargar ${key}:`, res.reason);
+            console.warn(`No se pudo cargar ${key}:`, res.status, res.body);
             newCounters[key] = null; // 403 u otro error
           }
         });
 
-        const allFailed = results.every((r) => r.status === "rejected");
+        const allFailed = results.every(
+          (r) => r.status < 200 || r.status >= 300
+        );
         if (allFailed) {
           setGlobalError(
             "No se pudieron cargar los datos del panel para su rol."